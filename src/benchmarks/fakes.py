@@ -0,0 +1,268 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+# Local stand-ins for the provider APIs the functions call: Phantombuster's
+# v1 launch and v2 container and agent stop endpoints, the Bright Data
+# datasets snapshot API and LinkedIn's ugcPosts and register-upload flow. Jobs finish after a fixed
+# duration; responses can be made to fail or be rate limited at random.
+
+
+@dataclass
+class FakeProviderConfig:
+    """How the fake providers behave."""
+
+    # Seconds from launch until a job reports it has finished.
+    job_seconds: float = 5.0
+    # Approximate size of each job's result, in bytes.
+    payload_bytes: int = 20_000
+    # Share of requests answered with a 500.
+    error_rate: float = 0.0
+    # Share of requests answered with a 429.
+    rate_limit_rate: float = 0.0
+    # Retry-After sent with each 429, in seconds.
+    retry_after: float = 1.0
+    # Seconds every response is held back, like a slow provider API.
+    response_delay: float = 0.0
+    # Part size handed out for multipart media uploads, in bytes.
+    upload_part_bytes: int = 4 * 1024 * 1024
+    seed: int | None = None
+
+
+@dataclass
+class FakeProviderStats:
+    requests: Counter = field(default_factory=Counter)
+    responses: Counter = field(default_factory=Counter)
+    # Requests that named each job, including its launch.
+    requests_per_job: Counter = field(default_factory=Counter)
+    jobs_launched: int = 0
+    jobs_cancelled: int = 0
+    # Bytes received per media upload URL.
+    uploaded_bytes: Counter = field(default_factory=Counter)
+
+
+def build_records(payload_bytes: int, job_id: str) -> list[dict[str, Any]]:
+    """Returns a list of records whose JSON encoding is roughly `payload_bytes` long."""
+    record_bytes = 1000
+    count = max(1, payload_bytes // record_bytes)
+    filler = "x" * (record_bytes - 100)
+    return [{"id": f"{job_id}-{index}", "url": f"https://www.linkedin.com/feed/update/{job_id}-{index}", "text": filler} for index in range(count)]
+
+
+class FakeProviders:
+    """An aiohttp app serving every fake provider, with one shared config and request counters."""
+
+    def __init__(self, config: FakeProviderConfig) -> None:
+        self.config = config
+        self.stats = FakeProviderStats()
+        self.random = random.Random(config.seed)
+        self.jobs: dict[str, float] = {}
+        # The container each Phantombuster agent is running.
+        self.agent_containers: dict[str, str] = {}
+        # Inputs of Bright Data snapshots triggered for more than one profile.
+        self.snapshot_inputs: dict[str, list[dict[str, Any]]] = {}
+        # Lead records saved to org storage, as sent.
+        self.saved_leads: list[dict[str, Any]] = []
+        self.posts: list[dict[str, Any]] = []
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.inject_failures])
+        app.router.add_post("/brightdata/trigger", self.brightdata_trigger)
+        app.router.add_get("/brightdata/progress/{snapshot_id}", self.brightdata_progress)
+        app.router.add_get("/brightdata/snapshot/{snapshot_id}", self.brightdata_snapshot)
+        app.router.add_post("/brightdata/snapshot/{snapshot_id}/cancel", self.brightdata_cancel)
+        app.router.add_post("/phantombuster/v1/agent/{agent_id}/launch", self.phantombuster_launch)
+        app.router.add_get("/phantombuster/v2/containers/fetch", self.phantombuster_fetch)
+        app.router.add_post("/phantombuster/v2/agents/stop", self.phantombuster_stop)
+        app.router.add_post("/phantombuster/v2/org-storage/leads/save", self.phantombuster_save_lead)
+        app.router.add_post("/linkedin/v2/ugcPosts", self.linkedin_create_post)
+        app.router.add_get("/linkedin/v2/ugcPosts", self.linkedin_list_posts)
+        app.router.add_post("/linkedin/v2/assets", self.linkedin_assets)
+        app.router.add_put("/linkedin/upload/{upload_id}", self.linkedin_upload)
+        return app
+
+    @web.middleware
+    async def inject_failures(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.stats.requests[route] += 1
+        job_id = request.match_info.get("snapshot_id") or request.query.get("id")
+        if job_id:
+            self.stats.requests_per_job[job_id] += 1
+        if self.config.response_delay:
+            await asyncio.sleep(self.config.response_delay)
+
+        roll = self.random.random()
+        if roll < self.config.rate_limit_rate:
+            response = web.json_response(
+                {"error": "Too many requests"},
+                status=429,
+                headers={"Retry-After": f"{self.config.retry_after:g}"},
+            )
+        elif roll < self.config.rate_limit_rate + self.config.error_rate:
+            response = web.json_response({"error": "Internal error"}, status=500)
+        else:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                self.stats.responses[e.status] += 1
+                raise
+        self.stats.responses[response.status] += 1
+        return response
+
+    def launch(self) -> str:
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = time.monotonic()
+        self.stats.jobs_launched += 1
+        self.stats.requests_per_job[job_id] += 1
+        return job_id
+
+    def cancel(self, job_id: str) -> None:
+        if self.jobs.pop(job_id, None) is not None:
+            self.stats.jobs_cancelled += 1
+
+    def is_finished(self, job_id: str) -> bool:
+        started_at = self.jobs.get(job_id)
+        if started_at is None:
+            raise web.HTTPNotFound(text=f"No job {job_id}")
+        return time.monotonic() - started_at >= self.config.job_seconds
+
+    async def brightdata_trigger(self, request: web.Request) -> web.Response:
+        inputs = await request.json()
+        snapshot_id = self.launch()
+        if len(inputs) > 1:
+            self.snapshot_inputs[snapshot_id] = inputs
+        return web.json_response({"snapshot_id": snapshot_id})
+
+    async def brightdata_progress(self, request: web.Request) -> web.Response:
+        snapshot_id = request.match_info["snapshot_id"]
+        status = "ready" if self.is_finished(snapshot_id) else "running"
+        return web.json_response({"snapshot_id": snapshot_id, "status": status})
+
+    async def brightdata_snapshot(self, request: web.Request) -> web.Response:
+        snapshot_id = request.match_info["snapshot_id"]
+        if not self.is_finished(snapshot_id):
+            return web.json_response({"status": "building"}, status=202)
+        records = build_records(self.config.payload_bytes, snapshot_id)
+        inputs = self.snapshot_inputs.get(snapshot_id)
+        if inputs:
+            # One record per input, like a batch snapshot. Inputs whose URL contains "missing" fail.
+            records = [
+                {"input": scrape_input, "error": "Profile not found"} if "missing" in scrape_input.get("url", "")
+                else {**records[index % len(records)], "input": scrape_input}
+                for index, scrape_input in enumerate(inputs)
+            ]
+        return web.json_response(records)
+
+    async def brightdata_cancel(self, request: web.Request) -> web.Response:
+        snapshot_id = request.match_info["snapshot_id"]
+        self.is_finished(snapshot_id)
+        self.cancel(snapshot_id)
+        return web.Response(text="OK")
+
+    async def phantombuster_launch(self, request: web.Request) -> web.Response:
+        await request.json()
+        container_id = self.launch()
+        self.agent_containers[request.match_info["agent_id"]] = container_id
+        return web.json_response({"status": "success", "data": {"containerId": container_id}})
+
+    async def phantombuster_stop(self, request: web.Request) -> web.Response:
+        agent_id = (await request.json())["id"]
+        container_id = self.agent_containers.pop(agent_id, None)
+        if container_id is not None:
+            self.cancel(container_id)
+        return web.json_response({"status": "success"})
+
+    async def phantombuster_fetch(self, request: web.Request) -> web.Response:
+        container_id = request.query["id"]
+        if not self.is_finished(container_id):
+            return web.json_response({"id": container_id, "status": "running"})
+        body: dict[str, Any] = {"id": container_id, "status": "finished", "exitCode": 0}
+        if request.query.get("withResultObject") == "true":
+            body["resultObject"] = json.dumps(build_records(self.config.payload_bytes, container_id))
+        return web.json_response(body)
+
+    async def phantombuster_save_lead(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.saved_leads.append(payload)
+        return web.json_response({"status": "success", "data": {"linkedinProfileUrl": payload.get("linkedinProfileUrl")}})
+
+    async def linkedin_create_post(self, request: web.Request) -> web.Response:
+        post_id = f"urn:li:share:{uuid.uuid4().int % 10**19}"
+        self.posts.insert(0, {**await request.json(), "id": post_id})
+        return web.json_response({}, status=201, headers={"x-restli-id": post_id})
+
+    async def linkedin_list_posts(self, request: web.Request) -> web.Response:
+        count = int(request.query.get("count", "10"))
+        return web.json_response({"elements": self.posts[:count]})
+
+    async def linkedin_assets(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if request.query.get("action") == "completeMultiPartUpload":
+            parts = body["completeMultipartUploadRequest"]["partUploadResponses"]
+            if not all(part["headers"].get("ETag") for part in parts):
+                raise web.HTTPBadRequest(text="Missing part ETag")
+            return web.json_response({})
+
+        register = body["registerUploadRequest"]
+        asset_id = uuid.uuid4().hex
+        upload_url = f"{request.url.origin()}/linkedin/upload/{asset_id}"
+        if "MULTIPART_UPLOAD" in register.get("supportedUploadMechanism", []):
+            size, part_bytes = register["fileSize"], self.config.upload_part_bytes
+            mechanism = {
+                "com.linkedin.digitalmedia.uploading.MultipartUpload": {
+                    "metadata": asset_id,
+                    "partUploadRequests": [
+                        {
+                            "url": f"{upload_url}-{first // part_bytes}",
+                            "byteRange": {"firstByte": first, "lastByte": min(size, first + part_bytes) - 1},
+                            "headers": {"Content-Type": "application/octet-stream"},
+                        }
+                        for first in range(0, size, part_bytes)
+                    ],
+                }
+            }
+        else:
+            mechanism = {
+                "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                    "uploadUrl": upload_url,
+                    "headers": {"media-type-family": "STILLIMAGE"},
+                }
+            }
+        return web.json_response(
+            {
+                "value": {
+                    "asset": f"urn:li:digitalmediaAsset:{asset_id}",
+                    "mediaArtifact": f"urn:li:digitalmediaMediaArtifact:(urn:li:digitalmediaAsset:{asset_id},{register['recipes'][0]})",
+                    "uploadMechanism": mechanism,
+                }
+            }
+        )
+
+    async def linkedin_upload(self, request: web.Request) -> web.Response:
+        upload_id = request.match_info["upload_id"]
+        async for chunk in request.content.iter_chunked(64 * 1024):
+            self.stats.uploaded_bytes[upload_id] += len(chunk)
+        return web.Response(status=201, headers={"ETag": f'"{upload_id}"'})
+
+    def requests_per_job(self) -> float | None:
+        if not self.stats.jobs_launched:
+            return None
+        return sum(self.stats.requests_per_job.values()) / self.stats.jobs_launched
+
+
+async def start_fake_providers(config: FakeProviderConfig, host: str = "127.0.0.1", port: int = 0) -> tuple[FakeProviders, web.AppRunner, str]:
+    """Starts the fakes and returns them with their runner and base URL."""
+    fakes = FakeProviders(config)
+    runner = web.AppRunner(fakes.create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return fakes, runner, f"http://{host}:{bound_port}"
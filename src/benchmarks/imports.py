@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+from src.registry import GROUPS
+
+# Measures worker cold start: the time a fresh interpreter takes to import
+# src.services and load the enabled provider groups, for each group on its own
+# and for all of them. Each run is a new process; `-X importtime` attributes
+# the time to the slowest imports.
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import src.services
+from src.registry import enabled_groups, load_groups
+workflows, functions = load_groups(enabled_groups())
+import sys
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": len(sys.modules), "workflows": len(workflows), "functions": len(functions)}))
+"""
+
+
+def group_configs() -> dict[str, list[str]]:
+    """Each group with whatever it requires, plus every group together."""
+    configs = {name: [*group.requires, name] for name, group in GROUPS.items()}
+    configs["all"] = list(GROUPS)
+    return configs
+
+
+def slowest_imports(importtime: str, top: int, depth: int) -> list[tuple[str, float]]:
+    """Imports nested at most `depth` levels deep, by cumulative seconds, from `-X importtime` output."""
+    imports = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level under the module that triggered them.
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level <= depth:
+            imports.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure(groups: list[str], runs: int, top: int, depth: int) -> dict[str, Any]:
+    env = {**os.environ, "SERVICE_PROVIDERS": ",".join(groups)}
+    # Listed groups refuse to load without their settings; any value will do for an import.
+    env.update({var: env.get(var) or "benchmark" for name in groups for var in GROUPS[name].settings})
+    samples, slowest = [], []
+    for _ in range(runs):
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD], env=env, capture_output=True, text=True, check=True
+        )
+        sample = json.loads(child.stdout.strip().splitlines()[-1])
+        samples.append(sample)
+        if sample["seconds"] == min(s["seconds"] for s in samples):
+            slowest = slowest_imports(child.stderr, top, depth)
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "groups": groups,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "modules": samples[-1]["modules"],
+        "workflows": samples[-1]["workflows"],
+        "functions": samples[-1]["functions"],
+        "slowest_imports": slowest,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure worker import time per enabled provider group.")
+    parser.add_argument("configs", nargs="*", help=f"Configurations to measure (default: all of {', '.join(group_configs())})")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per configuration; the best run is reported")
+    parser.add_argument("--top", type=int, default=8, help="How many of the slowest imports to list")
+    parser.add_argument("--depth", type=int, default=3, help="How deeply nested an import may be to be listed")
+    parser.add_argument("--max-ms", type=float, default=None, help="Exit non-zero if any configuration's best run is slower")
+    args = parser.parse_args()
+
+    configs = group_configs()
+    over_budget = []
+    for name in args.configs or configs:
+        if name not in configs:
+            parser.error(f"Unknown configuration {name}")
+        result = measure(configs[name], args.runs, args.top, args.depth)
+        print(
+            f"{name:<14} {result['min_seconds'] * 1000:8.1f} ms best, {result['median_seconds'] * 1000:8.1f} ms median, "
+            f"{result['modules']} modules, {result['workflows']} workflows, {result['functions']} functions"
+        )
+        for module, seconds in result["slowest_imports"]:
+            print(f"    {module:<48} {seconds * 1000:8.1f} ms")
+        if args.max_ms is not None and result["min_seconds"] * 1000 > args.max_ms:
+            over_budget.append(name)
+
+    if over_budget:
+        sys.exit(f"Over the {args.max_ms:g} ms import budget: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from src.utils.records import decode_posts
+
+# Compares decoding provider post payloads into plain dicts (json.loads, as the
+# functions return them today) with decoding into Post structs. Reports the
+# best-of-N decode time and the memory the decoded records retain.
+
+
+def brightdata_posts(count: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "url": f"https://www.linkedin.com/posts/bench-{i}",
+                "id": str(7_000_000_000 + i),
+                "user_id": "bench",
+                "use_url": "https://www.linkedin.com/in/bench/",
+                "title": f"Post {i}",
+                "headline": "Engineer at Example",
+                "post_text": f"Post number {i} about benchmarks. " * 8,
+                "date_posted": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00.000Z",
+                "num_likes": i % 500,
+                "num_comments": i % 40,
+                "hashtags": ["#benchmarks", "#python"],
+                "embedded_links": [],
+            }
+            for i in range(count)
+        ]
+    ).encode()
+
+
+def phantombuster_container(count: int) -> bytes:
+    """A v2/containers/fetch response whose resultObject is JSON encoded inside JSON."""
+    records = [
+        {
+            "postUrl": f"https://www.linkedin.com/feed/update/urn:li:activity:{7_000_000_000 + i}",
+            "profileUrl": "https://www.linkedin.com/in/bench/",
+            "postContent": f"Post number {i} about benchmarks. " * 8,
+            "postTimestamp": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00.000Z",
+            "likeCount": i % 500,
+            "commentCount": i % 40,
+            "type": "Text",
+            "action": "Post",
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"id": "bench", "status": "finished", "resultObject": json.dumps(records)}).encode()
+
+
+def decode_dicts_brightdata(payload: bytes) -> list[dict[str, Any]]:
+    return json.loads(payload)
+
+
+def decode_structs_brightdata(payload: bytes) -> list[Any]:
+    return decode_posts("brightdata", payload)
+
+
+def decode_dicts_phantombuster(payload: bytes) -> list[dict[str, Any]]:
+    return json.loads(json.loads(payload)["resultObject"])
+
+
+def decode_structs_phantombuster(payload: bytes) -> list[Any]:
+    return decode_posts("phantombuster", json.loads(payload)["resultObject"])
+
+
+def best_time(decode: Callable[[bytes], list], payload: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(payload)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def retained_bytes(decode: Callable[[bytes], list], payload: bytes) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = decode(payload)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark decoding post payloads into dicts vs Post structs.")
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = {
+        "brightdata": (brightdata_posts(args.posts), decode_dicts_brightdata, decode_structs_brightdata),
+        "phantombuster": (phantombuster_container(args.posts), decode_dicts_phantombuster, decode_structs_phantombuster),
+    }
+    print(f"{args.posts} posts, best of {args.repeat}")
+    print(f"{'payload':<15}{'decoder':<9}{'decode ms':>11}{'bytes/record':>14}")
+    for name, (payload, decode_dicts, decode_structs) in cases.items():
+        for label, decode in (("dicts", decode_dicts), ("structs", decode_structs)):
+            seconds = best_time(decode, payload, args.repeat)
+            per_record = retained_bytes(decode, payload) / args.posts
+            print(f"{name:<15}{label:<9}{seconds * 1000:>11.1f}{per_record:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from src.benchmarks.fakes import FakeProviderConfig, start_fake_providers
+
+# Load benchmark for the provider functions. Starts the fake providers, points
+# the real functions in src/functions at them and drives N concurrent calls,
+# then reports throughput, latency percentiles, provider requests per job and
+# peak RSS. Results are saved as JSON so runs can be compared across commits.
+# The `-steps` targets drive the launch, status and fetch functions the
+# workflows run, on the workflows' poll schedule and retry policies, and also
+# report step retries and Phantombuster agent lease behaviour.
+
+# Target name -> (function module, function name, input factory given the call index).
+TARGETS: dict[str, tuple[str, str, Callable[[Any, int], Any]]] = {
+    "brightdata-profile": (
+        "src.functions.brightdata.get_linkedin_profile",
+        "get_linkedin_profile_brightdata",
+        lambda module, i: module.GetProfileInput(profile_url=f"https://www.linkedin.com/in/bench-{i}/", force_refresh=True),
+    ),
+    "brightdata-posts": (
+        "src.functions.brightdata.get_linkedin_profile_posts",
+        "get_linkedin_profile_posts_brightdata",
+        lambda module, i: module.GetProfilePostsInput(profile_url=f"https://www.linkedin.com/in/bench-{i}/", force_refresh=True),
+    ),
+    "phantombuster-profile": (
+        "src.functions.phantombuster.get_linkedin_profile",
+        "get_linkedin_profile_phantombuster",
+        lambda module, i: module.GetProfileInput(profile_url=f"https://www.linkedin.com/in/bench-{i}/", force_refresh=True),
+    ),
+    "phantombuster-posts": (
+        "src.functions.phantombuster.get_linkedin_profile_posts",
+        "get_linkedin_profile_posts_phantombuster",
+        lambda module, i: module.GetProfilePostsInput(profile_url=f"https://www.linkedin.com/in/bench-{i}/", force_refresh=True),
+    ),
+    "phantombuster-lead": (
+        "src.functions.phantombuster.save_linkedin_lead",
+        "save_linkedin_lead_phantombuster",
+        lambda module, i: module.SaveLeadInput(linkedin_profile_url=f"https://www.linkedin.com/in/bench-{i}/"),
+    ),
+    "linkedin-post": (
+        "src.functions.linkedin.create_post",
+        "create_post_on_linkedin",
+        lambda module, i: module.CreatePostInput(text=f"Benchmark post {i}"),
+    ),
+}
+
+# Target name -> (provider, data kind), run as launch, status checks and fetch.
+STEP_TARGETS: dict[str, tuple[str, str]] = {
+    "brightdata-profile-steps": ("brightdata", "profile"),
+    "brightdata-posts-steps": ("brightdata", "posts"),
+    "phantombuster-profile-steps": ("phantombuster", "profile"),
+    "phantombuster-posts-steps": ("phantombuster", "posts"),
+}
+
+
+def configure_environment(base_url: str, agents: int, unthrottled: bool, data_dir: str) -> None:
+    """Points the functions at the fakes. Must run before any src.functions module is imported."""
+    os.environ.update(
+        {
+            "BRIGHT_DATA_API_URL": f"{base_url}/brightdata",
+            "PHANTOMBUSTER_API_URL": f"{base_url}/phantombuster",
+            "LINKEDIN_API_URL": f"{base_url}/linkedin",
+            "BRIGHT_DATA_API_TOKEN": "benchmark",
+            "BRIGHT_DATA_REACTIONS_DATASET_ID": "benchmark-reactions",
+            "PHANTOMBUSTER_API_KEY": "benchmark",
+            "LINKEDIN_ACCESS_TOKEN": "benchmark",
+            "LINKEDIN_AUTHOR_URN": "urn:li:person:benchmark",
+            "LINKEDIN_SESSION_COOKIE": "benchmark",
+            "LINKEDIN_MCP_DATA_DIR": data_dir,
+        }
+    )
+    for kind in ("profile", "posts", "reactions"):
+        os.environ[f"PHANTOMBUSTER_{kind.upper()}_AGENT_POOL"] = ",".join(f"bench-{kind}-{i}" for i in range(agents))
+    # Completion webhooks would need a running workflow to signal.
+    os.environ.pop("WEBHOOK_BASE_URL", None)
+    if unthrottled:
+        for provider in ("BRIGHTDATA", "PHANTOMBUSTER", "LINKEDIN"):
+            os.environ[f"RATE_LIMIT_{provider}_PER_SECOND"] = "1000000"
+            os.environ[f"RATE_LIMIT_{provider}_BURST"] = "1000000"
+
+
+async def with_retries(call: Callable[[], Awaitable[Any]], policy: Any, retries: Counter, step: str) -> Any:
+    """Awaits `call`, retrying a RetryableError on `policy`'s schedule as a workflow step would."""
+    from restack_ai.function import RetryableError
+
+    delay = policy.initial_interval.total_seconds()
+    attempt = 1
+    while True:
+        try:
+            return await call()
+        except RetryableError:
+            if policy.maximum_attempts and attempt >= policy.maximum_attempts:
+                raise
+        retries[step] += 1
+        await asyncio.sleep(delay)
+        delay = min(delay * policy.backoff_coefficient, policy.maximum_interval.total_seconds())
+        attempt += 1
+
+
+async def run_job_steps(provider: str, kind: str, profile_url: str, retries: Counter) -> Any:
+    """Runs one scrape the way its workflow does, with sleeps in place of workflow timers."""
+    from src.utils.polling import PollPolicy, PollTimeoutError, next_delay
+    from src.workflows.job_polling import FETCH_RETRY_POLICY, LAUNCH_RETRY_POLICY, STATUS_RETRY_POLICY
+
+    launch_module = importlib.import_module(f"src.functions.{provider}.launch_scrape")
+    status_module = importlib.import_module(f"src.functions.{provider}.get_scrape_status")
+    fetch_module = importlib.import_module(f"src.functions.{provider}.fetch_scrape_result")
+    launch = getattr(launch_module, f"launch_scrape_{provider}")
+    get_status = getattr(status_module, f"get_scrape_status_{provider}")
+    fetch = getattr(fetch_module, f"fetch_scrape_result_{provider}")
+    job_field = "snapshot_id" if provider == "brightdata" else "container_id"
+
+    started_at = time.monotonic()
+    launched = await with_retries(
+        lambda: launch(launch_module.LaunchScrapeInput(profile_url=profile_url, kind=kind, force_refresh=True)),
+        LAUNCH_RETRY_POLICY,
+        retries,
+        "launch",
+    )
+    job_id = launched[job_field]
+
+    policy = PollPolicy()
+    expected = launched["expected_seconds"]
+    backoff_attempt = 0
+    while True:
+        elapsed = time.monotonic() - started_at
+        if elapsed >= policy.deadline:
+            raise PollTimeoutError(f"Job {job_id} did not finish within {policy.deadline:.0f}s")
+        await asyncio.sleep(next_delay(policy, backoff_attempt, elapsed, expected))
+        if expected is None or elapsed >= expected * policy.expected_margin:
+            backoff_attempt += 1
+        status = await with_retries(
+            lambda: get_status(status_module.ScrapeStatusInput(**{job_field: job_id})), STATUS_RETRY_POLICY, retries, "status"
+        )
+        if status["done"]:
+            break
+
+    return await with_retries(
+        lambda: fetch(
+            fetch_module.FetchScrapeResultInput(
+                **{job_field: job_id}, profile_url=profile_url, kind=kind, elapsed_seconds=time.monotonic() - started_at
+            )
+        ),
+        FETCH_RETRY_POLICY,
+        retries,
+        "fetch",
+    )
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_benchmark(target: str, calls: int, concurrency: int, config: FakeProviderConfig, agents: int, unthrottled: bool) -> dict[str, Any]:
+    fakes, runner, base_url = await start_fake_providers(config)
+    data_dir = tempfile.mkdtemp(prefix="linkedin-mcp-bench-")
+    configure_environment(base_url, agents, unthrottled, data_dir)
+
+    step_retries: Counter = Counter()
+    if target in STEP_TARGETS:
+        provider, kind = STEP_TARGETS[target]
+
+        def job(i: int) -> Awaitable[Any]:
+            return run_job_steps(provider, kind, f"https://www.linkedin.com/in/bench-{i}/", step_retries)
+
+    else:
+        module_name, function_name, build_input = TARGETS[target]
+        module = importlib.import_module(module_name)
+        fn = getattr(module, function_name)
+
+        def job(i: int) -> Awaitable[Any]:
+            return fn(build_input(module, i))
+
+    from src.utils.http import close_http_clients
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async def call(i: int) -> None:
+        async with semaphore:
+            started_at = time.monotonic()
+            try:
+                await job(i)
+            except Exception as e:
+                key = type(e).__name__
+                errors[key] = errors.get(key, 0) + 1
+            else:
+                latencies.append(time.monotonic() - started_at)
+
+    try:
+        started_at = time.monotonic()
+        await asyncio.gather(*(call(i) for i in range(calls)))
+        wall_seconds = time.monotonic() - started_at
+    finally:
+        await close_http_clients()
+        await runner.cleanup()
+
+    agent_pool = None
+    if target in STEP_TARGETS and STEP_TARGETS[target][0] == "phantombuster":
+        from src.functions.phantombuster.agent_pool import get_agent_pool
+
+        agent_pool = get_agent_pool(STEP_TARGETS[target][1]).snapshot()
+
+    return {
+        "target": target,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "calls": calls,
+        "concurrency": concurrency,
+        "agents": agents,
+        "unthrottled": unthrottled,
+        "fake_provider": asdict(config),
+        "succeeded": len(latencies),
+        "errors": errors,
+        "wall_seconds": wall_seconds,
+        "throughput_per_second": len(latencies) / wall_seconds if wall_seconds else None,
+        "latency_seconds": {
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies, default=None),
+        },
+        "provider_requests": sum(fakes.stats.requests.values()),
+        "provider_requests_per_job": fakes.requests_per_job(),
+        "provider_responses": {str(status): count for status, count in sorted(fakes.stats.responses.items())},
+        "step_retries": dict(step_retries),
+        "agent_pool": agent_pool,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def format_report(result: dict[str, Any], baseline: dict[str, Any] | None = None) -> str:
+    def metric(label: str, value: Any, previous: Any, unit: str = "") -> str:
+        line = f"{label:<28} {value:>12.3f}{unit}" if isinstance(value, float) else f"{label:<28} {value!s:>12}{unit}"
+        if isinstance(value, (int, float)) and isinstance(previous, (int, float)) and previous:
+            line += f"   ({(value - previous) / previous:+.1%} vs {baseline['commit']})"
+        return line
+
+    baseline = baseline or {}
+    latency = result["latency_seconds"]
+    previous_latency = baseline.get("latency_seconds", {})
+    lines = [
+        f"{result['target']} @ {result['commit']}: {result['calls']} calls, concurrency {result['concurrency']}",
+        metric("succeeded", result["succeeded"], baseline.get("succeeded")),
+        metric("errors", sum(result["errors"].values()), None) + (f"   {result['errors']}" if result["errors"] else ""),
+        metric("throughput", result["throughput_per_second"], baseline.get("throughput_per_second"), "/s"),
+        *(metric(f"latency {q}", latency[q], previous_latency.get(q), "s") for q in ("p50", "p95", "p99")),
+        metric("provider requests per job", result["provider_requests_per_job"], baseline.get("provider_requests_per_job")),
+        metric("provider responses", result["provider_responses"], None),
+        *([metric("step retries", result["step_retries"], None)] if result.get("step_retries") else []),
+        *(
+            [
+                metric("agent busy rejections", pool["busy_rejections"], (baseline.get("agent_pool") or {}).get("busy_rejections")),
+                metric("agent utilization", pool["utilization"], (baseline.get("agent_pool") or {}).get("utilization")),
+            ]
+            if (pool := result.get("agent_pool"))
+            else []
+        ),
+        metric("peak RSS", result["peak_rss_bytes"] / 2**20, (baseline.get("peak_rss_bytes") or 0) / 2**20, " MiB"),
+    ]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark provider functions against local fake providers.")
+    parser.add_argument("target", choices=sorted([*TARGETS, *STEP_TARGETS]))
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=None, help="Phantombuster agents per pool (default: concurrency)")
+    parser.add_argument("--job-seconds", type=float, default=FakeProviderConfig.job_seconds)
+    parser.add_argument("--payload-bytes", type=int, default=FakeProviderConfig.payload_bytes)
+    parser.add_argument("--error-rate", type=float, default=FakeProviderConfig.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=FakeProviderConfig.rate_limit_rate)
+    parser.add_argument("--retry-after", type=float, default=FakeProviderConfig.retry_after)
+    parser.add_argument("--response-delay", type=float, default=FakeProviderConfig.response_delay)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--unthrottled", action="store_true", help="Disable the client-side rate limiter")
+    parser.add_argument("--output", type=Path, default=Path(".data/benchmarks"), help="Directory to save the result JSON in")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Keep the functions' info logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("restack").setLevel(logging.WARNING)
+
+    config = FakeProviderConfig(
+        job_seconds=args.job_seconds,
+        payload_bytes=args.payload_bytes,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        response_delay=args.response_delay,
+        seed=args.seed,
+    )
+    result = asyncio.run(
+        run_benchmark(args.target, args.calls, args.concurrency, config, args.agents or args.concurrency, args.unthrottled)
+    )
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(format_report(result, baseline))
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{result['target']}-{result['commit']}-{int(time.time())}.json"
+    path.write_text(json.dumps(result, indent=2))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
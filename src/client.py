@@ -1,11 +1,12 @@
 import os
 
-from dotenv import load_dotenv
 from restack_ai import Restack
 from restack_ai.restack import CloudConnectionOptions
 
+from src.utils.settings import load_settings
+
 # Load environment variables from a .env file
-load_dotenv()
+load_settings()
 
 
 engine_id = os.getenv("RESTACK_ENGINE_ID")
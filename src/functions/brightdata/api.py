@@ -0,0 +1,116 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from restack_ai.function import log
+
+from src.utils.http import get_http_client
+from src.utils.metrics import current_function, download_bytes, job_launches
+
+# Thin async client for the Bright Data datasets API. Everything goes through the
+# pooled httpx client so no synchronous SDK call ever runs on the event loop.
+
+# Overridable so benchmarks can point the real functions at a local stand-in.
+BRIGHT_DATA_API_URL = os.environ.get("BRIGHT_DATA_API_URL", "https://api.brightdata.com/datasets/v3")
+
+DATASET_IDS = {
+    "profile": os.environ.get("BRIGHT_DATA_PROFILE_DATASET_ID", "gd_l1viktl72bvl7bjuj0"),
+    "post": os.environ.get("BRIGHT_DATA_POST_DATASET_ID", "gd_lyy3tktm25m4avu764"),
+    # No public default: set this to a dataset that takes a post URL and returns its reactions.
+    "reactions": os.environ.get("BRIGHT_DATA_REACTIONS_DATASET_ID"),
+}
+
+
+class SnapshotNotReadyError(RuntimeError):
+    """A snapshot asked for before Bright Data has finished building its download."""
+
+
+@dataclass
+class DownloadStats:
+    """Totals for snapshot downloads in this worker."""
+
+    downloads: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def record(self, size: int, duration: float) -> None:
+        self.downloads += 1
+        self.bytes += size
+        self.seconds += duration
+
+
+download_stats = DownloadStats()
+
+
+def build_headers(api_token: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_token}",
+        "Content-Type": "application/json",
+    }
+
+
+async def trigger_snapshot(
+    api_token: str,
+    dataset_id: str,
+    inputs: list[dict[str, Any]],
+    **params: str,
+) -> str:
+    """Starts a collection job and returns its snapshot ID without waiting for the result."""
+    client = get_http_client("brightdata")
+    response = await client.post(
+        f"{BRIGHT_DATA_API_URL}/trigger",
+        headers=build_headers(api_token),
+        params={"dataset_id": dataset_id, "include_errors": "true", **params},
+        json=inputs,
+    )
+    response.raise_for_status()
+
+    snapshot_id = response.json().get("snapshot_id")
+    if not snapshot_id:
+        raise ValueError(f"Bright Data trigger response has no snapshot_id: {response.text}")
+    job_launches.inc(provider="brightdata", function=current_function())
+    log.info(f"Bright Data snapshot {snapshot_id} triggered for {len(inputs)} input(s)")
+    return snapshot_id
+
+
+async def get_snapshot_progress(api_token: str, snapshot_id: str) -> dict[str, Any]:
+    """Returns a snapshot's status ("starting", "running", "ready" or "failed") without its data."""
+    client = get_http_client("brightdata")
+    response = await client.get(
+        f"{BRIGHT_DATA_API_URL}/progress/{snapshot_id}",
+        headers=build_headers(api_token),
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def cancel_snapshot(api_token: str, snapshot_id: str) -> None:
+    """Stops a snapshot that is still collecting."""
+    client = get_http_client("brightdata")
+    response = await client.post(
+        f"{BRIGHT_DATA_API_URL}/snapshot/{snapshot_id}/cancel",
+        headers=build_headers(api_token),
+    )
+    response.raise_for_status()
+
+
+async def download_snapshot(api_token: str, snapshot_id: str) -> Any:
+    """Downloads a finished snapshot once and records its size and duration."""
+    client = get_http_client("brightdata")
+    started_at = time.monotonic()
+    response = await client.get(
+        f"{BRIGHT_DATA_API_URL}/snapshot/{snapshot_id}",
+        headers=build_headers(api_token),
+        params={"format": "json"},
+    )
+    if response.status_code == 202:
+        raise SnapshotNotReadyError(f"Bright Data snapshot {snapshot_id} is not ready for download")
+    response.raise_for_status()
+
+    duration = time.monotonic() - started_at
+    size = len(response.content)
+    download_stats.record(size, duration)
+    download_bytes.inc(size, provider="brightdata", function=current_function())
+    log.info(f"Downloaded Bright Data snapshot {snapshot_id}", bytes=size, seconds=round(duration, 3))
+    return response.json()
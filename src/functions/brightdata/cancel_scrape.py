@@ -0,0 +1,86 @@
+import os
+from typing import Any, Literal
+
+import httpx
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import cancel_snapshot
+from src.utils.cache import scrape_jobs_in_flight
+from src.utils.metrics import pop_status_checks
+from src.utils.rate_limit import is_transient
+from src.utils.urls import canonical_scrape_url
+
+# Changes to this file should also be reflected in the Phantombuster version
+
+
+class CancelScrapeInput(BaseModel):
+    """Input parameters for stopping a Bright Data snapshot nobody is waiting for."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    snapshot_id: str = Field(
+        ...,
+        title="Snapshot ID",
+        description="The snapshot returned by launch_scrape_brightdata.",
+    )
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile the snapshot was triggered for.",
+    )
+    kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What was being scraped.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("cancel_scrape_brightdata function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def cancel_scrape_brightdata(function_input: CancelScrapeInput) -> dict[str, Any]:
+    """Cancels a snapshot whose workflow was cancelled.
+
+    A snapshot that other launches joined keeps running until the last of
+    them is cancelled too. Bright Data
+    refuses to cancel a snapshot that already finished, which is not an error
+    here.
+    """
+    try:
+        api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
+        if not api_token:
+            raise_exception("BRIGHT_DATA_API_TOKEN is not set")
+
+        snapshot_id = function_input.snapshot_id
+        key = ("brightdata", function_input.kind, canonical_scrape_url(function_input.profile_url, function_input.kind))
+        if not scrape_jobs_in_flight.leave(key, snapshot_id):
+            log.info(f"Leaving snapshot {snapshot_id} running for the other launches waiting on it")
+            return {"cancelled": False}
+
+        try:
+            await cancel_snapshot(api_token, snapshot_id)
+        except httpx.HTTPStatusError as e:
+            if is_transient(e):
+                raise
+            log.warning(f"Could not cancel snapshot {snapshot_id}: {e}")
+        pop_status_checks("brightdata", snapshot_id)
+
+    except NonRetryableError:
+        raise
+    except Exception as e:
+        error_message = f"cancel_scrape_brightdata failed: {e}"
+        if is_transient(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Cancelled Bright Data snapshot {snapshot_id}")
+        return {"cancelled": True}
@@ -0,0 +1,109 @@
+import asyncio
+import os
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import SnapshotNotReadyError, download_snapshot
+from src.utils.blobs import claim_check, claim_checked
+from src.utils.cache import scrape_cache, scrape_jobs_in_flight
+from src.utils.metrics import pop_status_checks, record_job_completion
+from src.utils.polling import durations
+from src.utils.rate_limit import is_transient
+from src.utils.urls import canonical_scrape_url
+from src.utils.watermarks import apply_watermark
+from src.utils.webhooks import current_workflow
+
+
+class FetchScrapeResultInput(BaseModel):
+    """Input parameters for downloading a finished Bright Data snapshot."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    snapshot_id: str = Field(
+        ...,
+        title="Snapshot ID",
+        description="The snapshot returned by launch_scrape_brightdata.",
+    )
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile the snapshot was started for, or of the post for `reactions`.",
+    )
+    kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What was scraped: the profile itself, its posts, or the reactions on one post.",
+    )
+    incremental: bool = Field(
+        False,
+        title="Incremental",
+        description="For posts, return only posts newer than the profile's watermark.",
+    )
+    since: str | None = Field(
+        None,
+        title="Since",
+        description="The start date the snapshot was limited to, if launch_scrape_brightdata set one. Such partial results are not cached.",
+    )
+    elapsed_seconds: float | None = Field(
+        None,
+        title="Elapsed Seconds",
+        description="How long the snapshot took, used to learn when to first check the next one.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("fetch_scrape_result_brightdata function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+@claim_checked
+async def fetch_scrape_result_brightdata(function_input: FetchScrapeResultInput) -> Any:
+    """Downloads a ready snapshot.
+
+    The snapshot is finished and paid for, so network errors, 5xx and 429
+    responses and a download that is still being built are retryable. Other
+    4xx responses are not.
+    """
+    try:
+        api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
+        if not api_token:
+            raise_exception("BRIGHT_DATA_API_TOKEN is not set")
+
+        kind = function_input.kind
+        profile_url = canonical_scrape_url(function_input.profile_url, kind)
+        log.info(f"Snapshot {function_input.snapshot_id} is ready. Downloading result.")
+        result = await download_snapshot(api_token, function_input.snapshot_id)
+
+        if not result:
+            raise_exception("Failed to download data from Bright Data snapshot.")
+        if kind == "reactions" and not isinstance(result, list):
+            result = [result]
+
+        if not function_input.since:
+            await asyncio.to_thread(scrape_cache.set, "brightdata", kind, profile_url, result)
+            scrape_jobs_in_flight.finish(("brightdata", kind, profile_url))
+        status_checks = pop_status_checks("brightdata", function_input.snapshot_id)
+        if function_input.elapsed_seconds is not None:
+            durations.record(f"brightdata:{kind}", function_input.elapsed_seconds)
+            record_job_completion(f"brightdata:{kind}", function_input.elapsed_seconds, status_checks)
+        if function_input.incremental and kind == "posts":
+            result = apply_watermark("brightdata", profile_url, result, run=current_workflow())
+        if kind == "reactions":
+            # Gathered post by post into one profile result, so never inline.
+            result = claim_check(result, always=True)
+
+    except Exception as e:
+        error_message = f"fetch_scrape_result_brightdata failed: {e}"
+        if is_transient(e) or isinstance(e, SnapshotNotReadyError):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Successfully scraped {kind} for {profile_url}")
+        return result
@@ -1,10 +1,19 @@
 import os
 from typing import Any
-from dotenv import load_dotenv
-import asyncio
 from pydantic import BaseModel, Field
-from restack_ai.function import NonRetryableError, function, log
-from brightdata import bdclient
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import (
+    DATASET_IDS,
+    download_snapshot,
+    get_snapshot_progress,
+    trigger_snapshot,
+)
+from src.utils.blobs import claim_checked
+from src.utils.cache import cached_scrape
+from src.utils.polling import poll_until
+from src.utils.rate_limit import is_rate_limited
+from src.utils.urls import canonical_profile_url
 
 # Changes to this file should also be reflected in the Phantombuster version
 
@@ -25,6 +34,16 @@ class GetProfileInput(BaseModel):
         description="The URL of the LinkedIn profile.",
         example="https://www.linkedin.com/in/williamhgates/",
     )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
 
 
 def raise_exception(message: str) -> None:
@@ -33,47 +52,47 @@ def raise_exception(message: str) -> None:
 
 
 @function.defn()
+@claim_checked
+@cached_scrape("brightdata", "profile")
 async def get_linkedin_profile_brightdata(function_input: GetProfileInput) -> dict[str, Any]:
     try:
         api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
         if not api_token:
             raise_exception("BRIGHT_DATA_API_TOKEN is not set")
 
-        bd = bdclient(api_token)
-        log.info(f"Initiating scrape for {function_input.profile_url}")
-
-        initial_response = bd.scrape_linkedin.profiles(function_input.profile_url, sync=True)
-
-        snapshot_id = initial_response.get("snapshot_id")
-        if not snapshot_id:
-            log.info("Received synchronous response for profile from Bright Data.")
-            return initial_response
-
+        profile_url = canonical_profile_url(function_input.profile_url)
+        log.info(f"Initiating scrape for {profile_url}")
+        snapshot_id = await trigger_snapshot(api_token, DATASET_IDS["profile"], [{"url": profile_url}])
         log.info(f"Scrape initiated. Snapshot ID: {snapshot_id}")
 
-        while True:
+        async def check_status() -> dict[str, Any]:
             log.info(f"Checking status for snapshot {snapshot_id}...")
-            status_response = await asyncio.to_thread(bd.download_snapshot, snapshot_id=snapshot_id)
-            
+            status_response = await get_snapshot_progress(api_token, snapshot_id)
+
             status = status_response.get("status")
             log.info(f"Snapshot status: {status}")
 
-            if status == "done":
-                break
-            elif status == "failed":
+            if status == "failed":
                 raise_exception(f"Bright Data snapshot {snapshot_id} failed. Details: {status_response}")
-            
-            await asyncio.sleep(5)
-        
+            return status_response
+
+        await poll_until(
+            check_status,
+            lambda status_response: status_response.get("status") == "ready",
+            key="brightdata:profile",
+        )
+
         log.info(f"Snapshot {snapshot_id} is ready. Downloading result.")
-        profile_data = await asyncio.to_thread(bd.download_snapshot, snapshot_id=snapshot_id)
+        profile_data = await download_snapshot(api_token, snapshot_id)
 
         if not profile_data:
             raise_exception("Failed to download profile data from Bright Data snapshot.")
 
     except Exception as e:
         error_message = f"get_linkedin_profile_brightdata failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
         raise NonRetryableError(error_message) from e
     else:
-        log.info(f"Successfully scraped profile for {function_input.profile_url}")
+        log.info(f"Successfully scraped profile for {profile_url}")
         return profile_data
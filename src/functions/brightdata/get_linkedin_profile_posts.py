@@ -1,12 +1,20 @@
 import os
 from typing import Any
-from dotenv import load_dotenv
-import asyncio
 from pydantic import BaseModel, Field
-from restack_ai.function import NonRetryableError, function, log
-from brightdata import bdclient
-
-load_dotenv()
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import (
+    DATASET_IDS,
+    download_snapshot,
+    get_snapshot_progress,
+    trigger_snapshot,
+)
+from src.utils.blobs import claim_checked
+from src.utils.cache import cached_scrape
+from src.utils.polling import poll_until
+from src.utils.rate_limit import is_rate_limited
+from src.utils.urls import canonical_profile_url
+from src.utils.watermarks import incremental_posts, start_date
 
 
 class GetProfilePostsInput(BaseModel):
@@ -25,6 +33,21 @@ class GetProfilePostsInput(BaseModel):
         description="The URL of the LinkedIn profile's post section.",
         example="https://www.linkedin.com/in/williamhgates/recent-activity/all/",
     )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
+    incremental: bool = Field(
+        False,
+        title="Incremental",
+        description="Return only posts newer than the ones earlier incremental scrapes of this profile returned.",
+    )
 
 
 def raise_exception(message: str) -> None:
@@ -32,61 +55,60 @@ def raise_exception(message: str) -> None:
     raise NonRetryableError(message)
 
 
-def construct_activity_url(profile_url: str) -> str:
-    """Constructs the recent activity URL from a base profile URL if necessary."""
-    if "recent-activity" not in profile_url:
-        # Ensure the URL ends with a slash before appending
-        if not profile_url.endswith('/'):
-            profile_url += '/'
-        return f"{profile_url}recent-activity/all/"
-    return profile_url
-
-
 @function.defn()
+@claim_checked
+@incremental_posts("brightdata")
+@cached_scrape("brightdata", "posts")
 async def get_linkedin_profile_posts_brightdata(function_input: GetProfilePostsInput) -> dict[str, Any]:
+    """Discovers a profile's posts, or for an incremental call only those since the profile's watermark."""
     try:
         api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
         if not api_token:
             raise_exception("BRIGHT_DATA_API_TOKEN is not set")
 
-        bd = bdclient(api_token)
-        
-        profile_url = function_input.profile_url.split('recent-activity')[0]
-        log.info(f"Initiating post discovery for profile {profile_url}")
-
-        initial_response = await asyncio.to_thread(
-            bd.search_linkedin.posts, profile_url=profile_url
+        profile_url = canonical_profile_url(function_input.profile_url)
+        since = start_date("brightdata", profile_url) if function_input.incremental else None
+        log.info(f"Initiating post discovery for profile {profile_url}", since=since)
+
+        scrape_input = {"url": profile_url}
+        if since:
+            scrape_input["start_date"] = since
+        snapshot_id = await trigger_snapshot(
+            api_token,
+            DATASET_IDS["post"],
+            [scrape_input],
+            type="discover_new",
+            discover_by="profile_url",
         )
-
-        snapshot_id = initial_response.get("snapshot_id")
-        if not snapshot_id:
-            log.info("Received synchronous response for posts from Bright Data.")
-            return initial_response
-
         log.info(f"Post discovery initiated. Snapshot ID: {snapshot_id}")
 
-        while True:
+        async def check_status() -> dict[str, Any]:
             log.info(f"Checking status for snapshot {snapshot_id}...")
-            status_response = await asyncio.to_thread(bd.download_snapshot, snapshot_id=snapshot_id)
-            
+            status_response = await get_snapshot_progress(api_token, snapshot_id)
+
             status = status_response.get("status")
             log.info(f"Snapshot status: {status}")
 
-            if status == "done":
-                break
-            elif status == "failed":
+            if status == "failed":
                 raise_exception(f"Bright Data snapshot {snapshot_id} failed. Details: {status_response}")
-            
-            await asyncio.sleep(5)
+            return status_response
+
+        await poll_until(
+            check_status,
+            lambda status_response: status_response.get("status") == "ready",
+            key="brightdata:posts",
+        )
 
         log.info(f"Snapshot {snapshot_id} is ready. Downloading result.")
-        posts_data = await asyncio.to_thread(bd.download_snapshot, snapshot_id=snapshot_id)
+        posts_data = await download_snapshot(api_token, snapshot_id)
 
         if not posts_data:
             raise_exception("Failed to download posts data from Bright Data snapshot.")
 
     except Exception as e:
         error_message = f"get_linkedin_profile_posts_brightdata failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
         raise NonRetryableError(error_message) from e
     else:
         log.info(f"Successfully discovered posts for {profile_url}")
@@ -1,16 +1,16 @@
-import os
+import asyncio
+from datetime import datetime, timezone
 from typing import Any
-import re
-from dotenv import load_dotenv
-import aiohttp
-from pydantic import BaseModel, Field, ValidationError
+
+from pydantic import BaseModel, Field
 from restack_ai.function import NonRetryableError, function, log
 
-load_dotenv()
+from src.utils.blobs import CLAIM_CHECK_KEY, claim_check, is_claim_check, read_blob, resolve
+from src.utils.records import Post, decode_posts
 
 
 class GetReactionsInput(BaseModel):
-    """Input parameters for getting a LinkedIn profile's reactions."""
+    """Input parameters for getting reactions on a LinkedIn profile's posts."""
 
     model_config = {
         "strict": True,
@@ -25,22 +25,136 @@ class GetReactionsInput(BaseModel):
         description="The URL of the LinkedIn profile.",
         example="https://www.linkedin.com/in/williamhgates/",
     )
+    max_posts: int = Field(
+        20,
+        title="Max Posts",
+        description="Collect reactions for at most this many of the most recent posts.",
+        ge=1,
+        le=500,
+    )
+    since: str | None = Field(
+        None,
+        title="Since",
+        description="Only collect reactions for posts published on or after this ISO 8601 date.",
+        example="2025-01-01",
+    )
+    concurrency: int = Field(
+        5,
+        title="Concurrency",
+        description="How many posts to collect reactions for at the same time.",
+        ge=1,
+        le=50,
+    )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept cached posts up to this many seconds old. Defaults to the cache TTL for posts.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always discover posts again.",
+    )
 
 
-def raise_exception(message: str) -> None:
-    log.error("get_linkedin_profile_reactions_brightdata function failed", error=message)
-    raise NonRetryableError(message)
+def parse_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
 
-@function.defn()
-async def get_linkedin_profile_reactions_brightdata(function_input: GetReactionsInput) -> dict[str, Any]:
-    """
-    NOTE: Scraping reactions is a complex, multi-step task (get posts, then get
-    reactions for each post) that requires a more advanced scraping solution.
-    This functionality is not implemented in this version.
+def select_posts(posts: list[Post], max_posts: int, since: str | None) -> list[str]:
+    """Returns the URLs of the newest posts within the `max_posts` / `since` bounds, newest first.
+
+    Posts without a date are kept when no `since` bound is given.
     """
-    log.warn("get_linkedin_profile_reactions_brightdata is not implemented.")
-    raise NonRetryableError(
-        "Scraping reactions from a LinkedIn profile is a premium feature "
-        "and is not yet supported in this implementation."
+    cutoff = parse_date(since) if since else None
+    dated = []
+    for post in posts:
+        posted_at = parse_date(post.posted_at) if post.posted_at else None
+        if cutoff is not None and (posted_at is None or posted_at < cutoff):
+            continue
+        dated.append((posted_at or datetime.min.replace(tzinfo=timezone.utc), post.url))
+
+    dated.sort(key=lambda item: item[0], reverse=True)
+    return list(dict.fromkeys(url for _, url in dated))[:max_posts]
+
+
+class SelectPostsInput(BaseModel):
+    """Input parameters for picking which discovered posts to collect reactions for."""
+
+    model_config = {
+        "extra": "forbid",
+        "validate_assignment": True,
+    }
+
+    posts: Any = Field(
+        ...,
+        title="Posts",
+        description="The posts workflow's result: a list of post records or a claim check for one.",
     )
+    max_posts: int = Field(..., title="Max Posts", ge=1)
+    since: str | None = Field(None, title="Since")
+
+
+@function.defn()
+async def select_reaction_posts_brightdata(function_input: SelectPostsInput) -> list[str]:
+    try:
+        # Decode a stored result straight from its bytes; error records are dropped.
+        if is_claim_check(function_input.posts):
+            posts = decode_posts("brightdata", read_blob(function_input.posts[CLAIM_CHECK_KEY]["digest"]))
+        else:
+            posts = decode_posts("brightdata", function_input.posts)
+        post_urls = select_posts(posts, function_input.max_posts, function_input.since)
+    except Exception as e:
+        error_message = f"select_reaction_posts_brightdata failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Selected {len(post_urls)} of {len(posts)} posts for reactions")
+        return post_urls
+
+
+class StoreReactionsInput(BaseModel):
+    """Input parameters for combining per-post reactions into one profile result."""
+
+    model_config = {
+        "extra": "forbid",
+        "validate_assignment": True,
+    }
+
+    profile_url: str = Field(..., title="LinkedIn Profile URL")
+    posts: list[str] = Field(..., title="Posts", description="The selected post URLs, newest first.")
+    reactions: dict[str, Any] = Field(
+        ...,
+        title="Reactions",
+        description="Each post's reactions, by post URL: a list of reaction records or a claim check for one.",
+    )
+    errors: dict[str, str] = Field(default_factory=dict, title="Errors")
+
+
+@function.defn()
+async def store_profile_reactions_brightdata(function_input: StoreReactionsInput) -> Any:
+    """Returns the profile's reactions by post, as a claim check when large.
+
+    The per-post results arrive as claim checks, so neither this step's input
+    nor the workflow's result carries every post's reactions inline.
+    """
+    try:
+
+        def store() -> Any:
+            return claim_check(
+                {
+                    "profile_url": function_input.profile_url,
+                    "posts": function_input.posts,
+                    "reactions": {post_url: resolve(value) for post_url, value in function_input.reactions.items()},
+                    "errors": function_input.errors,
+                }
+            )
+
+        # Reading and writing the blobs is file I/O; keep it off the event loop.
+        result = await asyncio.to_thread(store)
+    except Exception as e:
+        error_message = f"store_profile_reactions_brightdata failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Stored reactions for {len(function_input.reactions)} posts")
+        return result
@@ -0,0 +1,256 @@
+import asyncio
+import os
+from typing import Any
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import (
+    DATASET_IDS,
+    SnapshotNotReadyError,
+    download_snapshot,
+    trigger_snapshot,
+)
+from src.utils.blobs import claim_check, claim_checked, resolve
+from src.utils.cache import scrape_cache
+from src.utils.metrics import pop_status_checks, record_job_completion
+from src.utils.polling import durations
+from src.utils.rate_limit import is_rate_limited, is_transient
+from src.utils.urls import canonical_profile_url_or_none, canonical_profile_urls
+from src.utils.webhooks import current_workflow, register_current_workflow, webhook_url
+
+MAX_CHUNK_SIZE = int(os.environ.get("BRIGHT_DATA_MAX_BATCH_SIZE", "1000"))
+
+# Duration estimator key for batch snapshots, which take longer than single profiles.
+BATCH_DURATION_KEY = "brightdata:profile_batch"
+
+
+class GetProfilesBatchInput(BaseModel):
+    """Input parameters for getting many LinkedIn profiles at once."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_urls: list[str] = Field(
+        ...,
+        title="LinkedIn Profile URLs",
+        description="The URLs of the LinkedIn profiles.",
+        example=["https://www.linkedin.com/in/williamhgates/", "https://www.linkedin.com/in/satyanadella/"],
+        min_length=1,
+    )
+    chunk_size: int = Field(
+        100,
+        title="Chunk Size",
+        description="How many profiles to pack into a single Bright Data snapshot.",
+        ge=1,
+        le=MAX_CHUNK_SIZE,
+    )
+
+
+class LaunchProfilesBatchInput(BaseModel):
+    """Input parameters for triggering one snapshot for a chunk of profiles."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_urls: list[str] = Field(
+        ...,
+        title="LinkedIn Profile URLs",
+        description="The URLs of the LinkedIn profiles in the chunk.",
+        min_length=1,
+        max_length=MAX_CHUNK_SIZE,
+    )
+
+
+class FetchProfilesBatchInput(BaseModel):
+    """Input parameters for downloading a finished batch snapshot."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    snapshot_id: str = Field(
+        ...,
+        title="Snapshot ID",
+        description="The snapshot returned by launch_profiles_batch_brightdata.",
+    )
+    profile_urls: list[str] = Field(
+        ...,
+        title="LinkedIn Profile URLs",
+        description="The URLs of the LinkedIn profiles the snapshot was triggered for.",
+    )
+    elapsed_seconds: float | None = Field(
+        None,
+        title="Elapsed Seconds",
+        description="How long the snapshot took, used to learn when to first check the next one.",
+    )
+
+
+class MergeProfilesBatchInput(BaseModel):
+    """Input parameters for combining the chunks' results into one batch result."""
+
+    model_config = {
+        "extra": "forbid",
+        "validate_assignment": True,
+    }
+
+    chunks: list[dict[str, Any]] = Field(
+        ...,
+        title="Chunks",
+        description="Each chunk's result from fetch_profiles_batch_brightdata: a dict or a claim check for one.",
+    )
+    errors: dict[str, str] = Field(
+        default_factory=dict,
+        title="Errors",
+        description="Errors for profiles no chunk result covers, such as inputs that aren't URLs.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("Bright Data profiles batch function failed", error=message)
+    raise NonRetryableError(message)
+
+
+def record_url(record: dict[str, Any]) -> str | None:
+    """Returns the input URL a Bright Data record (or error record) belongs to."""
+    input_data = record.get("input")
+    if isinstance(input_data, dict) and input_data.get("url"):
+        return input_data["url"]
+    return record.get("input_url") or record.get("url")
+
+
+def split_records(records: list[dict[str, Any]], profile_urls: list[str]) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Returns a batch snapshot's records and error records by canonical profile URL."""
+    requested = set(profile_urls)
+    results: dict[str, Any] = {}
+    errors: dict[str, Any] = {}
+    for record in records:
+        url = canonical_profile_url_or_none(record_url(record))
+        if url not in requested:
+            log.warning("Bright Data returned a record for an unknown URL", url=record_url(record))
+            continue
+        if record.get("error") or record.get("error_code"):
+            errors[url] = record.get("error") or record.get("error_code")
+        else:
+            results[url] = record
+    for url in profile_urls:
+        if url not in results and url not in errors:
+            errors[url] = "No record returned by Bright Data"
+    return results, errors
+
+
+def cache_profiles(results: dict[str, Any]) -> None:
+    # Same shape as a single-profile scrape, so later lookups hit the cache.
+    for url, record in results.items():
+        scrape_cache.set("brightdata", "profile", url, [record])
+
+
+@function.defn()
+async def launch_profiles_batch_brightdata(function_input: LaunchProfilesBatchInput) -> dict[str, Any]:
+    """Triggers one snapshot for a chunk of profiles and returns its handle.
+
+    Returns the chunk's canonical `profile_urls` with the snapshot, for the
+    fetch step to split its records by.
+    """
+    try:
+        api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
+        if not api_token:
+            raise_exception("BRIGHT_DATA_API_TOKEN is not set")
+
+        profile_urls, invalid = canonical_profile_urls(function_input.profile_urls)
+        if invalid:
+            raise_exception(f"Not profile URLs: {', '.join(invalid)}")
+
+        # The callback names this workflow, so whichever service process receives it can signal it.
+        notify_url = webhook_url("brightdata", current_workflow())
+        params = {"notify": notify_url} if notify_url else {}
+        snapshot_id = await trigger_snapshot(api_token, DATASET_IDS["profile"], [{"url": url} for url in profile_urls], **params)
+        await register_current_workflow("brightdata", snapshot_id)
+        log.info(f"Batch of {len(profile_urls)} profiles initiated. Snapshot ID: {snapshot_id}")
+
+    except Exception as e:
+        error_message = f"launch_profiles_batch_brightdata failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        return {
+            "snapshot_id": snapshot_id,
+            "profile_urls": profile_urls,
+            "expected_seconds": durations.expected(BATCH_DURATION_KEY),
+            "webhook": notify_url is not None,
+        }
+
+
+@function.defn()
+@claim_checked
+async def fetch_profiles_batch_brightdata(function_input: FetchProfilesBatchInput) -> dict[str, Any]:
+    """Downloads a ready batch snapshot and splits it per profile.
+
+    Returns `results` and `errors`, both keyed by canonical profile URL, and
+    caches each profile's record. Errors are those Bright Data reported for
+    single profiles. Like fetch_scrape_result_brightdata, transient errors and
+    a download that is still being built are retryable.
+    """
+    try:
+        api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
+        if not api_token:
+            raise_exception("BRIGHT_DATA_API_TOKEN is not set")
+
+        snapshot_id = function_input.snapshot_id
+        profile_urls, _ = canonical_profile_urls(function_input.profile_urls)
+        records = await download_snapshot(api_token, snapshot_id)
+        results, errors = split_records(records if isinstance(records, list) else [records], profile_urls)
+        await asyncio.to_thread(cache_profiles, results)
+
+        status_checks = pop_status_checks("brightdata", snapshot_id)
+        if function_input.elapsed_seconds is not None:
+            durations.record(BATCH_DURATION_KEY, function_input.elapsed_seconds)
+            record_job_completion(BATCH_DURATION_KEY, function_input.elapsed_seconds, status_checks)
+
+    except Exception as e:
+        error_message = f"fetch_profiles_batch_brightdata failed: {e}"
+        if is_transient(e) or isinstance(e, SnapshotNotReadyError):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Batch snapshot {snapshot_id} finished: {len(results)} profiles, {len(errors)} errors")
+        return {"results": results, "errors": errors}
+
+
+@function.defn()
+async def merge_profiles_batch_brightdata(function_input: MergeProfilesBatchInput) -> Any:
+    """Combines the chunks' results into one, as a claim check when large.
+
+    Returns `results` and `errors`, both keyed by canonical profile URL (errors
+    for inputs that aren't URLs by the input).
+    """
+    try:
+
+        def merge() -> Any:
+            results: dict[str, Any] = {}
+            errors = dict(function_input.errors)
+            for chunk in function_input.chunks:
+                chunk = resolve(chunk)
+                results.update(chunk["results"])
+                errors.update(chunk["errors"])
+            return claim_check({"results": results, "errors": errors})
+
+        # Reading and writing the blobs is file I/O; keep it off the event loop.
+        result = await asyncio.to_thread(merge)
+    except Exception as e:
+        error_message = f"merge_profiles_batch_brightdata failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Merged {len(function_input.chunks)} batch chunks")
+        return result
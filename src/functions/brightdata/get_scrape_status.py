@@ -0,0 +1,60 @@
+import os
+from typing import Any
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import get_snapshot_progress
+from src.utils.metrics import count_status_check, pop_status_checks
+
+
+class ScrapeStatusInput(BaseModel):
+    """Input parameters for checking a Bright Data snapshot."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    snapshot_id: str = Field(
+        ...,
+        title="Snapshot ID",
+        description="The snapshot returned by launch_scrape_brightdata.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("get_scrape_status_brightdata function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def get_scrape_status_brightdata(function_input: ScrapeStatusInput) -> dict[str, Any]:
+    """Returns a snapshot's status and whether it is ready to fetch.
+
+    A failed snapshot is non-retryable. Transient errors while checking are
+    retryable, so a network blip does not throw away a long running job.
+    """
+    try:
+        api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
+        if not api_token:
+            raise_exception("BRIGHT_DATA_API_TOKEN is not set")
+
+        snapshot_id = function_input.snapshot_id
+        status_response = await get_snapshot_progress(api_token, snapshot_id)
+        status = status_response.get("status")
+        log.info(f"Snapshot {snapshot_id} status: {status}")
+        count_status_check("brightdata", snapshot_id)
+
+        if status == "failed":
+            pop_status_checks("brightdata", snapshot_id)
+            raise_exception(f"Bright Data snapshot {snapshot_id} failed. Details: {status_response}")
+
+    except NonRetryableError:
+        raise
+    except Exception as e:
+        error_message = f"get_scrape_status_brightdata failed: {e}"
+        raise RetryableError(error_message) from e
+    else:
+        return {"status": status, "done": status == "ready"}
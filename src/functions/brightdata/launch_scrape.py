@@ -0,0 +1,141 @@
+import asyncio
+import os
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.brightdata.api import DATASET_IDS, trigger_snapshot
+from src.utils.blobs import claim_check
+from src.utils.cache import scrape_cache, scrape_jobs_in_flight
+from src.utils.polling import durations
+from src.utils.rate_limit import is_rate_limited
+from src.utils.urls import canonical_scrape_url
+from src.utils.watermarks import apply_watermark, start_date, watermarks
+from src.utils.webhooks import current_workflow, register_current_workflow, webhook_url
+
+# Changes to this file should also be reflected in the Phantombuster version
+
+TRIGGER_PARAMS = {
+    "profile": (DATASET_IDS["profile"], {}),
+    "posts": (DATASET_IDS["post"], {"type": "discover_new", "discover_by": "profile_url"}),
+    "reactions": (DATASET_IDS["reactions"], {}),
+}
+
+
+class LaunchScrapeInput(BaseModel):
+    """Input parameters for starting a Bright Data scrape without waiting for it."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile, or of the post for `reactions`.",
+        example="https://www.linkedin.com/in/williamhgates/",
+    )
+    kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What to scrape: the profile itself, its posts, or the reactions on one post.",
+    )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
+    incremental: bool = Field(
+        False,
+        title="Incremental",
+        description="For posts, return only posts newer than the profile's watermark.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("launch_scrape_brightdata function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def launch_scrape_brightdata(function_input: LaunchScrapeInput) -> dict[str, Any]:
+    """Triggers a snapshot and returns its handle.
+
+    Returns `result` instead when the cache already has a fresh enough answer,
+    and joins an already running snapshot for the same profile and kind. Once
+    the profile has a watermark, an incremental posts scrape skips the cache,
+    only asks for posts since the watermark, and returns that date as `since`.
+    A reactions scrape is for one post, given as `profile_url`.
+    """
+    try:
+        kind = function_input.kind
+        profile_url = canonical_scrape_url(function_input.profile_url, kind)
+        incremental = function_input.incremental and kind == "posts"
+        # Like the single-call function: once there is a watermark, ask for the posts since it.
+        watermarked = incremental and watermarks.get("brightdata", profile_url) is not None
+
+        if not function_input.force_refresh and not watermarked:
+            cached = await asyncio.to_thread(scrape_cache.get, "brightdata", kind, profile_url, function_input.max_age)
+            if cached is not None:
+                log.info(f"Serving brightdata {kind} for {profile_url} from cache")
+                if incremental:
+                    cached = apply_watermark("brightdata", profile_url, cached, run=current_workflow())
+                # A profile's reactions are gathered post by post, so each one leaves as a claim check.
+                return {"result": claim_check(cached, always=kind == "reactions")}
+
+        expected_seconds = durations.expected(f"brightdata:{kind}")
+        # The callback names this workflow, so whichever service process receives it can signal it.
+        notify_url = webhook_url("brightdata", current_workflow())
+        since = start_date("brightdata", profile_url) if watermarked else None
+        snapshot_id = scrape_jobs_in_flight.get(("brightdata", kind, profile_url))
+        if snapshot_id:
+            await register_current_workflow("brightdata", snapshot_id)
+            log.info(f"Joining running snapshot {snapshot_id} for {profile_url}")
+            return {
+                "snapshot_id": snapshot_id,
+                "expected_seconds": expected_seconds,
+                "webhook": notify_url is not None,
+                "since": None,
+                "result": None,
+            }
+
+        api_token = os.environ.get("BRIGHT_DATA_API_TOKEN")
+        if not api_token:
+            raise_exception("BRIGHT_DATA_API_TOKEN is not set")
+
+        dataset_id, params = TRIGGER_PARAMS[kind]
+        if not dataset_id:
+            raise_exception("BRIGHT_DATA_REACTIONS_DATASET_ID is not set")
+        if notify_url:
+            params = {**params, "notify": notify_url}
+        scrape_input = {"url": profile_url}
+        if since:
+            scrape_input["start_date"] = since
+        log.info(f"Initiating {kind} scrape for {profile_url}", since=since)
+        snapshot_id = await trigger_snapshot(api_token, dataset_id, [scrape_input], **params)
+        # A snapshot limited to recent posts can't stand in for a full scrape.
+        if not since:
+            scrape_jobs_in_flight.add(("brightdata", kind, profile_url), snapshot_id)
+        await register_current_workflow("brightdata", snapshot_id)
+
+    except Exception as e:
+        error_message = f"launch_scrape_brightdata failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        return {
+            "snapshot_id": snapshot_id,
+            "expected_seconds": expected_seconds,
+            "webhook": notify_url is not None,
+            "since": since,
+            "result": None,
+        }
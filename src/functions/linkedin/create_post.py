@@ -1,13 +1,12 @@
 import os
 from typing import Any
 
-from dotenv import load_dotenv
-import aiohttp
-
 from pydantic import BaseModel
-from restack_ai.function import NonRetryableError, function, log
+from restack_ai.function import NonRetryableError, RetryableError, function, log
 
-load_dotenv()
+from src.functions.linkedin.media import MediaInput, upload_all, validate_media
+from src.utils.http import get_http_client
+from src.utils.rate_limit import is_rate_limited
 
 from pydantic import BaseModel, Field, ValidationError
 
@@ -34,6 +33,16 @@ class CreatePostInput(BaseModel):
         max_length=3000,
         json_schema_extra={"format": "textarea"}
     )
+    media: list[MediaInput] = Field(
+        default_factory=list,
+        title="Media",
+        description="Images (up to 9) or a single video to attach, read from the worker's disk.",
+    )
+    assets: list[str] = Field(
+        default_factory=list,
+        title="Asset URNs",
+        description="Already uploaded asset URNs for `media`, in the same order. The media is uploaded first when empty.",
+    )
 
 # Usage with validation
 def validate_and_use_input(input_data: dict) -> CreatePostInput:
@@ -46,6 +55,42 @@ def validate_and_use_input(input_data: dict) -> CreatePostInput:
         raise ValueError(f"Invalid input: {e}") from e
 
 
+def ugc_posts_url() -> str:
+    return f"{os.environ.get('LINKEDIN_API_URL', 'https://api.linkedin.com')}/v2/ugcPosts"
+
+
+def post_headers(access_token: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json",
+        "X-Restli-Protocol-Version": "2.0.0",
+    }
+
+
+def post_payload(author_urn: str, text: str, media: list[MediaInput] | None = None, assets: list[str] | None = None) -> dict[str, Any]:
+    share_content: dict[str, Any] = {
+        "shareCommentary": {"text": text},
+        "shareMediaCategory": "NONE",
+    }
+    if media:
+        share_content["shareMediaCategory"] = media[0].media_type.upper()
+        share_content["media"] = [
+            {
+                "status": "READY",
+                "media": asset,
+                **({"title": {"text": item.title}} if item.title else {}),
+                **({"description": {"text": item.description}} if item.description else {}),
+            }
+            for item, asset in zip(media, assets or [])
+        ]
+    return {
+        "author": author_urn,
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {"com.linkedin.ugc.ShareContent": share_content},
+        "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
+    }
+
+
 def raise_exception(message: str) -> None:
     log.error("create_post_on_linkedin function failed", error=message)
     raise NonRetryableError(message)
@@ -64,32 +109,30 @@ async def create_post_on_linkedin(function_input: CreatePostInput) -> dict[str,
 
             access_token=os.environ.get("LINKEDIN_ACCESS_TOKEN")
             author_urn=os.environ.get("LINKEDIN_AUTHOR_URN")
-            linkedin_api_url = "https://api.linkedin.com/v2/ugcPosts"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-                "X-Restli-Protocol-Version": "2.0.0",
-            }
-            payload = {
-                "author": author_urn,
-                "lifecycleState": "PUBLISHED",
-                "specificContent": {
-                    "com.linkedin.ugc.ShareContent": {
-                        "shareCommentary": {"text": function_input.text},
-                        "shareMediaCategory": "NONE",
-                    }
-                },
-                "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
-            }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    linkedin_api_url, json=payload, headers=headers
-                ) as response:
-                    response.raise_for_status()
-                    post_id = response.headers.get("x-restli-id", "Unknown")
+            media = function_input.media
+            assets = function_input.assets
+            if media:
+                invalid = validate_media(media)
+                if invalid:
+                    raise_exception(invalid)
+                if not assets:
+                    assets = await upload_all(access_token, author_urn, media, concurrency=3)
+                elif len(assets) != len(media):
+                    raise_exception(f"Got {len(assets)} asset URNs for {len(media)} media files")
+
+            client = get_http_client("linkedin")
+            response = await client.post(
+                ugc_posts_url(),
+                json=post_payload(author_urn, function_input.text, media, assets),
+                headers=post_headers(access_token),
+            )
+            response.raise_for_status()
+            post_id = response.headers.get("x-restli-id", "Unknown")
     except Exception as e:
         error_message = f"create_post_on_linkedin failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
         raise NonRetryableError(error_message) from e
     else:
         log.info(f"Successfully created post on LinkedIn with ID: {post_id}")
@@ -0,0 +1,381 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+import httpx
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.utils.http import get_http_client
+from src.utils.rate_limit import is_rate_limited
+from src.utils.storage import data_dir
+
+# Media uploads for posts through LinkedIn's register-upload flow. Files are
+# streamed from disk (or any seekable file-like object) in small reads, so a
+# large video never sits in worker memory. Large videos use the multipart
+# mechanism: each part is retried on its own, and the parts already uploaded
+# are recorded in SQLite so a retried function resumes instead of restarting.
+
+RECIPES = {
+    "image": "urn:li:digitalmediaRecipe:feedshare-image",
+    "video": "urn:li:digitalmediaRecipe:feedshare-video",
+}
+
+SINGLE_UPLOAD = "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"
+MULTIPART_UPLOAD = "com.linkedin.digitalmedia.uploading.MultipartUpload"
+
+# Size of each read from the source while streaming a request body.
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def multipart_threshold() -> int:
+    return int(os.environ.get("MEDIA_MULTIPART_THRESHOLD_BYTES", str(100 * 1024 * 1024)))
+
+
+def part_concurrency() -> int:
+    return int(os.environ.get("MEDIA_UPLOAD_PART_CONCURRENCY", "4"))
+
+
+def part_retries() -> int:
+    return int(os.environ.get("MEDIA_UPLOAD_PART_RETRIES", "3"))
+
+
+class MediaInput(BaseModel):
+    """A media file to attach to a post."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    path: str = Field(
+        ...,
+        title="File Path",
+        description="Path of the file on the worker's disk.",
+        example="/data/media/launch.mp4",
+    )
+    media_type: Literal["image", "video"] = Field(
+        ...,
+        title="Media Type",
+        description="Whether the file is an image or a video.",
+    )
+    title: str | None = Field(None, title="Title", description="Title shown with the media.")
+    description: str | None = Field(None, title="Description", description="Description shown with the media.")
+
+
+class UploadMediaInput(BaseModel):
+    """Input parameters for uploading media for a LinkedIn post."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    media: list[MediaInput] = Field(
+        ...,
+        title="Media",
+        description="The files to upload. Up to 9 images, or a single video.",
+        min_length=1,
+    )
+    concurrency: int = Field(
+        3,
+        title="Concurrency",
+        description="How many files to upload in parallel.",
+        ge=1,
+        le=9,
+    )
+
+
+def validate_media(media: list[MediaInput]) -> str | None:
+    """Returns why LinkedIn would reject this combination of media, if it would."""
+    kinds = {item.media_type for item in media}
+    if len(kinds) > 1:
+        return "A post can have images or a video, not both"
+    if kinds == {"video"} and len(media) > 1:
+        return "A post can have only one video"
+    if len(media) > 9:
+        return "A post can have at most 9 images"
+    return None
+
+
+class MediaSource:
+    """A seekable byte source that several uploads can read ranges from concurrently."""
+
+    def __init__(self, source: str | os.PathLike | BinaryIO, size: int | None = None) -> None:
+        self.path = Path(source) if isinstance(source, (str, os.PathLike)) else None
+        self.file: BinaryIO = self.path.open("rb") if self.path else source
+        if size is None:
+            self.file.seek(0, os.SEEK_END)
+            size = self.file.tell()
+        self.size = size
+        self.lock = asyncio.Lock()
+
+    def resume_key(self, owner: str, media_type: str) -> str | None:
+        """Identifies this upload across retries; only files on disk can be resumed."""
+        if self.path is None:
+            return None
+        stat = self.path.stat()
+        identity = f"{owner}\n{media_type}\n{self.path.resolve()}\n{stat.st_size}\n{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    async def read(self, offset: int, length: int) -> bytes:
+        async with self.lock:
+            self.file.seek(offset)
+            return await asyncio.to_thread(self.file.read, length)
+
+    async def stream(self, offset: int, length: int) -> AsyncIterator[bytes]:
+        end = offset + length
+        while offset < end:
+            chunk = await self.read(offset, min(READ_CHUNK_BYTES, end - offset))
+            if not chunk:
+                raise ValueError(f"Media source ended at byte {offset} of {self.size}")
+            offset += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        if self.path is not None:
+            self.file.close()
+
+
+class UploadState:
+    """Registrations and finished parts of multipart uploads, so retries skip work already done."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path or data_dir() / "uploads.sqlite3", check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS uploads (key TEXT PRIMARY KEY, registered_at REAL, registration TEXT, asset TEXT)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS upload_parts (key TEXT, part INTEGER, etag TEXT, PRIMARY KEY (key, part))")
+        return self._db
+
+    def get(self, key: str, max_age: float) -> tuple[dict[str, Any], str | None] | None:
+        row = self.db.execute("SELECT registered_at, registration, asset FROM uploads WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] > max_age:
+            return None
+        return json.loads(row[1]), row[2]
+
+    def register(self, key: str, registration: dict[str, Any]) -> None:
+        self.db.execute("DELETE FROM upload_parts WHERE key = ?", (key,))
+        self.db.execute("INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, NULL)", (key, time.time(), json.dumps(registration)))
+        self.db.commit()
+
+    def parts(self, key: str) -> dict[int, str]:
+        return dict(self.db.execute("SELECT part, etag FROM upload_parts WHERE key = ?", (key,)).fetchall())
+
+    def add_part(self, key: str, part: int, etag: str) -> None:
+        self.db.execute("INSERT OR REPLACE INTO upload_parts VALUES (?, ?, ?)", (key, part, etag))
+        self.db.commit()
+
+    def complete(self, key: str, asset: str) -> None:
+        self.db.execute("UPDATE uploads SET asset = ? WHERE key = ?", (asset, key))
+        self.db.commit()
+
+
+upload_state = UploadState()
+
+
+def assets_url() -> str:
+    return f"{os.environ.get('LINKEDIN_API_URL', 'https://api.linkedin.com')}/v2/assets"
+
+
+def api_headers(access_token: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json",
+        "X-Restli-Protocol-Version": "2.0.0",
+    }
+
+
+async def register_upload(access_token: str, owner: str, media_type: str, size: int) -> dict[str, Any]:
+    request: dict[str, Any] = {
+        "owner": owner,
+        "recipes": [RECIPES[media_type]],
+        "serviceRelationships": [{"relationshipType": "OWNER", "identifier": "urn:li:userGeneratedContent"}],
+    }
+    if media_type == "video" and size > multipart_threshold():
+        request["supportedUploadMechanism"] = ["MULTIPART_UPLOAD"]
+        request["fileSize"] = size
+    client = get_http_client("linkedin")
+    response = await client.post(
+        f"{assets_url()}?action=registerUpload",
+        json={"registerUploadRequest": request},
+        headers=api_headers(access_token),
+    )
+    response.raise_for_status()
+    return response.json()["value"]
+
+
+async def put_range(url: str, headers: dict[str, str], source: MediaSource, offset: int, length: int) -> httpx.Response:
+    client = get_http_client("linkedin_upload")
+    response = await client.put(
+        url,
+        content=source.stream(offset, length),
+        headers={**headers, "Content-Length": str(length)},
+        timeout=httpx.Timeout(300.0, connect=10.0),
+    )
+    response.raise_for_status()
+    return response
+
+
+async def upload_part(key: str | None, index: int, part: dict[str, Any], source: MediaSource) -> str:
+    """Uploads one part, retrying it on its own with backoff, and returns its ETag."""
+    first, last = part["byteRange"]["firstByte"], part["byteRange"]["lastByte"]
+    attempt = 0
+    while True:
+        try:
+            response = await put_range(part["url"], part.get("headers", {}), source, first, last - first + 1)
+        except (httpx.HTTPError, httpx.StreamError) as e:
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500 and not is_rate_limited(e):
+                raise
+            attempt += 1
+            if attempt > part_retries():
+                raise
+            log.warning(f"Retrying media part {index} after error: {e}", attempt=attempt)
+            await asyncio.sleep(2 ** (attempt - 1))
+            continue
+        etag = response.headers.get("ETag", "")
+        if key:
+            upload_state.add_part(key, index, etag)
+        return etag
+
+
+async def upload_multipart(access_token: str, key: str | None, registration: dict[str, Any], source: MediaSource) -> None:
+    mechanism = registration["uploadMechanism"][MULTIPART_UPLOAD]
+    parts = mechanism["partUploadRequests"]
+    done = upload_state.parts(key) if key else {}
+    if done:
+        log.info(f"Resuming multipart upload of {registration['asset']}: {len(done)}/{len(parts)} parts already uploaded")
+
+    semaphore = asyncio.Semaphore(part_concurrency())
+
+    async def upload(index: int, part: dict[str, Any]) -> None:
+        async with semaphore:
+            done[index] = await upload_part(key, index, part, source)
+
+    # Let parts in flight finish, so they are recorded, before giving up on the first failure.
+    outcomes = await asyncio.gather(
+        *(upload(index, part) for index, part in enumerate(parts) if index not in done),
+        return_exceptions=True,
+    )
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+
+    client = get_http_client("linkedin")
+    response = await client.post(
+        f"{assets_url()}?action=completeMultiPartUpload",
+        json={
+            "completeMultipartUploadRequest": {
+                "mediaArtifact": registration["mediaArtifact"],
+                "metadata": mechanism["metadata"],
+                "partUploadResponses": [
+                    {"httpStatusCode": 200, "headers": {"ETag": done[index]}} for index in range(len(parts))
+                ],
+            }
+        },
+        headers=api_headers(access_token),
+    )
+    response.raise_for_status()
+
+
+async def upload_media(
+    access_token: str,
+    owner: str,
+    source: str | os.PathLike | BinaryIO,
+    media_type: str,
+    size: int | None = None,
+) -> str:
+    """Registers and streams one media file to LinkedIn, and returns its asset URN."""
+    media = MediaSource(source, size)
+    try:
+        key = media.resume_key(owner, media_type)
+        # Upload URLs expire; an old registration is started over.
+        saved = upload_state.get(key, max_age=12 * 3600) if key else None
+        if saved and saved[1]:
+            return saved[1]
+
+        if saved:
+            registration = saved[0]
+        else:
+            registration = await register_upload(access_token, owner, media_type, media.size)
+            if key:
+                upload_state.register(key, registration)
+
+        mechanism = registration["uploadMechanism"]
+        log.info(f"Uploading {media.size} byte {media_type} as {registration['asset']}", multipart=MULTIPART_UPLOAD in mechanism)
+        if MULTIPART_UPLOAD in mechanism:
+            await upload_multipart(access_token, key, registration, media)
+        else:
+            upload = mechanism[SINGLE_UPLOAD]
+            headers = {**upload.get("headers", {}), "Authorization": f"Bearer {access_token}"}
+            await put_range(upload["uploadUrl"], headers, media, 0, media.size)
+
+        if key:
+            upload_state.complete(key, registration["asset"])
+        return registration["asset"]
+    finally:
+        media.close()
+
+
+async def upload_all(access_token: str, owner: str, media: list[MediaInput], concurrency: int) -> list[str]:
+    """Uploads several files in parallel and returns their asset URNs in order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upload(item: MediaInput) -> str:
+        async with semaphore:
+            return await upload_media(access_token, owner, item.path, item.media_type)
+
+    return list(await asyncio.gather(*(upload(item) for item in media)))
+
+
+def raise_exception(message: str) -> None:
+    log.error("upload_linkedin_media function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def upload_linkedin_media(function_input: UploadMediaInput) -> dict[str, Any]:
+    """Uploads media for a post and returns `assets`, one asset URN per file, in order."""
+    try:
+        access_token = os.environ.get("LINKEDIN_ACCESS_TOKEN")
+        owner = os.environ.get("LINKEDIN_AUTHOR_URN")
+        if not access_token:
+            raise_exception("LINKEDIN_ACCESS_TOKEN is not set")
+        if not owner:
+            raise_exception("LINKEDIN_AUTHOR_URN is not set")
+        invalid = validate_media(function_input.media)
+        if invalid:
+            raise_exception(invalid)
+
+        assets = await upload_all(access_token, owner, function_input.media, function_input.concurrency)
+
+    except NonRetryableError:
+        raise
+    except (OSError, ValueError) as e:
+        raise NonRetryableError(f"upload_linkedin_media failed: {e}") from e
+    except Exception as e:
+        # Finished parts are recorded, so a retry resumes the upload.
+        error_message = f"upload_linkedin_media failed: {e}"
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500 and not is_rate_limited(e):
+            raise NonRetryableError(error_message) from e
+        raise RetryableError(error_message) from e
+    else:
+        log.info(f"Uploaded {len(assets)} media file(s) to LinkedIn")
+        return {"assets": assets}
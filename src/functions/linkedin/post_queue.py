@@ -0,0 +1,134 @@
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+from src.utils.storage import data_dir
+
+# Queue of LinkedIn posts keyed by idempotency key. A post moves from `queued`
+# to `sending` right before the request goes out, then to `published` or
+# `failed`. The move to `sending` is an atomic claim, so of two attempts racing
+# for one post only one sends it. One left in `sending` has an unknown outcome
+# (e.g. a timeout after LinkedIn accepted it) and is looked up on LinkedIn
+# before being claimed again.
+
+QUEUED = "queued"
+SENDING = "sending"
+PUBLISHED = "published"
+FAILED = "failed"
+
+
+def idempotency_key(author_urn: str, text: str, caller_key: str, media: list[dict] | None = None) -> str:
+    """A hash of the author, the post text, its media files and the caller's own key."""
+    content = f"{author_urn}\n{caller_key}\n{text}"
+    if media:
+        content += "\n" + json.dumps(media, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@dataclass
+class QueuedPost:
+    key: str
+    author_urn: str
+    text: str
+    publish_at: float
+    status: str
+    attempts: int = 0
+    post_id: str | None = None
+    error: str | None = None
+    # The files to attach (MediaInput fields) and their uploaded asset URNs, in the same order.
+    media: list[dict] = field(default_factory=list)
+    assets: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "status": self.status,
+            "publish_at": self.publish_at,
+            "attempts": self.attempts,
+            "post_id": self.post_id,
+            "error": self.error,
+        }
+
+
+class PostQueue:
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path or data_dir() / "post_queue.sqlite3", check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "key TEXT PRIMARY KEY, author_urn TEXT, text TEXT, publish_at REAL, status TEXT, "
+                "attempts INTEGER, post_id TEXT, error TEXT, updated_at REAL, media TEXT, assets TEXT)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(posts)")}
+            for column in ("media", "assets"):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE posts ADD COLUMN {column} TEXT")
+        return self._db
+
+    def get(self, key: str) -> QueuedPost | None:
+        row = self.db.execute(
+            "SELECT key, author_urn, text, publish_at, status, attempts, post_id, error, media, assets FROM posts WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        *fields, media, assets = row
+        return QueuedPost(*fields, media=json.loads(media or "[]"), assets=json.loads(assets or "[]"))
+
+    def add(self, post: QueuedPost) -> QueuedPost:
+        """Queues a post unless one with the same key exists, and returns whichever is stored."""
+        self.db.execute(
+            "INSERT OR IGNORE INTO posts (key, author_urn, text, publish_at, status, attempts, post_id, error, updated_at, media, assets) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                post.key,
+                post.author_urn,
+                post.text,
+                post.publish_at,
+                post.status,
+                post.attempts,
+                post.post_id,
+                post.error,
+                time.time(),
+                json.dumps(post.media),
+                json.dumps(post.assets),
+            ),
+        )
+        self.db.commit()
+        return self.get(post.key)
+
+    def update(self, key: str, status: str, post_id: str | None = None, error: str | None = None, attempt: bool = False) -> None:
+        self.db.execute(
+            "UPDATE posts SET status = ?, post_id = COALESCE(?, post_id), error = ?, "
+            "attempts = attempts + ?, updated_at = ? WHERE key = ?",
+            (status, post_id, error, int(attempt), time.time(), key),
+        )
+        self.db.commit()
+
+    def claim(self, key: str, stale_after: float) -> bool:
+        """Moves a post to `sending` if it is queued, or stuck in `sending` for `stale_after` seconds.
+
+        Returns whether this call made the move; only the attempt that did may send the post.
+        """
+        now = time.time()
+        cursor = self.db.execute(
+            "UPDATE posts SET status = ?, updated_at = ? "
+            "WHERE key = ? AND (status = ? OR (status = ? AND updated_at < ?))",
+            (SENDING, now, key, QUEUED, SENDING, now - stale_after),
+        )
+        self.db.commit()
+        return cursor.rowcount == 1
+
+    def counts(self) -> dict[str, int]:
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM posts GROUP BY status").fetchall())
+
+
+post_queue = PostQueue()
@@ -0,0 +1,264 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.linkedin.create_post import post_headers, post_payload, ugc_posts_url
+from src.functions.linkedin.media import MediaInput, validate_media
+from src.functions.linkedin.post_queue import FAILED, PUBLISHED, QUEUED, SENDING, QueuedPost, idempotency_key, post_queue
+from src.utils.http import get_http_client
+from src.utils.rate_limit import is_rate_limited, limits_for, parse_retry_after, rate_limiter
+from src.utils.webhooks import current_workflow
+
+# How many of the author's latest posts to look through for one whose outcome is unknown.
+RECONCILE_POSTS = 20
+
+# A post in `sending` for longer than the publish step's timeout has no attempt
+# left that could still be sending it, so another attempt may claim it.
+SENDING_STALE_SECONDS = 120.0
+
+# How long to wait before looking again at a post another attempt is sending.
+SENDING_RECHECK_SECONDS = 15.0
+
+
+class QueuePostInput(BaseModel):
+    """Input parameters for queueing a LinkedIn post."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    text: str = Field(
+        ...,
+        title="Post Content",
+        description="The text content of the LinkedIn post.",
+        min_length=1,
+        max_length=3000,
+        json_schema_extra={"format": "textarea"},
+    )
+    idempotency_key: str = Field(
+        "",
+        title="Idempotency Key",
+        description=(
+            "Caller's key for this post. The same text with the same key is only ever published once. "
+            "Defaults to the workflow ID, so only retries of the same workflow are deduplicated."
+        ),
+    )
+    publish_at: str | None = Field(
+        None,
+        title="Publish At",
+        description="ISO 8601 time to publish at. Defaults to as soon as the pacing allows.",
+        example="2026-11-02T09:00:00Z",
+    )
+    media: list[MediaInput] = Field(
+        default_factory=list,
+        title="Media",
+        description="Images (up to 9) or a single video to attach, read from the worker's disk.",
+    )
+    assets: list[str] = Field(
+        default_factory=list,
+        title="Asset URNs",
+        description="Uploaded asset URNs for `media`, in the same order. The workflow uploads the media first when empty.",
+    )
+
+
+class PublishPostInput(BaseModel):
+    """Input parameters for publishing a queued LinkedIn post."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    key: str = Field(..., title="Queue Key", description="The key `enqueue_linkedin_post` returned.")
+
+
+def raise_exception(message: str) -> None:
+    log.error("publish_linkedin_post function failed", error=message)
+    raise NonRetryableError(message)
+
+
+def parse_publish_at(value: str | None) -> float:
+    if not value:
+        return time.time()
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def posts_bucket(author_urn: str) -> str:
+    """The pacing bucket for one member's posts, separate from the general LinkedIn API bucket."""
+    return f"linkedin_posts:{author_urn}"
+
+
+def default_caller_key() -> str:
+    """The calling workflow's ID, or a fresh key outside a workflow, so equal texts from separate calls both post."""
+    workflow = current_workflow()
+    return f"workflow:{workflow[0]}" if workflow else uuid.uuid4().hex
+
+
+def queued_result(post: QueuedPost, wait_seconds: float = 0.0) -> dict[str, Any]:
+    return {**post.to_dict(), "wait_seconds": wait_seconds}
+
+
+async def find_published(client: httpx.AsyncClient, access_token: str, post: QueuedPost) -> str | None:
+    """Returns the ID of the author's recent post with this text, if LinkedIn has one."""
+    url = f"{ugc_posts_url()}?q=authors&authors=List({quote(post.author_urn, safe='')})&sortBy=LAST_MODIFIED&count={RECONCILE_POSTS}"
+    response = await client.get(url, headers=post_headers(access_token))
+    response.raise_for_status()
+    for element in response.json().get("elements", []):
+        content = element.get("specificContent", {}).get("com.linkedin.ugc.ShareContent", {})
+        if content.get("shareCommentary", {}).get("text") == post.text:
+            return element.get("id")
+    return None
+
+
+@function.defn()
+async def enqueue_linkedin_post(function_input: QueuePostInput) -> dict[str, Any]:
+    """Adds a post to the publishing queue, or returns the existing entry for the same idempotency key.
+
+    The key hashes the author, the text, the media files and the caller's
+    `idempotency_key`, which defaults to the calling workflow's ID. Media must
+    already be uploaded: `assets` holds an asset URN for each file.
+    """
+    try:
+        author_urn = os.environ.get("LINKEDIN_AUTHOR_URN")
+        if not author_urn:
+            raise_exception("LINKEDIN_AUTHOR_URN is not set")
+
+        media = [item.model_dump() for item in function_input.media]
+        if function_input.media:
+            invalid = validate_media(function_input.media)
+            if invalid:
+                raise_exception(invalid)
+            if len(function_input.assets) != len(function_input.media):
+                raise_exception(f"Got {len(function_input.assets)} asset URNs for {len(function_input.media)} media files")
+
+        caller_key = function_input.idempotency_key or default_caller_key()
+        key = idempotency_key(author_urn, function_input.text, caller_key, media)
+        post = post_queue.add(
+            QueuedPost(
+                key=key,
+                author_urn=author_urn,
+                text=function_input.text,
+                publish_at=parse_publish_at(function_input.publish_at),
+                status=QUEUED,
+                media=media,
+                assets=function_input.assets,
+            )
+        )
+        log.info(f"LinkedIn post {key[:12]} is {post.status}", publish_at=post.publish_at)
+
+    except Exception as e:
+        error_message = f"enqueue_linkedin_post failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        return queued_result(post, max(0.0, post.publish_at - time.time()))
+
+
+@function.defn()
+async def publish_linkedin_post(function_input: PublishPostInput) -> dict[str, Any]:
+    """Publishes a queued post once it is due and the author's post budget allows.
+
+    Returns the queue entry. While the post has to wait, for its scheduled time
+    or for the pacing bucket, nothing is sent and `wait_seconds` says how long.
+    A post whose last attempt has an unknown outcome is looked up among the
+    author's recent posts before it is sent again, so retries never duplicate it.
+    Only the attempt that atomically claims the post sends it; one that loses
+    the claim waits and looks the post up again.
+    """
+    try:
+        access_token = os.environ.get("LINKEDIN_ACCESS_TOKEN")
+        if not access_token:
+            raise_exception("LINKEDIN_ACCESS_TOKEN is not set")
+
+        post = post_queue.get(function_input.key)
+        if post is None:
+            raise_exception(f"No queued LinkedIn post {function_input.key}")
+        if post.status in (PUBLISHED, FAILED):
+            return queued_result(post)
+
+        wait = post.publish_at - time.time()
+        if wait > 0:
+            return queued_result(post, wait)
+
+        client = get_http_client("linkedin")
+        if post.status == SENDING:
+            try:
+                post_id = await find_published(client, access_token, post)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code >= 500 or is_rate_limited(e):
+                    raise
+                # Retrying won't fix a token that can't read the posts, and sending blind might post twice.
+                post_queue.update(post.key, FAILED, error=f"Could not check whether an earlier attempt published it: {e}")
+                raise
+            if post_id:
+                log.info(f"LinkedIn post {post.key[:12]} was already published as {post_id}")
+                post_queue.update(post.key, PUBLISHED, post_id=post_id)
+                return queued_result(post_queue.get(post.key))
+
+        if not post_queue.claim(post.key, SENDING_STALE_SECONDS):
+            post = post_queue.get(post.key)
+            if post.status != SENDING:
+                return queued_result(post)
+            # Another attempt is sending it right now; see whether it lands.
+            log.info(f"LinkedIn post {post.key[:12]} is being sent by another attempt")
+            return queued_result(post, SENDING_RECHECK_SECONDS)
+
+        try:
+            bucket = posts_bucket(post.author_urn)
+            wait = await asyncio.to_thread(rate_limiter.try_take, bucket, *limits_for("linkedin_posts"))
+            if wait > 0:
+                log.info(f"Pacing LinkedIn post {post.key[:12]} for {wait:.1f}s")
+                post_queue.update(post.key, QUEUED)
+                return queued_result(post_queue.get(post.key), wait)
+            media = [MediaInput(**item) for item in post.media]
+            payload = post_payload(post.author_urn, post.text, media, post.assets)
+        except Exception as e:
+            # Nothing was sent, so hand the claim back rather than leave the post in `sending`.
+            post_queue.update(post.key, QUEUED, error=str(e))
+            raise
+
+        post_queue.update(post.key, SENDING, attempt=True)
+        response = await client.post(ugc_posts_url(), json=payload, headers=post_headers(access_token))
+
+        if response.status_code == 429:
+            # Rejected outright, so it is safe to send again once LinkedIn allows it.
+            until = parse_retry_after(response, time.time()) or time.time() + 60
+            await asyncio.to_thread(rate_limiter.block_until, bucket, until)
+            post_queue.update(post.key, QUEUED, error="Rate limited by LinkedIn")
+            return queued_result(post_queue.get(post.key), max(0.0, until - time.time()))
+
+        if 400 <= response.status_code < 500:
+            post_queue.update(post.key, FAILED, error=f"{response.status_code}: {response.text[:500]}")
+        response.raise_for_status()
+
+        post_id = response.headers.get("x-restli-id", "Unknown")
+        post_queue.update(post.key, PUBLISHED, post_id=post_id)
+        log.info(f"Successfully published queued LinkedIn post {post.key[:12]} with ID: {post_id}")
+
+    except NonRetryableError:
+        raise
+    except httpx.HTTPStatusError as e:
+        error_message = f"publish_linkedin_post failed: {e}"
+        if e.response.status_code < 500 and not is_rate_limited(e):
+            raise NonRetryableError(error_message) from e
+        # A 5xx may still have created the post; the retry looks it up first.
+        raise RetryableError(error_message) from e
+    except Exception as e:
+        # Timeouts and dropped connections leave the post in `sending` for the retry to reconcile.
+        error_message = f"publish_linkedin_post failed: {e}"
+        raise RetryableError(error_message) from e
+    else:
+        return queued_result(post_queue.get(post.key))
@@ -0,0 +1,333 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from restack_ai.function import log
+
+from src.functions.phantombuster.api import AGENT_ID_ENV_VARS
+from src.utils.polling import PollPolicy
+from src.utils.storage import data_dir
+
+# A Phantombuster agent runs one container at a time, so each data kind gets a
+# pool of agents (each with its own LinkedIn session cookie) and every launch
+# leases an idle agent exclusively until its container is done.
+#
+# Leases are rows in SQLite keyed by agent ID, so every worker process on the
+# host sees the same busy agents, and the status or fetch step that sees the
+# container finish can release it by container ID whichever process launched
+# it. A lease that is never released expires after the polling deadline.
+#
+# PHANTOMBUSTER_<KIND>_AGENT_POOL is a comma-separated list of
+# `agent_id` or `agent_id=session_cookie` entries. Agents without a cookie use
+# LINKEDIN_SESSION_COOKIE. Without a pool, the kind's single
+# PHANTOMBUSTER_<KIND>_AGENT_ID is used.
+#
+# PHANTOMBUSTER_WEBHOOK_AGENTS lists the agents whose webhook is set to this
+# service in the Phantombuster dashboard. Only their containers are waited on
+# as if a completion callback will come.
+
+# How often a caller waiting for an agent checks for one released by another process.
+LEASE_POLL_SECONDS = 1.0
+
+
+class AgentPoolTimeoutError(TimeoutError):
+    """Raised when no agent became idle before the lease timeout."""
+
+
+class AgentsBusyError(RuntimeError):
+    """Raised when every agent of the requested kind is leased."""
+
+
+@dataclass
+class Agent:
+    agent_id: str
+    session_cookie: str | None
+    # Whether the agent's webhook calls this service when a container ends.
+    webhook: bool = False
+
+
+class AgentLeases:
+    """Which agents are leased, to which container, and until when, in SQLite."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        # The connection is shared by the threads the pools run these methods in.
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.path or data_dir() / "agent_leases.sqlite3",
+                isolation_level=None,
+                check_same_thread=False,
+                timeout=10,
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS agent_leases ("
+                "agent_id TEXT PRIMARY KEY, kind TEXT, container_id TEXT, leased_at REAL, expires_at REAL)"
+            )
+        return self._db
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the block in a write transaction, one thread at a time."""
+        with self._lock:
+            db = self.db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def take(self, kind: str, agent_ids: list[str], ttl: float) -> tuple[str | None, list[str]]:
+        """Leases the first idle agent of `agent_ids`, returning it (or None) and the expired leases it reclaimed."""
+        now = time.time()
+        with self.transaction() as db:
+            # A workflow that dies between launch and fetch never releases its agent.
+            expired = [
+                agent_id
+                for (agent_id,) in db.execute(
+                    "SELECT agent_id FROM agent_leases WHERE kind = ? AND expires_at <= ?", (kind, now)
+                )
+            ]
+            db.execute("DELETE FROM agent_leases WHERE kind = ? AND expires_at <= ?", (kind, now))
+            busy = {agent_id for (agent_id,) in db.execute("SELECT agent_id FROM agent_leases")}
+            agent_id = next((agent_id for agent_id in agent_ids if agent_id not in busy), None)
+            if agent_id is not None:
+                db.execute(
+                    "INSERT INTO agent_leases VALUES (?, ?, NULL, ?, ?)", (agent_id, kind, now, now + ttl)
+                )
+        return agent_id, expired
+
+    def assign(self, agent_id: str, container_id: str) -> None:
+        with self.transaction() as db:
+            db.execute("UPDATE agent_leases SET container_id = ? WHERE agent_id = ?", (container_id, agent_id))
+
+    def agent_for(self, container_id: str) -> str | None:
+        """Returns the agent leased to run `container_id`, if it still is."""
+        with self._lock:
+            row = self.db.execute("SELECT agent_id FROM agent_leases WHERE container_id = ?", (container_id,)).fetchone()
+        return row[0] if row else None
+
+    def release(self, agent_id: str) -> tuple[str, float] | None:
+        """Ends an agent's lease and returns its kind and when it started, or None if it wasn't leased."""
+        return self._delete("agent_id", agent_id)
+
+    def release_container(self, container_id: str) -> tuple[str, float] | None:
+        """Ends the lease of whichever agent is running `container_id`, like `release`."""
+        return self._delete("container_id", container_id)
+
+    def busy(self, kind: str) -> list[float]:
+        """Returns when each currently leased agent of `kind` was leased."""
+        now = time.time()
+        with self._lock:
+            return [
+                leased_at
+                for (leased_at,) in self.db.execute(
+                    "SELECT leased_at FROM agent_leases WHERE kind = ? AND expires_at > ?", (kind, now)
+                )
+            ]
+
+    def _delete(self, column: str, value: str) -> tuple[str, float] | None:
+        with self.transaction() as db:
+            row = db.execute(f"SELECT kind, leased_at FROM agent_leases WHERE {column} = ?", (value,)).fetchone()
+            db.execute(f"DELETE FROM agent_leases WHERE {column} = ?", (value,))
+        return row
+
+
+agent_leases = AgentLeases()
+
+
+@dataclass
+class AgentPoolStats:
+    leases: int = 0
+    queued: int = 0
+    busy_rejections: int = 0
+    timeouts: int = 0
+    expired: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    busy_seconds: float = 0.0
+
+
+class AgentPool:
+    def __init__(
+        self, kind: str, agents: list[Agent], lease_ttl: float | None = None, leases: AgentLeases | None = None
+    ) -> None:
+        self.kind = kind
+        self.agents = {agent.agent_id: agent for agent in agents}
+        self.lease_ttl = lease_ttl if lease_ttl is not None else PollPolicy().deadline
+        self.leases = leases or agent_leases
+        self.stats = AgentPoolStats()
+        self._wakeups: set[asyncio.Event] = set()
+        self._created_at = time.time()
+
+    async def try_acquire(self) -> Agent | None:
+        """Leases an idle agent, or returns None at once when every agent is busy."""
+        agent = await self._take()
+        if agent is None:
+            self.stats.busy_rejections += 1
+        return agent
+
+    async def acquire(self, timeout: float | None = None) -> Agent:
+        """Leases an idle agent, waiting up to `timeout` seconds for one when all are busy.
+
+        Waiters check the shared lease table every LEASE_POLL_SECONDS, and
+        straight away when this process releases an agent.
+        """
+        started = time.monotonic()
+        agent = await self._take()
+        if agent is not None:
+            return agent
+
+        self.stats.queued += 1
+        released = asyncio.Event()
+        self._wakeups.add(released)
+        log.info(f"All {len(self.agents)} {self.kind} agents are busy, {len(self._wakeups)} waiting in this process")
+        try:
+            while agent is None:
+                remaining = None if timeout is None else timeout - (time.monotonic() - started)
+                if remaining is not None and remaining <= 0:
+                    self.stats.timeouts += 1
+                    raise AgentPoolTimeoutError(f"No {self.kind} agent became idle within {timeout:g}s")
+                released.clear()
+                try:
+                    await asyncio.wait_for(released.wait(), LEASE_POLL_SECONDS if remaining is None else min(LEASE_POLL_SECONDS, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                agent = await self._take()
+        finally:
+            self._wakeups.discard(released)
+
+        waited = time.monotonic() - started
+        self.stats.total_wait_seconds += waited
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        log.info(f"Leased {self.kind} agent {agent.agent_id} after waiting {waited:.1f}s")
+        return agent
+
+    async def _take(self) -> Agent | None:
+        agent_id, expired = await asyncio.to_thread(self.leases.take, self.kind, list(self.agents), self.lease_ttl)
+        for expired_id in expired:
+            log.warning(f"Reclaimed {self.kind} agent {expired_id} after a {self.lease_ttl:.0f}s lease")
+        self.stats.expired += len(expired)
+        if agent_id is None:
+            return None
+        self.stats.leases += 1
+        return self.agents[agent_id]
+
+    async def assign(self, agent_id: str, container_id: str) -> None:
+        """Records which container a leased agent is running, so it can be released by container."""
+        await asyncio.to_thread(self.leases.assign, agent_id, container_id)
+
+    async def release(self, agent_id: str) -> None:
+        lease = await asyncio.to_thread(self.leases.release, agent_id)
+        if lease is not None:
+            self.released(lease[1])
+
+    def released(self, leased_at: float) -> None:
+        """Accounts for a lease of this pool that ended, and wakes this process's waiters."""
+        self.stats.busy_seconds += time.time() - leased_at
+        for released in self._wakeups:
+            released.set()
+
+    @asynccontextmanager
+    async def lease(self, timeout: float | None = None) -> AsyncIterator[Agent]:
+        agent = await self.acquire(timeout)
+        try:
+            yield agent
+        finally:
+            await self.release(agent.agent_id)
+
+    @asynccontextmanager
+    async def try_lease(self) -> AsyncIterator[Agent]:
+        """Like lease, but raises AgentsBusyError at once when every agent is busy."""
+        agent = await self.try_acquire()
+        if agent is None:
+            raise AgentsBusyError(f"All {len(self.agents)} {self.kind} agents are busy")
+        try:
+            yield agent
+        finally:
+            await self.release(agent.agent_id)
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.time()
+        busy = self.leases.busy(self.kind)
+        capacity = len(self.agents) * (now - self._created_at)
+        # Time this process's finished leases were held, plus every lease still running.
+        busy_seconds = self.stats.busy_seconds + sum(now - max(leased_at, self._created_at) for leased_at in busy)
+        return {
+            "agents": len(self.agents),
+            "busy": len(busy),
+            "waiting": len(self._wakeups),
+            "utilization": round(busy_seconds / capacity, 4) if capacity else 0.0,
+            "leases": self.stats.leases,
+            "queued": self.stats.queued,
+            "busy_rejections": self.stats.busy_rejections,
+            "timeouts": self.stats.timeouts,
+            "expired": self.stats.expired,
+            "avg_wait_seconds": self.stats.total_wait_seconds / self.stats.leases if self.stats.leases else 0.0,
+            "max_wait_seconds": self.stats.max_wait_seconds,
+        }
+
+
+def webhook_agents() -> set[str]:
+    """The agents whose webhook calls this service, from PHANTOMBUSTER_WEBHOOK_AGENTS."""
+    return {agent_id.strip() for agent_id in os.environ.get("PHANTOMBUSTER_WEBHOOK_AGENTS", "").split(",") if agent_id.strip()}
+
+
+def load_agents(kind: str) -> list[Agent]:
+    default_cookie = os.environ.get("LINKEDIN_SESSION_COOKIE")
+    calling_back = webhook_agents()
+    pool = os.environ.get(f"PHANTOMBUSTER_{kind.upper()}_AGENT_POOL")
+    if not pool:
+        agent_id = os.environ.get(AGENT_ID_ENV_VARS[kind])
+        return [Agent(agent_id, default_cookie, agent_id in calling_back)] if agent_id else []
+
+    agents = []
+    for entry in pool.split(","):
+        agent_id, _, cookie = entry.strip().partition("=")
+        if agent_id:
+            agents.append(Agent(agent_id, cookie or default_cookie, agent_id in calling_back))
+    return agents
+
+
+async def container_webhook(container_id: str) -> bool:
+    """Whether the agent running `container_id` calls this service when it ends, as far as the leases know."""
+    agent_id = await asyncio.to_thread(agent_leases.agent_for, container_id)
+    return agent_id is not None and agent_id in webhook_agents()
+
+
+_pools: dict[str, AgentPool] = {}
+
+
+def get_agent_pool(kind: str) -> AgentPool:
+    """Returns the agent pool for a data kind, built from the environment on first use."""
+    pool = _pools.get(kind)
+    if pool is None:
+        agents = load_agents(kind)
+        if not agents:
+            raise ValueError(f"Neither PHANTOMBUSTER_{kind.upper()}_AGENT_POOL nor {AGENT_ID_ENV_VARS[kind]} is set")
+        pool = _pools[kind] = AgentPool(kind, agents)
+    return pool
+
+
+async def release_container(container_id: str) -> None:
+    """Releases whichever pooled agent is running `container_id`, if any, whichever process leased it."""
+    lease = await asyncio.to_thread(agent_leases.release_container, container_id)
+    if lease is not None and (pool := _pools.get(lease[0])) is not None:
+        pool.released(lease[1])
+
+
+def agent_pool_stats() -> dict[str, dict[str, Any]]:
+    return {kind: pool.snapshot() for kind, pool in _pools.items()}
@@ -0,0 +1,108 @@
+import csv
+import hashlib
+import io
+import os
+from typing import Any
+
+import msgspec
+from restack_ai.function import log
+
+from src.utils.http import get_http_client
+from src.utils.metrics import current_function, download_bytes, job_launches
+from src.utils.storage import data_dir
+
+# Overridable so benchmarks can point the real functions at a local stand-in.
+PHANTOMBUSTER_API_URL = os.environ.get("PHANTOMBUSTER_API_URL", "https://api.phantombuster.com/api")
+
+AGENT_ID_ENV_VARS = {
+    "profile": "PHANTOMBUSTER_PROFILE_AGENT_ID",
+    "posts": "PHANTOMBUSTER_POSTS_AGENT_ID",
+    "reactions": "PHANTOMBUSTER_REACTIONS_AGENT_ID",
+}
+
+
+def build_headers(api_key: str) -> dict[str, str]:
+    return {
+        "X-Phantombuster-Key-1": api_key,
+        "Content-Type": "application/json",
+    }
+
+
+async def launch_agent(api_key: str, agent_id: str, argument: dict[str, Any]) -> str:
+    """Launches an agent and returns the new container's ID."""
+    client = get_http_client("phantombuster")
+    response = await client.post(
+        f"{PHANTOMBUSTER_API_URL}/v1/agent/{agent_id}/launch",
+        headers=build_headers(api_key),
+        json={"argument": argument},
+    )
+    response.raise_for_status()
+
+    container_id = response.json().get("data", {}).get("containerId")
+    if not container_id:
+        raise ValueError(f"Failed to get containerId from Phantombuster launch response: {response.text}")
+    job_launches.inc(provider="phantombuster", function=current_function())
+    return container_id
+
+
+async def fetch_container(api_key: str, container_id: str, with_result_object: bool = True) -> dict[str, Any]:
+    """Returns a container's status, with its result object once it has finished."""
+    client = get_http_client("phantombuster")
+    response = await client.get(
+        f"{PHANTOMBUSTER_API_URL}/v2/containers/fetch",
+        headers=build_headers(api_key),
+        params={"id": container_id, "withResultObject": str(with_result_object).lower()},
+    )
+    response.raise_for_status()
+    if with_result_object:
+        download_bytes.inc(len(response.content), provider="phantombuster", function=current_function())
+    return response.json()
+
+
+async def stop_agent(api_key: str, agent_id: str) -> None:
+    """Stops the container an agent is running, if any."""
+    client = get_http_client("phantombuster")
+    response = await client.post(
+        f"{PHANTOMBUSTER_API_URL}/v2/agents/stop",
+        headers=build_headers(api_key),
+        json={"id": agent_id},
+    )
+    response.raise_for_status()
+
+
+def write_input_list(profile_urls: list[str]) -> str:
+    """Writes profile URLs to a CSV that a container can download, and returns its public URL.
+
+    The file name is a hash of its content, so relaunching the same batch
+    reuses the same list.
+    """
+    base_url = os.environ.get("PHANTOMBUSTER_INPUT_BASE_URL")
+    if not base_url:
+        raise ValueError("PHANTOMBUSTER_INPUT_BASE_URL is not set")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["profileUrl"])
+    writer.writerows([url] for url in profile_urls)
+    content = buffer.getvalue()
+
+    name = f"{hashlib.sha256(content.encode()).hexdigest()[:16]}.csv"
+    (data_dir("inputs") / name).write_text(content)
+    log.info(f"Wrote Phantombuster input list {name} with {len(profile_urls)} profiles")
+    return f"{base_url.rstrip('/')}/inputs/{name}"
+
+
+def parse_result_object(result_object: Any) -> list[dict[str, Any]]:
+    """Decodes a container's resultObject, which Phantombuster returns as a JSON string."""
+    if not result_object:
+        return []
+    records = msgspec.json.decode(result_object) if isinstance(result_object, str) else result_object
+    return records if isinstance(records, list) else [records]
+
+
+def record_profile_url(record: dict[str, Any]) -> str | None:
+    """Returns the input profile URL a Phantombuster result record was produced for."""
+    for key in ("query", "inputUrl", "profileUrl", "linkedinProfileUrl", "baseUrl"):
+        if record.get(key):
+            return record[key]
+    return None
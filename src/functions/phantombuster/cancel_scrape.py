@@ -0,0 +1,89 @@
+import asyncio
+import os
+from typing import Any, Literal
+
+import httpx
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.phantombuster.agent_pool import agent_leases, release_container
+from src.functions.phantombuster.api import stop_agent
+from src.utils.cache import scrape_jobs_in_flight
+from src.utils.metrics import pop_status_checks
+from src.utils.rate_limit import is_transient
+from src.utils.urls import canonical_profile_url
+
+# Changes to this file should also be reflected in the Bright Data version
+
+class CancelScrapeInput(BaseModel):
+    """Input parameters for stopping a Phantombuster container nobody is waiting for."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    container_id: str = Field(
+        ...,
+        title="Container ID",
+        description="The container returned by launch_scrape_phantombuster.",
+    )
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile the container was launched for.",
+    )
+    kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What was being scraped.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("cancel_scrape_phantombuster function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def cancel_scrape_phantombuster(function_input: CancelScrapeInput) -> dict[str, Any]:
+    """Stops a container whose workflow was cancelled and releases its agent.
+
+    A container that other launches joined keeps running until the last of
+    them is cancelled too. A container
+    that already finished only has its agent released.
+    """
+    try:
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        container_id = function_input.container_id
+        key = ("phantombuster", function_input.kind, canonical_profile_url(function_input.profile_url))
+        if not scrape_jobs_in_flight.leave(key, container_id):
+            log.info(f"Leaving container {container_id} running for the other launches waiting on it")
+            return {"cancelled": False}
+
+        agent_id = await asyncio.to_thread(agent_leases.agent_for, container_id)
+        if agent_id is not None:
+            try:
+                await stop_agent(api_key, agent_id)
+            except httpx.HTTPStatusError as e:
+                if is_transient(e):
+                    raise
+                log.warning(f"Could not stop agent {agent_id} running container {container_id}: {e}")
+        await release_container(container_id)
+        pop_status_checks("phantombuster", container_id)
+
+    except NonRetryableError:
+        raise
+    except Exception as e:
+        error_message = f"cancel_scrape_phantombuster failed: {e}"
+        if is_transient(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Cancelled Phantombuster container {container_id}")
+        return {"cancelled": True}
@@ -0,0 +1,44 @@
+from typing import Any
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, function, log
+
+from src.utils.watermarks import watermarks
+from src.utils.webhooks import current_workflow
+
+# Changes to this file should also be reflected in the Bright Data version
+
+
+class CommitWatermarkInput(BaseModel):
+    """Input parameters for advancing a profile's posts watermark after an incremental scrape."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile whose posts were scraped incrementally.",
+    )
+
+
+@function.defn()
+async def commit_watermark_phantombuster(function_input: CommitWatermarkInput) -> dict[str, Any]:
+    """Commits the watermark this workflow run's launch or fetch step staged.
+
+    Runs once the workflow holds the incremental result, so a step that was
+    retried after its result was lost returns the same new posts instead of
+    none. Committing again finds nothing staged and is not an error.
+    """
+    try:
+        run = current_workflow()
+        committed = run is not None and watermarks.commit("phantombuster", function_input.profile_url, run)
+    except Exception as e:
+        error_message = f"commit_watermark_phantombuster failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Watermark for {function_input.profile_url} {'advanced' if committed else 'already committed'}")
+        return {"committed": committed}
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.phantombuster.agent_pool import release_container
+from src.functions.phantombuster.api import fetch_container
+from src.utils.blobs import claim_checked
+from src.utils.cache import scrape_cache, scrape_jobs_in_flight
+from src.utils.metrics import pop_status_checks, record_job_completion
+from src.utils.polling import durations
+from src.utils.rate_limit import is_transient
+from src.utils.urls import canonical_profile_url
+from src.utils.watermarks import apply_watermark
+from src.utils.webhooks import current_workflow
+
+
+class FetchScrapeResultInput(BaseModel):
+    """Input parameters for fetching a finished Phantombuster container's result."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    container_id: str = Field(
+        ...,
+        title="Container ID",
+        description="The container returned by launch_scrape_phantombuster.",
+    )
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile the container was launched for.",
+    )
+    kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What was scraped.",
+    )
+    incremental: bool = Field(
+        False,
+        title="Incremental",
+        description="For posts, return only posts newer than the profile's watermark.",
+    )
+    elapsed_seconds: float | None = Field(
+        None,
+        title="Elapsed Seconds",
+        description="How long the container ran, used to learn when to first check the next one.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("fetch_scrape_result_phantombuster function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+@claim_checked
+async def fetch_scrape_result_phantombuster(function_input: FetchScrapeResultInput) -> dict[str, Any]:
+    """Fetches a finished container's result object.
+
+    The container is finished and paid for, so network errors and 5xx and 429
+    responses are retryable. Other 4xx responses are not.
+    """
+    try:
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        profile_url = canonical_profile_url(function_input.profile_url)
+        kind = function_input.kind
+        container_id = function_input.container_id
+        status_response = await fetch_container(api_key, container_id)
+        if status_response.get("status") in ("finished", "failed"):
+            await release_container(container_id)
+
+        if status_response.get("status") != "finished":
+            raise_exception(f"Phantombuster container {container_id} has not finished. Details: {status_response}")
+
+        result = {
+            "status": "success",
+            "containerId": container_id,
+            "resultObject": status_response.get("resultObject"),
+        }
+        await asyncio.to_thread(scrape_cache.set, "phantombuster", kind, profile_url, result)
+        scrape_jobs_in_flight.finish(("phantombuster", kind, profile_url))
+        status_checks = pop_status_checks("phantombuster", container_id)
+        if function_input.elapsed_seconds is not None:
+            durations.record(f"phantombuster:{kind}", function_input.elapsed_seconds)
+            record_job_completion(f"phantombuster:{kind}", function_input.elapsed_seconds, status_checks)
+        if function_input.incremental and kind == "posts":
+            result = apply_watermark("phantombuster", profile_url, result, run=current_workflow())
+
+    except Exception as e:
+        error_message = f"fetch_scrape_result_phantombuster failed: {e}"
+        if is_transient(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Phantombuster job for container {container_id} finished successfully.")
+        return result
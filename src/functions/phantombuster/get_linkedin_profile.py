@@ -1,12 +1,15 @@
 import os
 from typing import Any
-from dotenv import load_dotenv
-import asyncio
 from pydantic import BaseModel, Field
-from restack_ai.function import NonRetryableError, function, log
-import httpx
+from restack_ai.function import NonRetryableError, RetryableError, function, log
 
-load_dotenv()
+from src.functions.phantombuster.agent_pool import AgentsBusyError, get_agent_pool
+from src.functions.phantombuster.api import fetch_container, launch_agent
+from src.utils.blobs import claim_checked
+from src.utils.cache import cached_scrape
+from src.utils.polling import poll_until
+from src.utils.rate_limit import is_rate_limited
+from src.utils.urls import canonical_profile_url
 
 
 class GetProfileInput(BaseModel):
@@ -25,6 +28,16 @@ class GetProfileInput(BaseModel):
         description="The URL of the LinkedIn profile.",
         example="https://www.linkedin.com/in/williamhgates/",
     )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
 
 
 def raise_exception(message: str) -> None:
@@ -33,64 +46,49 @@ def raise_exception(message: str) -> None:
 
 
 @function.defn()
+@claim_checked
+@cached_scrape("phantombuster", "profile")
 async def get_linkedin_profile_phantombuster(function_input: GetProfileInput) -> dict[str, Any]:
     try:
         api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
         if not api_key:
             raise_exception("PHANTOMBUSTER_API_KEY is not set")
 
-        headers = {
-            "X-Phantombuster-Key-1": api_key,
-            "Content-Type": "application/json",
-        }
-
-        agent_id = os.environ.get("PHANTOMBUSTER_PROFILE_AGENT_ID")
-        if not agent_id:
-            raise_exception("PHANTOMBUSTER_PROFILE_AGENT_ID is not set")
-
-        argument = {
-            "sessionCookie": os.environ.get("LINKEDIN_SESSION_COOKIE"),
-            "spreadsheetUrl": function_input.profile_url,
-            "homerun": True,
-        }
-
-        async with httpx.AsyncClient() as client:
-            log.info(f"Initiating scrape for {function_input.profile_url}")
-            launch_url = f"https://api.phantombuster.com/api/v1/agent/{agent_id}/launch"
-            response = await client.post(launch_url, headers=headers, json={"argument": argument})
-            response.raise_for_status()
-
-            response_json = response.json()
-            log.info(f"Phantombuster launch response: {response_json}")
-            
-            container_id = response_json.get("data", {}).get("containerId")
-            if not container_id:
-                raise_exception("Failed to get containerId from Phantombuster launch response.")
+        async with get_agent_pool("profile").try_lease() as agent:
+            argument = {
+                "sessionCookie": agent.session_cookie,
+                "spreadsheetUrl": canonical_profile_url(function_input.profile_url),
+                "homerun": True,
+            }
 
+            log.info(f"Initiating scrape for {function_input.profile_url} on agent {agent.agent_id}")
+            container_id = await launch_agent(api_key, agent.agent_id, argument)
             log.info(f"Scrape initiated. Container ID: {container_id}")
 
-            status_response = {}
-            while True:
+            async def check_status() -> dict[str, Any]:
                 log.info(f"Checking status for container {container_id}...")
-                output_url = f"https://api.phantombuster.com/api/v2/containers/fetch?id={container_id}&withResultObject=true"
-                response = await client.get(output_url, headers=headers)
-                response.raise_for_status()
-                log.info(f"Phantombuster response: {response.json()}")
-                
-                status_response = response.json()
+                status_response = await fetch_container(api_key, container_id)
                 status = status_response.get("status")
                 log.info(f"Container status: {status}")
 
-                if status == "finished":
-                    break
-                elif status == "failed":
+                if status == "failed":
                     raise_exception(f"Phantombuster container {container_id} failed. Details: {status_response}")
-                
-                await asyncio.sleep(5)
-            
-            log.info(f"Phantombuster job for container {container_id} finished successfully.")
-            return {"status": "success", "containerId": container_id}
+                return status_response
+
+            status_response = await poll_until(
+                check_status,
+                lambda status_response: status_response.get("status") == "finished",
+                key="phantombuster:profile",
+            )
+
+        log.info(f"Phantombuster job for container {container_id} finished successfully.")
+        return {"status": "success", "containerId": container_id}
 
+    except AgentsBusyError as e:
+        # Let the caller's retry policy wait for an agent rather than hold a worker slot.
+        raise RetryableError(f"get_linkedin_profile_phantombuster failed: {e}") from e
     except Exception as e:
         error_message = f"get_linkedin_profile_phantombuster failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
         raise NonRetryableError(error_message) from e
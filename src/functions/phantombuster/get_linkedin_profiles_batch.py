@@ -0,0 +1,243 @@
+import asyncio
+import json
+import os
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.phantombuster.agent_pool import AgentsBusyError, get_agent_pool, release_container
+from src.functions.phantombuster.api import (
+    fetch_container,
+    launch_agent,
+    parse_result_object,
+    record_profile_url,
+    write_input_list,
+)
+from src.utils.blobs import claim_checked
+from src.utils.cache import scrape_cache
+from src.utils.metrics import pop_status_checks, record_job_completion
+from src.utils.polling import durations
+from src.utils.rate_limit import is_rate_limited, is_transient
+from src.utils.urls import canonical_profile_url_or_none, canonical_profile_urls
+from src.utils.webhooks import register_current_workflow, webhook_url
+
+
+class GetProfilesBatchInput(BaseModel):
+    """Input parameters for scraping many LinkedIn profiles in one container launch."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_urls: list[str] = Field(
+        ...,
+        title="LinkedIn Profile URLs",
+        description="The URLs of the LinkedIn profiles.",
+        example=["https://www.linkedin.com/in/williamhgates/", "https://www.linkedin.com/in/satyanadella/"],
+        min_length=1,
+    )
+    data_kind: Literal["profile", "posts", "reactions"] = Field(
+        "profile",
+        title="Data Kind",
+        description="Which agent to launch: profile, posts or reactions.",
+    )
+
+
+class LaunchProfilesBatchInput(BaseModel):
+    """Input parameters for launching an agent on a list of profiles without waiting for it."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_urls: list[str] = Field(
+        ...,
+        title="LinkedIn Profile URLs",
+        description="The URLs of the LinkedIn profiles.",
+        min_length=1,
+    )
+    data_kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="Which agent to launch: profile, posts or reactions.",
+    )
+
+
+class FetchProfilesBatchInput(BaseModel):
+    """Input parameters for fetching a finished batch container's result."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    container_id: str = Field(
+        ...,
+        title="Container ID",
+        description="The container returned by launch_profiles_batch_phantombuster.",
+    )
+    profile_urls: list[str] = Field(
+        ...,
+        title="LinkedIn Profile URLs",
+        description="The URLs of the LinkedIn profiles the container was launched for.",
+    )
+    data_kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What was scraped.",
+    )
+    errors: dict[str, str] = Field(
+        default_factory=dict,
+        title="Errors",
+        description="Errors to return alongside the container's, such as for inputs that aren't URLs.",
+    )
+    elapsed_seconds: float | None = Field(
+        None,
+        title="Elapsed Seconds",
+        description="How long the container ran, used to learn when to first check the next one.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("Phantombuster profiles batch function failed", error=message)
+    raise NonRetryableError(message)
+
+
+def duration_key(data_kind: str) -> str:
+    return f"phantombuster:{data_kind}:batch"
+
+
+@function.defn()
+async def launch_profiles_batch_phantombuster(function_input: LaunchProfilesBatchInput) -> dict[str, Any]:
+    """Leases an idle agent and launches it on a list of profiles.
+
+    Returns the container's handle. Like launch_scrape_phantombuster, the agent
+    stays leased until the fetch step (or a failed status check) releases it,
+    and the step fails at once with a retryable error when every agent is
+    busy.
+    """
+    try:
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        data_kind = function_input.data_kind
+        profile_urls, invalid = canonical_profile_urls(function_input.profile_urls)
+        if invalid:
+            raise_exception(f"Not profile URLs: {', '.join(invalid)}")
+        spreadsheet_url = write_input_list(profile_urls)
+        notify_url = webhook_url("phantombuster")
+
+        pool = get_agent_pool(data_kind)
+        agent = await pool.try_acquire()
+        if agent is None:
+            raise AgentsBusyError(f"All {len(pool.agents)} {data_kind} agents are busy")
+        argument = {
+            "sessionCookie": agent.session_cookie,
+            "spreadsheetUrl": spreadsheet_url,
+            "columnName": "profileUrl",
+            "numberOfAddsPerLaunch": len(profile_urls),
+            "homerun": True,
+        }
+
+        log.info(f"Initiating batch scrape of {len(profile_urls)} profiles ({data_kind}) on agent {agent.agent_id}")
+        try:
+            container_id = await launch_agent(api_key, agent.agent_id, argument)
+        except Exception:
+            await pool.release(agent.agent_id)
+            raise
+        await pool.assign(agent.agent_id, container_id)
+        webhook = notify_url is not None and agent.webhook
+        await register_current_workflow("phantombuster", container_id)
+        log.info(f"Batch scrape initiated. Container ID: {container_id}")
+
+    except AgentsBusyError as e:
+        # Let the step's retry policy wait for an agent rather than hold a worker slot.
+        raise RetryableError(f"launch_profiles_batch_phantombuster failed: {e}") from e
+    except Exception as e:
+        error_message = f"launch_profiles_batch_phantombuster failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        return {
+            "container_id": container_id,
+            "expected_seconds": durations.expected(duration_key(data_kind)),
+            "webhook": webhook,
+        }
+
+
+@function.defn()
+@claim_checked
+async def fetch_profiles_batch_phantombuster(function_input: FetchProfilesBatchInput) -> dict[str, Any]:
+    """Fetches a finished batch container's result and splits it per profile.
+
+    Returns `results` (a list of records per profile) and `errors`, both keyed by
+    canonical profile URL (errors for inputs that aren't URLs by the input),
+    and caches each profile's records. Like fetch_scrape_result_phantombuster,
+    transient errors are retryable.
+    """
+    try:
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        data_kind = function_input.data_kind
+        container_id = function_input.container_id
+        profile_urls, _ = canonical_profile_urls(function_input.profile_urls)
+        status_response = await fetch_container(api_key, container_id)
+        if status_response.get("status") in ("finished", "failed"):
+            await release_container(container_id)
+
+        if status_response.get("status") != "finished":
+            raise_exception(f"Phantombuster container {container_id} has not finished. Details: {status_response}")
+
+        results: dict[str, list[dict[str, Any]]] = {url: [] for url in profile_urls}
+        errors: dict[str, str] = dict(function_input.errors)
+        for record in parse_result_object(status_response.get("resultObject")):
+            url = canonical_profile_url_or_none(record_profile_url(record))
+            if url not in results:
+                log.warning("Phantombuster returned a record for an unknown profile", url=record_profile_url(record))
+                continue
+            if record.get("error"):
+                errors[url] = record["error"]
+            else:
+                results[url].append(record)
+
+        for url in profile_urls:
+            if not results[url]:
+                del results[url]
+                errors.setdefault(url, "No record returned by Phantombuster")
+
+        def cache_profiles() -> None:
+            # Same shape as a single-profile scrape, so later lookups hit the cache.
+            for url, records in results.items():
+                scrape_cache.set(
+                    "phantombuster",
+                    data_kind,
+                    url,
+                    {"status": "success", "containerId": container_id, "resultObject": json.dumps(records)},
+                )
+
+        await asyncio.to_thread(cache_profiles)
+        status_checks = pop_status_checks("phantombuster", container_id)
+        if function_input.elapsed_seconds is not None:
+            durations.record(duration_key(data_kind), function_input.elapsed_seconds)
+            record_job_completion(duration_key(data_kind), function_input.elapsed_seconds, status_checks)
+
+    except Exception as e:
+        error_message = f"fetch_profiles_batch_phantombuster failed: {e}"
+        if is_transient(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Batch scrape finished: {len(results)} profiles, {len(errors)} errors")
+        return {"status": "success", "containerId": container_id, "results": results, "errors": errors}
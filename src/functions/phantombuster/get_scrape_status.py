@@ -0,0 +1,62 @@
+import os
+from typing import Any
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.phantombuster.agent_pool import release_container
+from src.functions.phantombuster.api import fetch_container
+from src.utils.metrics import count_status_check, pop_status_checks
+
+
+class ScrapeStatusInput(BaseModel):
+    """Input parameters for checking a Phantombuster container."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    container_id: str = Field(
+        ...,
+        title="Container ID",
+        description="The container returned by launch_scrape_phantombuster.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("get_scrape_status_phantombuster function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def get_scrape_status_phantombuster(function_input: ScrapeStatusInput) -> dict[str, Any]:
+    """Returns a container's status without downloading its result object.
+
+    A failed container is non-retryable. Transient errors while checking are
+    retryable, so a network blip does not throw away a long running job.
+    """
+    try:
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        container_id = function_input.container_id
+        status_response = await fetch_container(api_key, container_id, with_result_object=False)
+        status = status_response.get("status")
+        log.info(f"Container {container_id} status: {status}")
+        count_status_check("phantombuster", container_id)
+
+        if status == "failed":
+            pop_status_checks("phantombuster", container_id)
+            await release_container(container_id)
+            raise_exception(f"Phantombuster container {container_id} failed. Details: {status_response}")
+
+    except NonRetryableError:
+        raise
+    except Exception as e:
+        error_message = f"get_scrape_status_phantombuster failed: {e}"
+        raise RetryableError(error_message) from e
+    else:
+        return {"status": status, "done": status == "finished"}
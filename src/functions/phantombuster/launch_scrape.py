@@ -0,0 +1,143 @@
+import asyncio
+import os
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.phantombuster.agent_pool import AgentsBusyError, container_webhook, get_agent_pool
+from src.functions.phantombuster.api import launch_agent
+from src.utils.blobs import claim_check
+from src.utils.cache import scrape_cache, scrape_jobs_in_flight
+from src.utils.polling import durations
+from src.utils.rate_limit import is_rate_limited
+from src.utils.urls import canonical_profile_url
+from src.utils.watermarks import apply_watermark, watermarks
+from src.utils.webhooks import current_workflow, register_current_workflow, webhook_url
+
+# Changes to this file should also be reflected in the Bright Data version
+
+
+class LaunchScrapeInput(BaseModel):
+    """Input parameters for launching a Phantombuster agent without waiting for it."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile.",
+        example="https://www.linkedin.com/in/williamhgates/",
+    )
+    kind: Literal["profile", "posts", "reactions"] = Field(
+        ...,
+        title="Data Kind",
+        description="What to scrape, which also selects the agent to launch.",
+    )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
+    incremental: bool = Field(
+        False,
+        title="Incremental",
+        description="For posts, return only posts newer than the profile's watermark.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("launch_scrape_phantombuster function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def launch_scrape_phantombuster(function_input: LaunchScrapeInput) -> dict[str, Any]:
+    """Leases an idle agent, launches it and returns its container's handle.
+
+    Returns `result` instead when the cache already has a fresh enough answer,
+    except to an incremental posts scrape of a profile with a watermark, and
+    joins an already running container for the same profile and kind. The
+    agent stays leased until the fetch step (or a failed status check)
+    releases it. When every agent is busy the step fails at once with a
+    retryable error, and the workflow's retry policy does the waiting.
+    """
+    try:
+        profile_url = canonical_profile_url(function_input.profile_url)
+        kind = function_input.kind
+        incremental = function_input.incremental and kind == "posts"
+        # Like the single-call function: once there is a watermark, fetch the feed again.
+        watermarked = incremental and watermarks.get("phantombuster", profile_url) is not None
+
+        if not function_input.force_refresh and not watermarked:
+            cached = await asyncio.to_thread(scrape_cache.get, "phantombuster", kind, profile_url, function_input.max_age)
+            if cached is not None:
+                log.info(f"Serving phantombuster {kind} for {profile_url} from cache")
+                if incremental:
+                    cached = apply_watermark("phantombuster", profile_url, cached, run=current_workflow())
+                return {"result": claim_check(cached)}
+
+        expected_seconds = durations.expected(f"phantombuster:{kind}")
+        notify_url = webhook_url("phantombuster")
+        container_id = scrape_jobs_in_flight.get(("phantombuster", kind, profile_url))
+        if container_id:
+            await register_current_workflow("phantombuster", container_id)
+            log.info(f"Joining running container {container_id} for {profile_url}")
+            return {
+                "container_id": container_id,
+                "expected_seconds": expected_seconds,
+                "webhook": notify_url is not None and await container_webhook(container_id),
+                "result": None,
+            }
+
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        pool = get_agent_pool(kind)
+        agent = await pool.try_acquire()
+        if agent is None:
+            raise AgentsBusyError(f"All {len(pool.agents)} {kind} agents are busy")
+        argument = {
+            "sessionCookie": agent.session_cookie,
+            "spreadsheetUrl": profile_url,
+            "homerun": True,
+        }
+
+        log.info(f"Initiating {kind} scrape for {profile_url} on agent {agent.agent_id}")
+        try:
+            container_id = await launch_agent(api_key, agent.agent_id, argument)
+        except Exception:
+            await pool.release(agent.agent_id)
+            raise
+        await pool.assign(agent.agent_id, container_id)
+        # Phantombuster only calls back for agents whose webhook is set to this service.
+        webhook = notify_url is not None and agent.webhook
+        scrape_jobs_in_flight.add(("phantombuster", kind, profile_url), container_id)
+        await register_current_workflow("phantombuster", container_id)
+        log.info(f"Scrape initiated. Container ID: {container_id}")
+
+    except AgentsBusyError as e:
+        # Let the step's retry policy wait for an agent rather than hold a worker slot.
+        raise RetryableError(f"launch_scrape_phantombuster failed: {e}") from e
+    except Exception as e:
+        error_message = f"launch_scrape_phantombuster failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        return {
+            "container_id": container_id,
+            "expected_seconds": expected_seconds,
+            "webhook": webhook,
+            "result": None,
+        }
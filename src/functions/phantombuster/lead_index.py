@@ -0,0 +1,52 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+
+from src.utils.storage import data_dir
+from src.utils.urls import canonical_profile_url_or_none
+
+# Local index of leads already saved to Phantombuster org storage, keyed by
+# canonical profile URL, so bulk saves skip them and can resume after an
+# interruption without re-sending finished chunks. Called from worker threads,
+# so one connection is shared under a lock.
+
+
+class LeadIndex:
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path or data_dir() / "leads.sqlite3", check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS saved_leads (url TEXT PRIMARY KEY, saved_at REAL)")
+        return self._db
+
+    def saved(self, urls: Iterable[str]) -> set[str]:
+        """Returns which of the given canonical URLs have already been saved."""
+        urls = list(urls)
+        found: set[str] = set()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit.
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                rows = self.db.execute(
+                    f"SELECT url FROM saved_leads WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def mark_saved(self, urls: Iterable[str]) -> None:
+        """Indexes many saved leads in one transaction."""
+        now = time.time()
+        # A lead saved under something that isn't a URL can't be looked up by one.
+        rows = [(canonical, now) for canonical in map(canonical_profile_url_or_none, urls) if canonical]
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO saved_leads VALUES (?, ?)", rows)
+
+
+lead_index = LeadIndex()
@@ -1,11 +1,13 @@
+import asyncio
 import os
 from typing import Any, Dict
-from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from restack_ai.function import NonRetryableError, function, log
-import httpx
+from restack_ai.function import NonRetryableError, RetryableError, function, log
 
-load_dotenv()
+from src.functions.phantombuster.api import PHANTOMBUSTER_API_URL
+from src.functions.phantombuster.lead_index import lead_index
+from src.utils.http import get_http_client
+from src.utils.rate_limit import is_rate_limited
 
 class SaveLeadInput(BaseModel):
     """Input parameters for saving a LinkedIn lead."""
@@ -41,21 +43,24 @@ async def save_linkedin_lead_phantombuster(function_input: SaveLeadInput) -> dic
             "Content-Type": "application/json",
         }
 
-        save_url = "https://api.phantombuster.com/api/v2/org-storage/leads/save"
+        save_url = f"{PHANTOMBUSTER_API_URL}/v2/org-storage/leads/save"
         
         payload = {
             "linkedinProfileUrl": function_input.linkedin_profile_url
         }
 
-        async with httpx.AsyncClient() as client:
-            log.info(f"Saving lead {function_input.linkedin_profile_url} to Phantombuster.")
-            response = await client.post(save_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            response_json = response.json()
-            log.info(f"Phantombuster save lead response: {response_json}")
-            return response_json
+        client = get_http_client("phantombuster")
+        log.info(f"Saving lead {function_input.linkedin_profile_url} to Phantombuster.")
+        response = await client.post(save_url, headers=headers, json=payload)
+        response.raise_for_status()
+        await asyncio.to_thread(lead_index.mark_saved, [function_input.linkedin_profile_url])
+
+        response_json = response.json()
+        log.info(f"Phantombuster save lead response: {response_json}")
+        return response_json
 
     except Exception as e:
         error_message = f"save_linkedin_lead_phantombuster failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
         raise NonRetryableError(error_message) from e
@@ -0,0 +1,258 @@
+import asyncio
+import os
+from typing import Any
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, RetryableError, function, log
+
+from src.functions.phantombuster.api import PHANTOMBUSTER_API_URL
+from src.functions.phantombuster.lead_index import lead_index
+from src.utils.blobs import claim_check, is_claim_check, pageable_items, resolve
+from src.utils.http import get_http_client
+from src.utils.rate_limit import is_rate_limited
+from src.utils.urls import canonical_profile_url
+
+# Keys holding the profile URL in lead records, e.g. scraped profiles.
+LEAD_URL_KEYS = ("linkedinProfileUrl", "linkedin_profile_url", "profileUrl", "profile_url", "url")
+
+# Leads, inline or behind a claim check for a large list.
+Leads = list[str | dict[str, Any]] | dict[str, Any]
+
+
+class SaveLeadsInput(BaseModel):
+    """Input parameters for saving a list of LinkedIn leads in chunks."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    leads: Leads = Field(
+        ...,
+        title="Leads",
+        description=(
+            "Profile URLs, or records with a `linkedinProfileUrl`, `profileUrl` or `url` key. "
+            "Pass a large list as a claim check, e.g. a stored batch scrape result."
+        ),
+        example=["https://www.linkedin.com/in/le-awn/", {"profileUrl": "https://www.linkedin.com/in/williamhgates/"}],
+    )
+    chunk_size: int = Field(
+        500,
+        title="Chunk Size",
+        description="How many leads each step saves.",
+        ge=1,
+        le=5000,
+    )
+    concurrency: int = Field(
+        8,
+        title="Concurrency",
+        description="How many leads to save in parallel within a chunk.",
+        ge=1,
+        le=32,
+    )
+    force: bool = Field(
+        False,
+        title="Force",
+        description="Save leads again even if the local index says they are already saved.",
+    )
+
+
+class SaveLeadsBatchInput(BaseModel):
+    """Input parameters for saving one chunk of LinkedIn leads."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    leads: Leads = Field(
+        ...,
+        title="Leads",
+        description="Profile URLs, or records with a `linkedinProfileUrl`, `profileUrl` or `url` key, or a claim check for them.",
+        example=["https://www.linkedin.com/in/le-awn/", {"profileUrl": "https://www.linkedin.com/in/williamhgates/"}],
+    )
+    concurrency: int = Field(
+        8,
+        title="Concurrency",
+        description="How many leads to save in parallel.",
+        ge=1,
+        le=32,
+    )
+    force: bool = Field(
+        False,
+        title="Force",
+        description="Save leads again even if the local index says they are already saved.",
+    )
+
+
+class ChunkLeadsInput(BaseModel):
+    """Input parameters for splitting a claim-checked lead list into stored chunks."""
+
+    model_config = {
+        "extra": "forbid",
+        "validate_assignment": True,
+    }
+
+    leads: dict[str, Any] = Field(..., title="Leads", description="A claim check for the leads.")
+    chunk_size: int = Field(..., title="Chunk Size", ge=1)
+
+
+class MergeLeadErrorsInput(BaseModel):
+    """Input parameters for combining the chunks' lead errors into one result."""
+
+    model_config = {
+        "extra": "forbid",
+        "validate_assignment": True,
+    }
+
+    errors: list[dict[str, Any]] = Field(
+        ...,
+        title="Errors",
+        description="Each chunk's errors by lead: a dict or a claim check for one.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("save_linkedin_leads_batch_phantombuster function failed", error=message)
+    raise NonRetryableError(message)
+
+
+def lead_url(lead: str | dict[str, Any]) -> str | None:
+    if isinstance(lead, str):
+        return lead or None
+    for key in LEAD_URL_KEYS:
+        if isinstance(lead.get(key), str) and lead[key]:
+            return lead[key]
+    return None
+
+
+def lead_list(leads: Leads) -> list[Any]:
+    """The leads behind `leads`, reading a claim check's stored list."""
+    return pageable_items(resolve(leads)) if is_claim_check(leads) else leads
+
+
+@function.defn()
+async def chunk_linkedin_leads_phantombuster(function_input: ChunkLeadsInput) -> list[Any]:
+    """Stores a claim-checked lead list as chunks and returns a claim check per chunk.
+
+    The workflow then hands each save step one small reference instead of
+    carrying the whole list through its history.
+    """
+    try:
+
+        def store() -> list[Any]:
+            leads = lead_list(function_input.leads)
+            size = function_input.chunk_size
+            return [claim_check(leads[i:i + size], always=True) for i in range(0, len(leads), size)]
+
+        chunks = await asyncio.to_thread(store)
+    except Exception as e:
+        error_message = f"chunk_linkedin_leads_phantombuster failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Split leads into {len(chunks)} chunks")
+        return chunks
+
+
+@function.defn()
+async def merge_lead_errors_phantombuster(function_input: MergeLeadErrorsInput) -> Any:
+    """Returns every chunk's lead errors in one dict, as a claim check when large."""
+    try:
+
+        def merge() -> Any:
+            errors: dict[str, str] = {}
+            for chunk_errors in function_input.errors:
+                errors.update(resolve(chunk_errors))
+            return claim_check(errors)
+
+        errors = await asyncio.to_thread(merge)
+    except Exception as e:
+        error_message = f"merge_lead_errors_phantombuster failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        return errors
+
+
+@function.defn()
+async def save_linkedin_leads_batch_phantombuster(function_input: SaveLeadsBatchInput) -> dict[str, Any]:
+    """Saves many leads to Phantombuster's storage with bounded parallelism.
+
+    Each lead is sent as its whole record, with `linkedinProfileUrl` set to
+    the canonical URL. Leads already in the local index are skipped, and the
+    saved leads are indexed in one transaction when the chunk ends, also when
+    it ends rate limited, so a retried or re-run batch picks up where it
+    stopped. Returns `saved`, `skipped` and `failed` counts, and `errors`
+    keyed by canonical URL (or by the raw lead when it has none), stored as a
+    claim check when there are any.
+    """
+    try:
+        api_key = os.environ.get("PHANTOMBUSTER_API_KEY")
+        if not api_key:
+            raise_exception("PHANTOMBUSTER_API_KEY is not set")
+
+        leads = await asyncio.to_thread(lead_list, function_input.leads)
+        errors: dict[str, str] = {}
+        # The first record per canonical URL, as sent to Phantombuster.
+        records: dict[str, dict[str, Any]] = {}
+        for lead in leads:
+            url = lead_url(lead)
+            if url is None:
+                errors[str(lead)] = "No LinkedIn profile URL in lead"
+                continue
+            try:
+                canonical = canonical_profile_url(url)
+            except ValueError as e:
+                errors[str(lead)] = str(e)
+                continue
+            record = lead if isinstance(lead, dict) else {}
+            records.setdefault(canonical, {**record, "linkedinProfileUrl": canonical})
+        urls = list(records)
+
+        already_saved = set() if function_input.force else await asyncio.to_thread(lead_index.saved, urls)
+        skipped = [url for url in urls if url in already_saved]
+        pending = [url for url in urls if url not in already_saved]
+        log.info(f"Saving {len(pending)} leads to Phantombuster, {len(skipped)} already saved")
+
+        headers = {
+            "X-Phantombuster-Key-1": api_key,
+            "Content-Type": "application/json",
+        }
+        save_url = f"{PHANTOMBUSTER_API_URL}/v2/org-storage/leads/save"
+        client = get_http_client("phantombuster")
+        semaphore = asyncio.Semaphore(function_input.concurrency)
+
+        async def save(url: str) -> None:
+            async with semaphore:
+                response = await client.post(save_url, headers=headers, json=records[url])
+                response.raise_for_status()
+
+        outcomes = await asyncio.gather(*(save(url) for url in pending), return_exceptions=True)
+
+        saved: list[str] = []
+        rate_limited = None
+        for url, outcome in zip(pending, outcomes):
+            if outcome is None:
+                saved.append(url)
+            elif is_rate_limited(outcome):
+                rate_limited = outcome
+            else:
+                errors[url] = str(outcome)
+        await asyncio.to_thread(lead_index.mark_saved, saved)
+
+        if rate_limited is not None:
+            # Retry the whole batch; leads saved so far are indexed and skipped next time.
+            raise rate_limited
+        # Every chunk's errors reach the workflow as a small reference.
+        stored_errors = await asyncio.to_thread(lambda: claim_check(errors, always=True)) if errors else {}
+
+    except Exception as e:
+        error_message = f"save_linkedin_leads_batch_phantombuster failed: {e}"
+        if is_rate_limited(e):
+            raise RetryableError(error_message) from e
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Lead batch finished: {len(saved)} saved, {len(skipped)} skipped, {len(errors)} errors")
+        return {"saved": len(saved), "skipped": len(skipped), "failed": len(errors), "errors": stored_errors}
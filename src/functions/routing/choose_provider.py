@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, function, log
+
+from src.utils.blobs import claim_check
+from src.utils.cache import scrape_cache
+from src.utils.routing import hedge_after, rank_providers
+from src.utils.urls import canonical_profile_url
+
+
+class ChooseProviderInput(BaseModel):
+    """Input parameters for picking a provider for a profile or posts scrape."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile.",
+        example="https://www.linkedin.com/in/williamhgates/",
+    )
+    kind: Literal["profile", "posts"] = Field(
+        ...,
+        title="Data Kind",
+        description="What will be scraped.",
+    )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
+
+
+def raise_exception(message: str) -> None:
+    log.error("choose_provider function failed", error=message)
+    raise NonRetryableError(message)
+
+
+@function.defn()
+async def choose_provider(function_input: ChooseProviderInput) -> dict[str, Any]:
+    """Ranks the configured providers and returns when to hedge on the runner-up.
+
+    Returns a cached result from any provider instead when one is fresh enough,
+    so cache hits never start a scrape or skew the latency samples.
+    """
+    try:
+        kind = function_input.kind
+        order = rank_providers(kind)
+        if not order:
+            raise_exception("Neither BRIGHT_DATA_API_TOKEN nor PHANTOMBUSTER_API_KEY is set")
+
+        if not function_input.force_refresh:
+            profile_url = canonical_profile_url(function_input.profile_url)
+            for provider in order:
+                cached = await asyncio.to_thread(scrape_cache.get, provider, kind, profile_url, function_input.max_age)
+                if cached is not None:
+                    log.info(f"Serving {provider} {kind} for {profile_url} from cache")
+                    return {"order": order, "hedge_after_seconds": None, "cached": {"provider": provider, "result": claim_check(cached)}}
+
+        hedge_after_seconds = hedge_after(order[0], kind) if len(order) > 1 else None
+
+    except Exception as e:
+        error_message = f"choose_provider failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Routing {kind} to {order[0]}", order=order, hedge_after_seconds=hedge_after_seconds)
+        return {"order": order, "hedge_after_seconds": hedge_after_seconds, "cached": None}
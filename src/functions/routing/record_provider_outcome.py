@@ -0,0 +1,60 @@
+from typing import Literal
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, function, log
+
+from src.utils.routing import record_outcome
+
+
+class ProviderOutcomeInput(BaseModel):
+    """Input parameters for recording how a routed scrape went."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    provider: Literal["brightdata", "phantombuster"] = Field(
+        ...,
+        title="Provider",
+        description="The provider the scrape ran on.",
+    )
+    kind: Literal["profile", "posts"] = Field(
+        ...,
+        title="Data Kind",
+        description="What was scraped.",
+    )
+    seconds: float = Field(
+        ...,
+        title="Seconds",
+        description="How long the provider took to return a result or fail.",
+    )
+    success: bool = Field(
+        ...,
+        title="Success",
+        description="Whether the provider returned a result.",
+    )
+    censored: bool = Field(
+        False,
+        title="Censored",
+        description="The scrape was cancelled before it finished, so `seconds` is only a lower bound on its latency.",
+    )
+
+
+@function.defn()
+async def record_provider_outcome(function_input: ProviderOutcomeInput) -> None:
+    try:
+        record_outcome(
+            function_input.provider,
+            function_input.kind,
+            function_input.seconds,
+            function_input.success,
+            function_input.censored,
+        )
+    except Exception as e:
+        error_message = f"record_provider_outcome failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        outcome = "was cancelled" if function_input.censored else "succeeded" if function_input.success else "failed"
+        log.info(f"{function_input.provider} {function_input.kind} {outcome} after {function_input.seconds:.1f}s")
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any
+from pydantic import BaseModel, Field
+from restack_ai.function import NonRetryableError, function, log
+
+from src.utils.blobs import blob_items
+
+
+class ReadScrapeResultInput(BaseModel):
+    """Input parameters for reading one page of a stored scrape result."""
+
+    model_config = {
+        "strict": True,
+        "extra": "forbid",
+        "validate_assignment": True,
+        "str_strip_whitespace": True,
+    }
+
+    digest: str = Field(
+        ...,
+        title="Digest",
+        description="The `claim_check.digest` returned in place of a large result.",
+    )
+    offset: int = Field(
+        0,
+        title="Offset",
+        description="Index of the first item to return.",
+        ge=0,
+    )
+    limit: int = Field(
+        100,
+        title="Limit",
+        description="Maximum number of items to return.",
+        ge=1,
+        le=1000,
+    )
+
+
+@function.defn()
+async def read_scrape_result(function_input: ReadScrapeResultInput) -> dict[str, Any]:
+    """Returns a page of the items in a claim-checked result.
+
+    `next_offset` is None on the last page. The blob is decoded once and
+    kept for the following pages, off the event loop.
+    """
+    try:
+        items = await asyncio.to_thread(blob_items, function_input.digest)
+        start = function_input.offset
+        end = start + function_input.limit
+        page = items[start:end]
+    except Exception as e:
+        error_message = f"read_scrape_result failed: {e}"
+        raise NonRetryableError(error_message) from e
+    else:
+        log.info(f"Read items {start}-{start + len(page)} of {len(items)} from blob {function_input.digest}")
+        return {
+            "items": page,
+            "offset": start,
+            "next_offset": end if end < len(items) else None,
+            "total": len(items),
+        }
@@ -0,0 +1,159 @@
+import importlib
+import logging
+import os
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any
+
+from src.utils.settings import load_settings
+
+# Which workflows and functions a worker registers, grouped by provider. A
+# group's modules are only imported when the group is enabled, so a worker
+# without Bright Data credentials never loads the Bright Data code. Workflows
+# and functions are discovered in each module by their Restack definitions.
+
+load_settings()
+
+
+@dataclass(frozen=True)
+class ProviderGroup:
+    modules: tuple[str, ...]
+    # Env vars that must all be set for the group to be enabled by default.
+    credentials: tuple[str, ...] = ()
+    # Groups whose workflows this one starts as children.
+    requires: tuple[str, ...] = ()
+    # Env vars the group can't run without, beyond its provider's credentials.
+    settings: tuple[str, ...] = ()
+
+
+GROUPS = {
+    "linkedin": ProviderGroup(
+        modules=(
+            "src.functions.linkedin.create_post",
+            "src.functions.linkedin.media",
+            "src.functions.linkedin.publish_post",
+            "src.workflows.linkedin.create_post",
+            "src.workflows.linkedin.publish_post",
+        ),
+        credentials=("LINKEDIN_ACCESS_TOKEN", "LINKEDIN_AUTHOR_URN"),
+    ),
+    "brightdata": ProviderGroup(
+        modules=(
+            "src.functions.brightdata.get_linkedin_profile",
+            "src.functions.brightdata.get_linkedin_profiles_batch",
+            "src.functions.brightdata.get_linkedin_profile_posts",
+            "src.functions.brightdata.launch_scrape",
+            "src.functions.brightdata.get_scrape_status",
+            "src.functions.brightdata.fetch_scrape_result",
+            "src.functions.brightdata.cancel_scrape",
+            "src.functions.brightdata.commit_watermark",
+            "src.workflows.brightdata.get_linkedin_profile",
+            "src.workflows.brightdata.get_linkedin_profiles_batch",
+            "src.workflows.brightdata.get_linkedin_profile_posts",
+        ),
+        credentials=("BRIGHT_DATA_API_TOKEN",),
+    ),
+    "brightdata_reactions": ProviderGroup(
+        modules=(
+            "src.functions.brightdata.get_linkedin_profile_reactions",
+            "src.workflows.brightdata.get_linkedin_profile_reactions",
+        ),
+        credentials=("BRIGHT_DATA_API_TOKEN",),
+        requires=("brightdata",),
+        settings=("BRIGHT_DATA_REACTIONS_DATASET_ID",),
+    ),
+    "phantombuster": ProviderGroup(
+        modules=(
+            "src.functions.phantombuster.get_linkedin_profile",
+            "src.functions.phantombuster.get_linkedin_profiles_batch",
+            "src.functions.phantombuster.get_linkedin_profile_posts",
+            "src.functions.phantombuster.get_linkedin_profile_reactions",
+            "src.functions.phantombuster.launch_scrape",
+            "src.functions.phantombuster.get_scrape_status",
+            "src.functions.phantombuster.fetch_scrape_result",
+            "src.functions.phantombuster.cancel_scrape",
+            "src.functions.phantombuster.commit_watermark",
+            "src.functions.phantombuster.save_linkedin_lead",
+            "src.functions.phantombuster.save_linkedin_leads_batch",
+            "src.workflows.phantombuster.get_linkedin_profile",
+            "src.workflows.phantombuster.get_linkedin_profiles_batch",
+            "src.workflows.phantombuster.get_linkedin_profile_posts",
+            "src.workflows.phantombuster.get_linkedin_profile_reactions",
+            "src.workflows.phantombuster.save_linkedin_lead",
+            "src.workflows.phantombuster.save_linkedin_leads_batch",
+        ),
+        credentials=("PHANTOMBUSTER_API_KEY",),
+    ),
+    "storage": ProviderGroup(
+        modules=(
+            "src.functions.storage.read_scrape_result",
+            "src.workflows.storage.read_scrape_result",
+        ),
+    ),
+    "routing": ProviderGroup(
+        modules=(
+            "src.functions.routing.choose_provider",
+            "src.functions.routing.record_provider_outcome",
+            "src.workflows.routing.get_linkedin_profile",
+            "src.workflows.routing.get_linkedin_profile_posts",
+        ),
+        requires=("brightdata", "phantombuster"),
+    ),
+}
+
+
+def enabled_groups() -> list[str]:
+    """Groups to register, from SERVICE_PROVIDERS or, when unset, from which credentials are set.
+
+    A group is dropped, with a warning, when a group it requires is not enabled.
+    A group missing one of its settings is dropped with a warning when detected,
+    and is a ValueError when listed, so a misconfigured worker fails at startup
+    rather than on its first call.
+    """
+    listed = os.environ.get("SERVICE_PROVIDERS")
+    if listed:
+        names = [name.strip() for name in listed.split(",") if name.strip()]
+        unknown = [name for name in names if name not in GROUPS]
+        if unknown:
+            raise ValueError(f"Unknown SERVICE_PROVIDERS entries: {', '.join(unknown)}. Known: {', '.join(GROUPS)}")
+    else:
+        names = [name for name, group in GROUPS.items() if all(os.environ.get(var) for var in group.credentials)]
+
+    enabled = []
+    for name in names:
+        unset = [var for var in GROUPS[name].settings if not os.environ.get(var)]
+        if unset and listed:
+            raise ValueError(f"SERVICE_PROVIDERS lists {name}, but {', '.join(unset)} is not set")
+        if unset:
+            logging.warning("Not registering %s: %s is not set", name, ", ".join(unset))
+            continue
+        missing = [required for required in GROUPS[name].requires if required not in names]
+        if missing:
+            logging.warning("Not registering %s: it needs %s enabled too", name, ", ".join(missing))
+            continue
+        enabled.append(name)
+    return enabled
+
+
+def discover(module: ModuleType) -> tuple[list[Any], list[Any]]:
+    """Returns the workflows and functions defined (not just imported) in a module."""
+    workflows, functions = [], []
+    for value in vars(module).values():
+        if getattr(value, "__module__", None) != module.__name__:
+            continue
+        if isinstance(value, type) and "__temporal_workflow_definition" in vars(value):
+            workflows.append(value)
+        elif hasattr(value, "__temporal_activity_definition"):
+            functions.append(value)
+    return workflows, functions
+
+
+def load_groups(names: list[str]) -> tuple[list[Any], list[Any]]:
+    """Imports the groups' modules and returns all their workflows and functions."""
+    workflows, functions = [], []
+    for name in names:
+        for module_name in GROUPS[name].modules:
+            module_workflows, module_functions = discover(importlib.import_module(module_name))
+            workflows.extend(module_workflows)
+            functions.extend(module_functions)
+    return workflows, functions
@@ -0,0 +1,342 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field
+from temporalio.client import WorkflowExecutionStatus
+from temporalio.service import RPCError, RPCStatusCode
+
+from src.functions.phantombuster.agent_pool import load_agents
+from src.utils.blobs import resolve
+from src.utils.routing import configured_providers
+from src.utils.settings import load_settings
+from src.utils.storage import data_dir
+from src.utils.urls import canonical_profile_url
+
+# Refresh scheduler for a watchlist of profiles. Each tick it ranks the entries
+# that are due by staleness and priority, takes as many as the provider's daily
+# budget allows so far today, and starts batch workflows for them. A profile
+# counts as refreshed only once its batch workflow has completed without an
+# error for it; until then it is pending and not started again, and a failed
+# refresh leaves it due. Refresh times, pending workflows and how much of
+# today's budget has been spent are kept in SQLite, so a restart continues the
+# same schedule.
+
+DAY_SECONDS = 24 * 3600
+
+# Batch workflow per (provider, data kind). Bright Data only batches profiles.
+BATCH_WORKFLOWS = {
+    ("brightdata", "profile"): "GetLinkedinProfilesBatchWorkflowBrightdata",
+    ("phantombuster", "profile"): "GetLinkedinProfilesBatchWorkflowPhantombuster",
+    ("phantombuster", "posts"): "GetLinkedinProfilesBatchWorkflowPhantombuster",
+    ("phantombuster", "reactions"): "GetLinkedinProfilesBatchWorkflowPhantombuster",
+}
+
+DEFAULT_DAILY_BUDGETS = {
+    "brightdata": 1000,
+    "phantombuster": 200,
+}
+
+
+class WatchlistEntry(BaseModel):
+    """A profile to keep fresh."""
+
+    model_config = {
+        "extra": "forbid",
+        "str_strip_whitespace": True,
+    }
+
+    profile_url: str = Field(..., title="LinkedIn Profile URL")
+    kind: Literal["profile", "posts", "reactions"] = Field("profile", title="Data Kind")
+    priority: float = Field(1.0, title="Priority", description="Staleness is multiplied by this when ranking.", gt=0)
+    refresh_hours: float = Field(24.0, title="Refresh Hours", description="How old the data may get before it is due.", gt=0)
+
+
+def load_watchlist(path: Path) -> list[WatchlistEntry]:
+    """Reads a JSON list of watchlist entries. Duplicate profiles and kinds keep the last entry."""
+    entries = [WatchlistEntry.model_validate(item) for item in json.loads(path.read_text())]
+    unique = {(canonical_profile_url(entry.profile_url), entry.kind): entry for entry in entries}
+    return list(unique.values())
+
+
+def daily_budget(provider: str) -> int:
+    return int(os.environ.get(f"SCHEDULE_DAILY_BUDGET_{provider.upper()}", DEFAULT_DAILY_BUDGETS[provider]))
+
+
+def batch_size(provider: str) -> int:
+    return int(os.environ.get(f"SCHEDULE_BATCH_SIZE_{provider.upper()}", "100"))
+
+
+def provider_for(kind: str) -> str | None:
+    """The first configured provider, in routing order, that can batch this kind."""
+    for provider in configured_providers():
+        if (provider, kind) in BATCH_WORKFLOWS:
+            return provider
+    return None
+
+
+def initial_offset(url: str, kind: str, refresh_seconds: float) -> float:
+    """A stable offset into the refresh interval for entries never refreshed before.
+
+    New watchlist entries become due spread over one interval instead of all at once.
+    """
+    digest = hashlib.sha256(f"{kind}:{url}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64 * refresh_seconds
+
+
+@dataclass
+class Candidate:
+    entry: WatchlistEntry
+    url: str
+    staleness: float
+
+    @property
+    def score(self) -> float:
+        return self.staleness * self.entry.priority
+
+
+class ScheduleState:
+    def __init__(self, path: str | None = None) -> None:
+        self.db = sqlite3.connect(path or data_dir() / "schedule.sqlite3")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS refreshes ("
+            "kind TEXT, url TEXT, first_seen_at REAL, refreshed_at REAL, workflow_id TEXT, started_at REAL, "
+            "PRIMARY KEY (kind, url))"
+        )
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(refreshes)")}
+        if "started_at" not in columns:
+            self.db.execute("ALTER TABLE refreshes ADD COLUMN started_at REAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS budget (provider TEXT, day INTEGER, used INTEGER, PRIMARY KEY (provider, day))")
+        self.db.commit()
+
+    def last_refresh(self, kind: str, url: str, now: float) -> tuple[float, float | None]:
+        """Returns (first_seen_at, refreshed_at), recording the entry the first time it is seen."""
+        row = self.db.execute("SELECT first_seen_at, refreshed_at FROM refreshes WHERE kind = ? AND url = ?", (kind, url)).fetchone()
+        if row is None:
+            self.db.execute(
+                "INSERT INTO refreshes (kind, url, first_seen_at) VALUES (?, ?, ?)",
+                (kind, url, now),
+            )
+            self.db.commit()
+            return now, None
+        return row[0], row[1]
+
+    def is_pending(self, kind: str, url: str) -> bool:
+        row = self.db.execute("SELECT started_at FROM refreshes WHERE kind = ? AND url = ?", (kind, url)).fetchone()
+        return row is not None and row[0] is not None
+
+    def mark_started(self, kind: str, urls: list[str], workflow_id: str, now: float) -> None:
+        self.db.executemany(
+            "UPDATE refreshes SET started_at = ?, workflow_id = ? WHERE kind = ? AND url = ?",
+            [(now, workflow_id, kind, url) for url in urls],
+        )
+        self.db.commit()
+
+    def pending(self) -> dict[str, list[tuple[str, str]]]:
+        """(kind, url) of every profile still being refreshed, by the workflow refreshing it."""
+        pending: dict[str, list[tuple[str, str]]] = {}
+        for kind, url, workflow_id in self.db.execute("SELECT kind, url, workflow_id FROM refreshes WHERE started_at IS NOT NULL"):
+            pending.setdefault(workflow_id, []).append((kind, url))
+        return pending
+
+    def mark_finished(self, workflow_id: str, refreshed: list[tuple[str, str]], refreshed_at: float) -> None:
+        """Ends the workflow's pending refreshes. Those in `refreshed` succeeded; the rest stay as stale as they were."""
+        self.db.executemany(
+            "UPDATE refreshes SET refreshed_at = ? WHERE kind = ? AND url = ? AND workflow_id = ?",
+            [(refreshed_at, kind, url, workflow_id) for kind, url in refreshed],
+        )
+        self.db.execute("UPDATE refreshes SET started_at = NULL WHERE workflow_id = ?", (workflow_id,))
+        self.db.commit()
+
+    def used_today(self, provider: str, day: int) -> int:
+        row = self.db.execute("SELECT used FROM budget WHERE provider = ? AND day = ?", (provider, day)).fetchone()
+        return row[0] if row else 0
+
+    def spend(self, provider: str, day: int, count: int) -> None:
+        self.db.execute(
+            "INSERT INTO budget VALUES (?, ?, ?) ON CONFLICT (provider, day) DO UPDATE SET used = used + excluded.used",
+            (provider, day, count),
+        )
+        self.db.commit()
+
+
+def staleness(state: ScheduleState, entry: WatchlistEntry, url: str, now: float) -> float:
+    """How many refresh intervals old the entry's data is. Due at 1 or more."""
+    refresh_seconds = entry.refresh_hours * 3600
+    first_seen_at, refreshed_at = state.last_refresh(entry.kind, url, now)
+    if refreshed_at is None:
+        # Never refreshed by the scheduler: treat as refreshed at a spread-out point before it was first seen.
+        refreshed_at = first_seen_at - refresh_seconds + initial_offset(url, entry.kind, refresh_seconds)
+    return (now - refreshed_at) / refresh_seconds
+
+
+def allowance(state: ScheduleState, provider: str, now: float, tick_seconds: float) -> int:
+    """How many profiles the provider may still refresh this tick.
+
+    The daily budget is released evenly over the UTC day, so work is spread
+    out instead of spent at midnight; unused allowance carries over.
+    """
+    day = int(now // DAY_SECONDS)
+    day_fraction = min(1.0, (now - day * DAY_SECONDS + tick_seconds) / DAY_SECONDS)
+    released = math.floor(daily_budget(provider) * day_fraction)
+    return max(0, released - state.used_today(provider, day))
+
+
+def plan_batches(
+    state: ScheduleState,
+    watchlist: list[WatchlistEntry],
+    now: float,
+    tick_seconds: float,
+) -> list[tuple[str, str, list[str]]]:
+    """Returns (provider, kind, profile URLs) batches to start this tick, most urgent first."""
+    due: dict[tuple[str, str], list[Candidate]] = {}
+    for entry in watchlist:
+        provider = provider_for(entry.kind)
+        if provider is None:
+            logging.warning("No configured provider can batch %s scrapes; skipping %s", entry.kind, entry.profile_url)
+            continue
+        url = canonical_profile_url(entry.profile_url)
+        if state.is_pending(entry.kind, url):
+            continue
+        candidate = Candidate(entry, url, staleness(state, entry, url, now))
+        if candidate.staleness >= 1:
+            due.setdefault((provider, entry.kind), []).append(candidate)
+
+    remaining = {provider: allowance(state, provider, now, tick_seconds) for provider, _ in due}
+    # Most urgent candidates claim the budget first, whatever their kind.
+    ranked = sorted(
+        ((provider, kind, candidate) for (provider, kind), candidates in due.items() for candidate in candidates),
+        key=lambda item: item[2].score,
+        reverse=True,
+    )
+    selected: dict[tuple[str, str], list[str]] = {}
+    for provider, kind, candidate in ranked:
+        if remaining[provider] <= 0:
+            continue
+        remaining[provider] -= 1
+        selected.setdefault((provider, kind), []).append(candidate.url)
+
+    batches = []
+    for (provider, kind), urls in selected.items():
+        size = batch_size(provider)
+        chunks = [urls[i:i + size] for i in range(0, len(urls), size)]
+        if provider == "phantombuster":
+            # One batch per agent; the rest waits for the next tick.
+            chunks = chunks[: max(1, len(load_agents(kind)))]
+        batches.extend((provider, kind, chunk) for chunk in chunks)
+    return batches
+
+
+def workflow_input(provider: str, kind: str, urls: list[str]) -> dict:
+    if provider == "brightdata":
+        return {"profile_urls": urls, "chunk_size": min(len(urls), batch_size(provider))}
+    return {"profile_urls": urls, "data_kind": kind}
+
+
+def failed_urls(result: object) -> set[str] | None:
+    """The profiles a batch workflow's result reports errors for, or None if the result can't be read."""
+    try:
+        result = resolve(result)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(result, dict) or not isinstance(result.get("errors"), dict):
+        return None
+    return {canonical_profile_url(url) for url in result["errors"]}
+
+
+async def settle_pending(state: ScheduleState) -> None:
+    """Marks the profiles of finished batch workflows refreshed, or due again if their refresh failed."""
+    from src.client import client
+
+    for workflow_id, entries in state.pending().items():
+        handle = await client.get_workflow_handle(workflow_id)
+        try:
+            description = await handle.describe()
+        except RPCError as e:
+            if e.status != RPCStatusCode.NOT_FOUND:
+                raise
+            logging.warning("Scheduled workflow %s is gone; its %d profiles are due again", workflow_id, len(entries))
+            state.mark_finished(workflow_id, [], time.time())
+            continue
+        if description.status == WorkflowExecutionStatus.RUNNING:
+            continue
+
+        refreshed_at = description.close_time.timestamp() if description.close_time else time.time()
+        refreshed: list[tuple[str, str]] = []
+        if description.status == WorkflowExecutionStatus.COMPLETED:
+            failed = failed_urls(await handle.result())
+            if failed is None:
+                logging.warning("Can't read per-profile errors of %s; counting all its profiles as refreshed", workflow_id)
+                failed = set()
+            refreshed = [(kind, url) for kind, url in entries if url not in failed]
+        state.mark_finished(workflow_id, refreshed, refreshed_at)
+        logging.info(
+            "%s ended %s: %d of %d profiles refreshed", workflow_id, description.status.name, len(refreshed), len(entries)
+        )
+
+
+async def run_tick(state: ScheduleState, watchlist: list[WatchlistEntry], tick_seconds: float) -> int:
+    """Settles finished refreshes, then starts this tick's batch workflows and returns how many profiles they cover."""
+    from src.client import client
+
+    await settle_pending(state)
+    now = time.time()
+    started = 0
+    for provider, kind, urls in plan_batches(state, watchlist, now, tick_seconds):
+        workflow_id = f"scheduled-{provider}-{kind}-{int(now)}-{hashlib.sha256(''.join(urls).encode()).hexdigest()[:8]}"
+        await client.schedule_workflow(
+            workflow_name=BATCH_WORKFLOWS[(provider, kind)],
+            workflow_id=workflow_id,
+            workflow_input=workflow_input(provider, kind, urls),
+        )
+        state.mark_started(kind, urls, workflow_id, now)
+        state.spend(provider, int(now // DAY_SECONDS), len(urls))
+        started += len(urls)
+        logging.info("Started %s for %d %s refreshes", workflow_id, len(urls), kind)
+    return started
+
+
+async def schedule_loop(watchlist_path: Path, tick_seconds: float, once: bool) -> None:
+    state = ScheduleState()
+    while True:
+        # Re-read every tick so watchlist edits apply without a restart.
+        watchlist = load_watchlist(watchlist_path)
+        started = await run_tick(state, watchlist, tick_seconds)
+        logging.info("Scheduled %d of %d watchlist entries", started, len(watchlist))
+        if once:
+            return
+        await asyncio.sleep(tick_seconds)
+
+
+def run_schedule() -> None:
+    load_settings()
+    parser = argparse.ArgumentParser(description="Keep a watchlist of LinkedIn profiles fresh with batched refreshes.")
+    parser.add_argument(
+        "--watchlist",
+        type=Path,
+        default=Path(os.environ.get("SCHEDULE_WATCHLIST", "watchlist.json")),
+        help="JSON list of {profile_url, kind, priority, refresh_hours} entries",
+    )
+    parser.add_argument("--tick-seconds", type=float, default=float(os.environ.get("SCHEDULE_TICK_SECONDS", "900")))
+    parser.add_argument("--once", action="store_true", help="Run a single tick and exit, e.g. from cron")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(schedule_loop(args.watchlist, args.tick_seconds, args.once))
+    except KeyboardInterrupt:
+        logging.info("Scheduler interrupted by user. Exiting gracefully.")
+
+
+if __name__ == "__main__":
+    run_schedule()
@@ -1,64 +1,71 @@
 import asyncio
 import logging
-import webbrowser
+import os
 from pathlib import Path
 
-from watchfiles import run_process
+from restack_ai.restack import ServiceOptions
 
 from src.client import client
+from src.registry import enabled_groups, load_groups
+from src.task_queues import WORKFLOW_TASK_QUEUE, concurrency, task_queue_for
+from src.utils.http import close_http_clients, prepare_http_clients
 
-# Import brightdata functions and workflows
-from src.functions.linkedin.create_post import create_post_on_linkedin
-from src.workflows.linkedin.create_post import CreatePostOnLinkedinWorkflow
-from src.functions.brightdata.get_linkedin_profile import get_linkedin_profile_brightdata
-from src.workflows.brightdata.get_linkedin_profile import GetLinkedinProfileWorkflowBrightdata
-from src.functions.brightdata.get_linkedin_profile_posts import get_linkedin_profile_posts_brightdata
-from src.workflows.brightdata.get_linkedin_profile_posts import GetLinkedinProfilePostsWorkflowBrightdata
-from src.functions.brightdata.get_linkedin_profile_reactions import get_linkedin_profile_reactions_brightdata
-from src.workflows.brightdata.get_linkedin_profile_reactions import GetLinkedinProfileReactionsWorkflowBrightdata
-
-# Import phantombuster functions and workflows
-from src.functions.phantombuster.get_linkedin_profile import get_linkedin_profile_phantombuster
-from src.workflows.phantombuster.get_linkedin_profile import GetLinkedinProfileWorkflowPhantombuster
-from src.functions.phantombuster.get_linkedin_profile_posts import get_linkedin_profile_posts_phantombuster
-from src.workflows.phantombuster.get_linkedin_profile_posts import GetLinkedinProfilePostsWorkflowPhantombuster
-from src.functions.phantombuster.get_linkedin_profile_reactions import get_linkedin_profile_reactions_phantombuster
-from src.workflows.phantombuster.get_linkedin_profile_reactions import GetLinkedinProfileReactionsWorkflowPhantombuster
-from src.functions.phantombuster.save_linkedin_lead import save_linkedin_lead_phantombuster
-from src.workflows.phantombuster.save_linkedin_lead import SaveLinkedinLeadWorkflowPhantombuster
+
+def plan_services(workflows: list, functions: list) -> dict[str, tuple[list, list]]:
+    """Workflows and functions per task queue, limited to SERVICE_TASK_QUEUES when it is set."""
+    services: dict[str, tuple[list, list]] = {}
+    if workflows:
+        services[WORKFLOW_TASK_QUEUE] = (workflows, [])
+    for function in functions:
+        services.setdefault(task_queue_for(function), ([], []))[1].append(function)
+
+    selected = os.environ.get("SERVICE_TASK_QUEUES")
+    if selected:
+        names = [name.strip() for name in selected.split(",") if name.strip()]
+        services = {name: services[name] for name in names if name in services}
+    return services
 
 
 async def main() -> None:
-    workflows = [
-        CreatePostOnLinkedinWorkflow,
-        # Phantombuster
-        GetLinkedinProfileWorkflowPhantombuster,
-        GetLinkedinProfilePostsWorkflowPhantombuster,
-        GetLinkedinProfileReactionsWorkflowPhantombuster,
-        SaveLinkedinLeadWorkflowPhantombuster,
-        # Brightdata
-        GetLinkedinProfileWorkflowBrightdata,
-        GetLinkedinProfilePostsWorkflowBrightdata,
-        GetLinkedinProfileReactionsWorkflowBrightdata,
-    ]
-    functions = [
-        create_post_on_linkedin,
-        # Phantombuster
-        get_linkedin_profile_phantombuster,
-        get_linkedin_profile_posts_phantombuster,
-        get_linkedin_profile_reactions_phantombuster,
-        save_linkedin_lead_phantombuster,
-        # Brightdata
-        get_linkedin_profile_brightdata,
-        get_linkedin_profile_posts_brightdata,
-        get_linkedin_profile_reactions_brightdata,
-    ]
-
-    await client.start_service(
-        agents=[],
-        workflows=workflows,
-        functions=functions,
-    )
+    groups = enabled_groups()
+    workflows, functions = load_groups(groups)
+    services = plan_services(workflows, functions)
+    if not services:
+        raise ValueError("Nothing to run: no enabled provider group has workflows or functions on the selected task queues")
+    logging.info("Registering %d workflows and %d functions for %s", len(workflows), len(functions), ", ".join(groups) or "no providers")
+
+    await prepare_http_clients()
+    web_runner = None
+    if os.environ.get("SERVICE_HTTP_PORT"):
+        # Imported only when enabled: the web server pulls in aiohttp.web.
+        from src.utils.web import start_web_server
+
+        web_runner = await start_web_server()
+    try:
+        # One service per task queue, each with its own concurrency limit.
+        await asyncio.gather(
+            *(
+                client.start_service(
+                    agents=[],
+                    workflows=queue_workflows,
+                    functions=queue_functions,
+                    task_queue=task_queue,
+                    options=service_options(task_queue, bool(queue_workflows)),
+                )
+                for task_queue, (queue_workflows, queue_functions) in services.items()
+            )
+        )
+    finally:
+        if web_runner is not None:
+            await web_runner.cleanup()
+        await close_http_clients()
+
+
+def service_options(task_queue: str, has_workflows: bool) -> ServiceOptions:
+    limit = concurrency(task_queue)
+    if has_workflows:
+        return ServiceOptions(max_concurrent_workflow_runs=limit) if limit else ServiceOptions()
+    return ServiceOptions(max_concurrent_function_runs=limit, endpoints=False) if limit else ServiceOptions(endpoints=False)
 
 # demo purposes
 
@@ -70,6 +77,10 @@ def run_services() -> None:
 
 
 def watch_services() -> None:
+    import webbrowser
+
+    from watchfiles import run_process
+
     watch_path = Path.cwd()
     logging.info("Watching %s and its subdirectories for changes...", watch_path)
     webbrowser.open("http://localhost:5233")
@@ -0,0 +1,55 @@
+import os
+from typing import Any
+
+# Task queue each function runs on. Workflows stay on the default `restack`
+# queue, where callers start them; their steps are sent to the function's own
+# queue, so slow scrapes can only use up their provider's slots. Workflows
+# import this to pick a step's queue, so it must stay free of side effects.
+
+WORKFLOW_TASK_QUEUE = "restack"
+
+# By provider group, named after the package the function lives in.
+GROUP_TASK_QUEUES = {
+    "linkedin": "linkedin",
+    "brightdata": "brightdata",
+    "phantombuster": "phantombuster",
+    "storage": "storage",
+    "routing": "routing",
+}
+
+# Functions that get a queue of their own, so they never wait behind their group's slow scrapes or uploads.
+FUNCTION_TASK_QUEUES = {
+    "save_linkedin_lead_phantombuster": "phantombuster-leads",
+    "save_linkedin_leads_batch_phantombuster": "phantombuster-leads",
+    "chunk_linkedin_leads_phantombuster": "phantombuster-leads",
+    "merge_lead_errors_phantombuster": "phantombuster-leads",
+    "upload_linkedin_media": "linkedin-media",
+}
+
+# Concurrent function runs per worker and queue, unless TASK_QUEUE_<QUEUE>_CONCURRENCY is set.
+DEFAULT_CONCURRENCY = {
+    "brightdata": 100,
+    "phantombuster": 50,
+    "phantombuster-leads": 10,
+    "linkedin": 10,
+    "linkedin-media": 3,
+    "storage": 20,
+    "routing": 50,
+}
+
+
+def task_queue_for(function: Any) -> str:
+    """The queue a function runs on: its own if it has one, otherwise its group's."""
+    name = function.__name__
+    if name in FUNCTION_TASK_QUEUES:
+        return FUNCTION_TASK_QUEUES[name]
+    # src.functions.<group>.<module>
+    return GROUP_TASK_QUEUES[function.__module__.split(".")[2]]
+
+
+def concurrency(task_queue: str) -> int | None:
+    """Max concurrent runs on a queue: functions for function queues, workflow tasks for `restack`."""
+    value = os.environ.get(f"TASK_QUEUE_{task_queue.upper().replace('-', '_')}_CONCURRENCY")
+    if value:
+        return int(value)
+    return DEFAULT_CONCURRENCY.get(task_queue)
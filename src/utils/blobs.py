@@ -0,0 +1,156 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from restack_ai.function import log
+
+from src.utils.storage import data_dir
+
+# Claim checks for large scrape results. Instead of returning megabytes of
+# records through workflow history, functions write results above a size
+# threshold to a local content-addressed blob store and return a small
+# reference. read_scrape_result pages through a stored result, decoded once
+# and kept in a small LRU: blobs are immutable, so the decoded items never go
+# stale.
+
+CLAIM_CHECK_KEY = "claim_check"
+
+# Decoded blobs kept for paging.
+PAGED_BLOBS = int(os.environ.get("CLAIM_CHECK_PAGED_BLOBS", "8"))
+
+
+def claim_check_threshold() -> int:
+    """Results whose JSON encoding is larger than this many bytes are stored as blobs. 0 disables claim checks."""
+    return int(os.environ.get("CLAIM_CHECK_THRESHOLD_BYTES", str(64 * 1024)))
+
+
+def blob_path(digest: str) -> Path:
+    return data_dir("blobs", digest[:2]) / f"{digest}.json"
+
+
+def put_blob(content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()
+    path = blob_path(digest)
+    if not path.exists():
+        # A temp file of its own, so concurrent writers of the same blob never share one.
+        tmp = tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False)
+        try:
+            with tmp:
+                tmp.write(content)
+            os.replace(tmp.name, path)
+        except BaseException:
+            Path(tmp.name).unlink(missing_ok=True)
+            raise
+    return digest
+
+
+def read_blob(digest: str) -> bytes:
+    """Returns a stored result's JSON bytes, for callers that decode it themselves."""
+    if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+        raise ValueError(f"Invalid blob digest: {digest}")
+    path = blob_path(digest)
+    if not path.exists():
+        raise FileNotFoundError(f"No stored result with digest {digest}")
+    return path.read_bytes()
+
+
+def get_blob(digest: str) -> Any:
+    return json.loads(read_blob(digest))
+
+
+_paged: OrderedDict[str, list[Any]] = OrderedDict()
+_paged_lock = threading.Lock()
+
+
+def blob_items(digest: str) -> list[Any]:
+    """Returns a stored result's pageable items, decoding each blob only once per LRU residency."""
+    with _paged_lock:
+        items = _paged.get(digest)
+        if items is not None:
+            _paged.move_to_end(digest)
+            return items
+    items = pageable_items(get_blob(digest))
+    with _paged_lock:
+        _paged[digest] = items
+        while len(_paged) > PAGED_BLOBS:
+            _paged.popitem(last=False)
+    return items
+
+
+def pageable_items(value: Any) -> list[Any]:
+    """Returns the list a stored result is paged over.
+
+    Record lists page by record. Phantombuster results page over their decoded
+    resultObject, batch results by profile and reactions results by post.
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        if "resultObject" in value:
+            result_object = value["resultObject"]
+            records = json.loads(result_object) if isinstance(result_object, str) else result_object
+            return records if isinstance(records, list) else [records] if records else []
+        if isinstance(value.get("results"), dict):
+            return [{"profile_url": url, "records": records} for url, records in value["results"].items()]
+        if isinstance(value.get("reactions"), dict):
+            return [{"post_url": url, "reactions": records} for url, records in value["reactions"].items()]
+    return [value]
+
+
+def summarize(value: Any) -> dict[str, Any]:
+    """Small description of a result: its scalar top-level fields and item count."""
+    summary: dict[str, Any] = {"items": len(pageable_items(value))}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (int, float, bool)) or (isinstance(item, str) and len(item) <= 200):
+                summary.setdefault(key, item)
+        if isinstance(value.get("errors"), dict):
+            summary["errors"] = len(value["errors"])
+    return summary
+
+
+def claim_check(value: Any, always: bool = False) -> Any:
+    """Returns `value` unchanged if it is small, otherwise stores it and returns a reference.
+
+    `always` stores any non-empty value, for results a workflow gathers many of
+    and must not hold inline. Claim checks disabled by a 0 threshold stay off.
+    """
+    threshold = claim_check_threshold()
+    if not threshold or value is None or is_claim_check(value):
+        return value
+
+    content = json.dumps(value, separators=(",", ":")).encode()
+    if len(content) <= threshold and not always:
+        return value
+
+    digest = put_blob(content)
+    log.info(f"Stored {len(content)} byte result as blob {digest}")
+    return {CLAIM_CHECK_KEY: {"digest": digest, "bytes": len(content)}, "summary": summarize(value)}
+
+
+def is_claim_check(value: Any) -> bool:
+    return isinstance(value, dict) and CLAIM_CHECK_KEY in value
+
+
+def resolve(value: Any) -> Any:
+    """Returns the full result behind a claim check, or `value` itself if it is not one."""
+    if is_claim_check(value):
+        return get_blob(value[CLAIM_CHECK_KEY]["digest"])
+    return value
+
+
+def claim_checked(fn: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+    """Wraps a function so large return values leave it as claim checks."""
+
+    @functools.wraps(fn)
+    async def wrapper(function_input: Any) -> Any:
+        return claim_check(await fn(function_input))
+
+    return wrapper
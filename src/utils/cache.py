@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from restack_ai.function import NonRetryableError, log
+
+from src.utils.metrics import cache_lookups, current_function
+from src.utils.polling import PollPolicy
+from src.utils.single_flight import InFlightJobs, SingleFlight
+from src.utils.storage import data_dir
+from src.utils.urls import canonical_post_url, canonical_profile_url
+
+# Two-tier cache for scrape results: a bounded in-memory LRU in front of a local
+# SQLite store, keyed by (provider, data kind, canonical URL). Lookups hit
+# SQLite, so async callers run them with asyncio.to_thread.
+
+DEFAULT_TTLS = {
+    "profile": 7 * 24 * 3600,
+    "posts": 24 * 3600,
+    "reactions": 24 * 3600,
+}
+
+
+# Bright Data collects reactions post by post; every other kind is for a profile.
+POST_KINDS = {("brightdata", "reactions")}
+
+
+def ttl_for(kind: str) -> float:
+    return float(os.environ.get(f"CACHE_TTL_{kind.upper()}_SECONDS", DEFAULT_TTLS.get(kind, 3600)))
+
+
+def cache_url(provider: str, kind: str, url: str) -> str:
+    """The canonical URL a result is keyed by. Post URLs keep their case, profile URLs don't."""
+    return canonical_post_url(url) if (provider, kind) in POST_KINDS else canonical_profile_url(url)
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class ScrapeCache:
+    def __init__(self, path: str | None = None, max_entries: int | None = None) -> None:
+        self.path = path
+        self.max_entries = max_entries or int(os.environ.get("CACHE_MAX_ENTRIES", "1024"))
+        self.stats = CacheStats()
+        self._memory: OrderedDict[tuple[str, str, str], tuple[float, Any]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        # The connection and the LRU are shared by the threads callers run these methods in.
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path or data_dir() / "cache.sqlite3", check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scrape_cache ("
+                "provider TEXT, kind TEXT, url TEXT, stored_at REAL, value TEXT, "
+                "PRIMARY KEY (provider, kind, url))"
+            )
+        return self._db
+
+    def get(self, provider: str, kind: str, url: str, max_age: float | None = None) -> Any | None:
+        """Returns a cached value younger than both the kind's TTL and `max_age`, or None."""
+        key = (provider, kind, cache_url(provider, kind, url))
+        with self._lock:
+            return self._get(key, max_age)
+
+    def _get(self, key: tuple[str, str, str], max_age: float | None) -> Any | None:
+        provider, kind, _ = key
+        limit = ttl_for(kind) if max_age is None else min(ttl_for(kind), max_age)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None and now - entry[0] <= limit:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            cache_lookups.inc(provider=provider, kind=kind, function=current_function(), result="memory_hit")
+            return entry[1]
+
+        row = self.db.execute(
+            "SELECT stored_at, value FROM scrape_cache WHERE provider = ? AND kind = ? AND url = ?", key
+        ).fetchone()
+        if row is not None and now - row[0] <= limit:
+            value = json.loads(row[1])
+            self._remember(key, row[0], value)
+            self.stats.disk_hits += 1
+            cache_lookups.inc(provider=provider, kind=kind, function=current_function(), result="disk_hit")
+            return value
+
+        if row is not None and now - row[0] > ttl_for(kind):
+            self.db.execute("DELETE FROM scrape_cache WHERE provider = ? AND kind = ? AND url = ?", key)
+            self.db.commit()
+            self.stats.evictions += 1
+        self.stats.misses += 1
+        cache_lookups.inc(provider=provider, kind=kind, function=current_function(), result="miss")
+        return None
+
+    def set(self, provider: str, kind: str, url: str, value: Any) -> None:
+        key = (provider, kind, cache_url(provider, kind, url))
+        stored_at = time.time()
+        content = json.dumps(value)
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO scrape_cache VALUES (?, ?, ?, ?, ?)", (*key, stored_at, content))
+            self.db.commit()
+            self._remember(key, stored_at, value)
+
+    def _remember(self, key: tuple[str, str, str], stored_at: float, value: Any) -> None:
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+
+scrape_cache = ScrapeCache()
+scrapes_in_flight = SingleFlight()
+scrape_jobs_in_flight = InFlightJobs(max_age=PollPolicy().deadline)
+
+
+def cached_scrape(provider: str, kind: str) -> Callable:
+    """Wraps a provider function so repeated lookups of the same profile are served from the cache.
+
+    Concurrent cache misses for the same profile share one provider job. The
+    wrapped function's input must have `profile_url`, `max_age` and
+    `force_refresh` fields. Only successful results are cached.
+    """
+
+    def decorator(fn: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+        @functools.wraps(fn)
+        async def wrapper(function_input: Any) -> Any:
+            try:
+                url = canonical_profile_url(function_input.profile_url)
+            except ValueError as e:
+                raise NonRetryableError(str(e)) from e
+            if not function_input.force_refresh:
+                cached = await asyncio.to_thread(scrape_cache.get, provider, kind, url, function_input.max_age)
+                if cached is not None:
+                    log.info(f"Serving {provider} {kind} for {url} from cache")
+                    return cached
+
+            async def scrape() -> Any:
+                result = await fn(function_input)
+                await asyncio.to_thread(scrape_cache.set, provider, kind, url, result)
+                return result
+
+            return await scrapes_in_flight.do((provider, kind, url), scrape)
+
+        return wrapper
+
+    return decorator
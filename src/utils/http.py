@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import importlib.util
+import os
+import ssl
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from restack_ai.function import log
+
+from src.utils.metrics import current_function, http_request_duration, http_responses, status_class
+from src.utils.rate_limit import RateLimitedTransport
+
+# Worker-scoped HTTP clients, one per provider host. Every function shares these
+# so launches and status polls reuse warm keep-alive connections instead of
+# paying a TCP+TLS handshake per request.
+
+PROVIDER_HTTP2 = {
+    "phantombuster": True,
+    "brightdata": True,
+    "linkedin": True,
+}
+
+
+@dataclass
+class PoolStats:
+    """Counters for a provider's connection pool."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Transport that records whether each request opened or reused a connection, and its status and latency."""
+
+    def __init__(self, provider: str, stats: PoolStats, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = False
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.complete":
+                opened = True
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        started_at = time.monotonic()
+        response = await super().handle_async_request(request)
+        http_request_duration.observe(time.monotonic() - started_at, provider=self.provider)
+        http_responses.inc(provider=self.provider, function=current_function(), status=status_class(response.status_code))
+
+        self.stats.requests += 1
+        if opened:
+            self.stats.connections_opened += 1
+        else:
+            self.stats.connections_reused += 1
+        return response
+
+    def connection_counts(self) -> tuple[int, int]:
+        """Returns the number of (active, idle) connections currently in the pool."""
+        connections = getattr(self._pool, "connections", [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return len(connections) - idle, idle
+
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_transports: dict[str, InstrumentedTransport] = {}
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "20")),
+        max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")),
+    )
+
+
+@functools.cache
+def ssl_context() -> ssl.SSLContext:
+    """One TLS context for every client; loading the CA bundle is slow enough to stall the event loop."""
+    return httpx.create_ssl_context()
+
+
+def load_transport_dependencies() -> None:
+    # httpx imports httpcore on the first transport and httpcore imports anyio on the
+    # first connection; together they take a good fraction of a second.
+    for module in ("httpcore", "httpcore._backends.anyio"):
+        importlib.import_module(module)
+    ssl_context()
+
+
+async def prepare_http_clients() -> None:
+    """Does the slow part of opening a client off the event loop, so no function's first request stalls it."""
+    await asyncio.to_thread(load_transport_dependencies)
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Returns the shared client for a provider, creating it on first use."""
+    client = _clients.get(provider)
+    if client is not None and not client.is_closed:
+        return client
+
+    http2 = PROVIDER_HTTP2.get(provider, False) and http2_available()
+    transport = InstrumentedTransport(
+        provider=provider,
+        stats=PoolStats(),
+        http2=http2,
+        verify=ssl_context(),
+        limits=pool_limits(),
+        retries=1,
+    )
+    client = httpx.AsyncClient(
+        transport=RateLimitedTransport(provider, transport),
+        timeout=httpx.Timeout(30.0, connect=10.0),
+    )
+    _clients[provider] = client
+    _transports[provider] = transport
+    log.info(f"Opened pooled HTTP client for {provider}", http2=http2)
+    return client
+
+
+def http_pool_stats() -> dict[str, dict[str, int]]:
+    """Returns active, idle and reused connection counts per provider."""
+    stats = {}
+    for provider, transport in _transports.items():
+        active, idle = transport.connection_counts()
+        stats[provider] = {
+            "active": active,
+            "idle": idle,
+            "requests": transport.stats.requests,
+            "opened": transport.stats.connections_opened,
+            "reused": transport.stats.connections_reused,
+        }
+    return stats
+
+
+async def close_http_clients() -> None:
+    """Closes every pooled client. Called once when the service shuts down."""
+    for provider, client in list(_clients.items()):
+        log.info(f"Closing pooled HTTP client for {provider}", stats=http_pool_stats().get(provider))
+        await client.aclose()
+    _clients.clear()
+    _transports.clear()
@@ -0,0 +1,284 @@
+import asyncio
+import math
+import sys
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from temporalio import activity
+
+# Minimal Prometheus text-format metrics. Counters and histograms are updated
+# where the work happens; collectors turn the stats objects other modules
+# already keep into gauges at scrape time. Served at /metrics by the service
+# HTTP server.
+
+PREFIX = "linkedin_mcp_"
+
+LabelValues = tuple[str, ...]
+
+
+def current_function() -> str:
+    """Name of the function (activity) running the current code, or "" outside one."""
+    return activity.info().activity_type if activity.in_activity() else ""
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def label_values(self, labels: dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.render_samples())
+        return lines
+
+    def render_samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self.label_values(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render_samples(self) -> list[str]:
+        return [f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[self.label_values(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self.counts: dict[LabelValues, list[int]] = {}
+        self.sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self.label_values(labels)
+        counts = self.counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        counts[-1] += 1
+        self.sums[key] = self.sums.get(key, 0.0) + value
+
+    def render_samples(self) -> list[str]:
+        lines = []
+        for key, counts in self.counts.items():
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                labels = format_labels((*self.labelnames, "le"), (*key, format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(self.sums[key])}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+        self.collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Registers a callback that refreshes gauges right before each scrape."""
+        self.collectors.append(collector)
+
+    def collect(self) -> None:
+        """Runs the collectors. Some read SQLite, so async callers run this in a thread."""
+        for collector in self.collectors:
+            collector()
+
+    def render(self, collect: bool = True) -> str:
+        if collect:
+            self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+job_launches = registry.register(
+    Counter("job_launches_total", "Provider jobs (snapshots or containers) launched.", ("provider", "function"))
+)
+job_status_checks = registry.register(
+    Histogram(
+        "job_status_checks",
+        "Status checks needed per provider job.",
+        ("provider", "kind", "function"),
+        buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    )
+)
+job_duration = registry.register(
+    Histogram("job_duration_seconds", "Time from launch to a finished provider job.", ("provider", "kind", "function"))
+)
+download_bytes = registry.register(
+    Counter("download_bytes_total", "Bytes of scrape results downloaded from providers.", ("provider", "function"))
+)
+cache_lookups = registry.register(
+    Counter(
+        "cache_lookups_total",
+        "Scrape cache lookups by outcome (memory_hit, disk_hit, miss).",
+        ("provider", "kind", "function", "result"),
+    )
+)
+http_responses = registry.register(
+    Counter("http_responses_total", "Provider HTTP responses by status class (2xx, 3xx, 4xx, 429, 5xx).", ("provider", "function", "status"))
+)
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Provider HTTP request latency.",
+        ("provider",),
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+)
+in_flight = registry.register(Gauge("in_flight_jobs", "Provider jobs currently running, by tracker.", ("tracker",)))
+event_loop_lag = registry.register(
+    Gauge("event_loop_lag_seconds", "How late the last event-loop lag probe woke up.")
+)
+event_loop_lag_histogram = registry.register(
+    Histogram(
+        "event_loop_lag_observed_seconds",
+        "Distribution of event-loop lag probe delays.",
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+    )
+)
+thread_pool_queue = registry.register(
+    Gauge("thread_pool_queue_depth", "Work items waiting for the event loop's default thread pool.")
+)
+stats_gauge = registry.register(
+    Gauge("component_stat", "Point-in-time counters kept by service components.", ("component", "key", "stat"))
+)
+
+
+def status_class(status_code: int) -> str:
+    return "429" if status_code == 429 else f"{status_code // 100}xx"
+
+
+# Status checks seen so far per (provider, job ID), for jobs polled one
+# function call at a time.
+_status_checks: dict[tuple[str, str], int] = {}
+
+
+def count_status_check(provider: str, job_id: str) -> None:
+    key = (provider, job_id)
+    _status_checks[key] = _status_checks.get(key, 0) + 1
+    while len(_status_checks) > 10_000:
+        del _status_checks[next(iter(_status_checks))]
+
+
+def pop_status_checks(provider: str, job_id: str) -> int:
+    return _status_checks.pop((provider, job_id), 0)
+
+
+def record_job_completion(key: str, seconds: float, status_checks: int) -> None:
+    """Records a finished job. `key` is "<provider>:<kind>", as used by the duration estimator."""
+    provider, _, kind = key.partition(":")
+    function = current_function()
+    job_duration.observe(seconds, provider=provider, kind=kind, function=function)
+    job_status_checks.observe(status_checks, provider=provider, kind=kind, function=function)
+
+
+def collect_component_stats() -> None:
+    """Copies the stats kept by the cache, pools, rate limiter, webhooks, router and post queue into gauges."""
+    # Imported here: those modules record into this one.
+    from src.utils.cache import scrape_cache, scrape_jobs_in_flight, scrapes_in_flight
+    from src.utils.http import http_pool_stats
+    from src.utils.polling import poll_stats
+    from src.utils.rate_limit import rate_limit_stats
+    from src.utils.routing import routing_stats
+    from src.utils.webhooks import job_waiters, stats as webhook_stats
+
+    in_flight.set(len(scrape_jobs_in_flight), tracker="scrape_jobs")
+    in_flight.set(scrapes_in_flight.in_flight(), tracker="scrapes")
+    in_flight.set(len(job_waiters), tracker="webhook_waiters")
+
+    components: dict[str, dict[str, dict[str, Any]]] = {
+        "cache": {"scrape_cache": vars(scrape_cache.stats)},
+        "single_flight": {
+            "scrapes": {"started": scrapes_in_flight.started, "coalesced": scrapes_in_flight.coalesced},
+            "scrape_jobs": {"coalesced": scrape_jobs_in_flight.coalesced},
+        },
+        "webhooks": {"callbacks": vars(webhook_stats)},
+        "http_pool": http_pool_stats(),
+        "rate_limit": rate_limit_stats(),
+        "routing": routing_stats(),
+        "poll_expected_seconds": {key: {"seconds": value} for key, value in poll_stats().items()},
+    }
+    # Provider modules are only reported when this worker registered them.
+    if brightdata_api := sys.modules.get("src.functions.brightdata.api"):
+        components["brightdata_downloads"] = {"snapshots": vars(brightdata_api.download_stats)}
+    if agent_pool := sys.modules.get("src.functions.phantombuster.agent_pool"):
+        components["agent_pool"] = agent_pool.agent_pool_stats()
+    if post_queue := sys.modules.get("src.functions.linkedin.post_queue"):
+        components["post_queue"] = {"posts": post_queue.post_queue.counts()}
+    for component, entries in components.items():
+        for key, values in entries.items():
+            for stat, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stats_gauge.set(value, component=component, key=key, stat=stat)
+
+
+registry.add_collector(collect_component_stats)
+
+
+async def monitor_event_loop(interval: float = 1.0) -> None:
+    """Samples event-loop lag and thread-pool queue depth until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - started - interval)
+        event_loop_lag.set(lag)
+        event_loop_lag_histogram.observe(lag)
+
+        executor = getattr(loop, "_default_executor", None)
+        work_queue = getattr(executor, "_work_queue", None)
+        thread_pool_queue.set(work_queue.qsize() if work_queue is not None else 0)
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from restack_ai.function import log
+
+from src.utils.metrics import record_job_completion
+
+T = TypeVar("T")
+
+
+class PollTimeoutError(TimeoutError):
+    """Raised when a job has not finished before the polling deadline."""
+
+
+@dataclass
+class PollPolicy:
+    """How often to check a job's status.
+
+    The first check lands just before the job's learned expected duration (when
+    one is known). After that the interval grows exponentially from
+    `initial_interval` up to `max_interval`, with +/- `jitter` applied so many
+    jobs launched together don't poll in lockstep.
+    """
+
+    initial_interval: float = float(os.environ.get("POLL_INITIAL_INTERVAL_SECONDS", "2"))
+    multiplier: float = float(os.environ.get("POLL_BACKOFF_MULTIPLIER", "1.5"))
+    max_interval: float = float(os.environ.get("POLL_MAX_INTERVAL_SECONDS", "30"))
+    jitter: float = float(os.environ.get("POLL_JITTER", "0.2"))
+    deadline: float = float(os.environ.get("POLL_DEADLINE_SECONDS", "3600"))
+    expected_margin: float = 0.9
+    # Fixed interval used instead when a completion webhook is expected.
+    webhook_fallback_interval: float = float(os.environ.get("WEBHOOK_FALLBACK_POLL_SECONDS", "300"))
+
+
+@dataclass
+class DurationEstimator:
+    """Exponentially weighted moving average of job durations, keyed by agent or dataset."""
+
+    alpha: float = 0.3
+    durations: dict[str, float] = field(default_factory=dict)
+
+    def expected(self, key: str) -> float | None:
+        return self.durations.get(key)
+
+    def record(self, key: str, seconds: float) -> None:
+        previous = self.durations.get(key)
+        if previous is None:
+            self.durations[key] = seconds
+        else:
+            self.durations[key] = self.alpha * seconds + (1 - self.alpha) * previous
+
+
+durations = DurationEstimator()
+
+
+def next_delay(
+    policy: PollPolicy,
+    attempt: int,
+    elapsed: float,
+    expected: float | None,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """Returns how long to wait before status check number `attempt` (0-based).
+
+    Pure so workflows can call it with a deterministic random source.
+    """
+    target_first = expected * policy.expected_margin if expected else None
+    if target_first is not None and elapsed < target_first:
+        delay = target_first - elapsed
+    else:
+        delay = min(policy.initial_interval * policy.multiplier ** attempt, policy.max_interval)
+        delay *= 1 + policy.jitter * (2 * rand() - 1)
+
+    remaining = policy.deadline - elapsed
+    return max(0.0, min(delay, remaining))
+
+
+async def poll_until(
+    check: Callable[[], Awaitable[T]],
+    is_done: Callable[[T], bool],
+    key: str,
+    policy: PollPolicy | None = None,
+    started_at: float | None = None,
+) -> T:
+    """Calls `check` on an adaptive schedule until `is_done` accepts its result.
+
+    `check` should raise on a failed job. On success the job's total duration is
+    fed back into the estimator for `key`, so the next job's first check is
+    scheduled near its typical completion time.
+    """
+    policy = policy or PollPolicy()
+    started_at = started_at if started_at is not None else time.monotonic()
+    expected = durations.expected(key)
+
+    attempt = 0
+    backoff_attempt = 0
+    while True:
+        elapsed = time.monotonic() - started_at
+        if elapsed >= policy.deadline:
+            raise PollTimeoutError(f"{key} did not finish within {policy.deadline:.0f}s after {attempt} checks")
+
+        delay = next_delay(policy, backoff_attempt, elapsed, expected)
+        if expected is None or elapsed >= expected * policy.expected_margin:
+            backoff_attempt += 1
+        await asyncio.sleep(delay)
+
+        result = await check()
+        attempt += 1
+        if is_done(result):
+            duration = time.monotonic() - started_at
+            durations.record(key, duration)
+            record_job_completion(key, duration, attempt)
+            log.info(f"{key} finished after {duration:.1f}s and {attempt} status checks")
+            return result
+
+
+def poll_stats() -> dict[str, Any]:
+    """Returns the learned expected duration per key, in seconds."""
+    return dict(durations.durations)
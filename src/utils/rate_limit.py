@@ -0,0 +1,267 @@
+import asyncio
+import email.utils
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from restack_ai.function import log
+
+from src.utils.storage import data_dir
+
+# Token buckets per provider and API key, stored in SQLite so every worker
+# process on the host draws from the same budget. Providers' Retry-After and
+# X-RateLimit-* headers push the bucket's next allowed request into the future.
+# The SQLite transactions can wait on other processes' locks, so async callers
+# run them in a thread.
+
+DEFAULT_LIMITS = {
+    # provider: (requests per second, burst)
+    "phantombuster": (2.0, 5),
+    "brightdata": (5.0, 10),
+    "linkedin": (1.0, 3),
+    # Posts per member: LinkedIn allows 150 shares per member per day.
+    "linkedin_posts": (150 / 86400, 5),
+}
+
+# Header names that identify the credential a request is made with.
+KEY_HEADERS = ("X-Phantombuster-Key-1", "Authorization")
+
+
+def limits_for(provider: str) -> tuple[float, float]:
+    rate, burst = DEFAULT_LIMITS.get(provider, (5.0, 10))
+    prefix = f"RATE_LIMIT_{provider.upper()}"
+    return (
+        float(os.environ.get(f"{prefix}_PER_SECOND", rate)),
+        float(os.environ.get(f"{prefix}_BURST", burst)),
+    )
+
+
+def bucket_for(provider: str, request: httpx.Request) -> str:
+    """Returns the bucket name for a request: the provider plus a hash of its credential."""
+    for header in KEY_HEADERS:
+        credential = request.headers.get(header)
+        if credential:
+            return f"{provider}:{hashlib.sha256(credential.encode()).hexdigest()[:12]}"
+    return f"{provider}:default"
+
+
+def parse_retry_after(response: httpx.Response, now: float) -> float | None:
+    """Returns the epoch time before which the provider asked us not to call again, if it did."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        if retry_after.strip().isdigit():
+            return now + float(retry_after)
+        try:
+            return email.utils.parsedate_to_datetime(retry_after).timestamp()
+        except (TypeError, ValueError):
+            pass
+
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining is not None and reset is not None:
+        try:
+            if float(remaining) <= 0:
+                reset_at = float(reset)
+                # Some APIs send an epoch timestamp, others seconds from now.
+                return reset_at if reset_at > 1_000_000_000 else now + reset_at
+        except ValueError:
+            pass
+
+    if response.status_code == 429:
+        return now + 1.0
+    return None
+
+
+@dataclass
+class BucketStats:
+    acquired: int = 0
+    waited: int = 0
+    total_wait_seconds: float = 0.0
+    throttled: int = 0
+    current_wait_seconds: float = 0.0
+
+
+class RateLimiter:
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.buckets: dict[str, BucketStats] = {}
+        self._db: sqlite3.Connection | None = None
+        # The connection is shared by the threads the transactions run in.
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.path or data_dir() / "rate_limits.sqlite3",
+                isolation_level=None,
+                check_same_thread=False,
+                timeout=10,
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "bucket TEXT PRIMARY KEY, tokens REAL, updated_at REAL, blocked_until REAL)"
+            )
+        return self._db
+
+    def stats(self, bucket: str) -> BucketStats:
+        return self.buckets.setdefault(bucket, BucketStats())
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the block in a write transaction, one thread at a time."""
+        with self._lock:
+            db = self.db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def try_take(self, bucket: str, rate: float, burst: float, now: float | None = None) -> float:
+        """Takes a token if one is available and returns 0, otherwise returns seconds until one will be."""
+        now = time.time() if now is None else now
+        with self.transaction() as db:
+            row = db.execute(
+                "SELECT tokens, updated_at, blocked_until FROM rate_limits WHERE bucket = ?", (bucket,)
+            ).fetchone()
+            tokens, updated_at, blocked_until = row if row else (burst, now, 0.0)
+            tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+
+            if now < blocked_until:
+                wait = blocked_until - now
+            elif tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+
+            db.execute(
+                "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?)",
+                (bucket, tokens, now, blocked_until),
+            )
+        return wait
+
+    def block_until(self, bucket: str, until: float) -> None:
+        """Stops every process from calling `bucket` until `until` (epoch seconds)."""
+        with self.transaction() as db:
+            db.execute(
+                "INSERT INTO rate_limits VALUES (?, 0, ?, ?) "
+                "ON CONFLICT(bucket) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)",
+                (bucket, time.time(), until),
+            )
+
+    async def acquire(self, bucket: str, rate: float, burst: float) -> float:
+        """Waits until the bucket allows a request and returns how long that took."""
+        stats = self.stats(bucket)
+        waited = 0.0
+        while (wait := await asyncio.to_thread(self.try_take, bucket, rate, burst)) > 0:
+            stats.current_wait_seconds = wait
+            waited += wait
+            await asyncio.sleep(wait)
+        stats.current_wait_seconds = 0.0
+        stats.acquired += 1
+        if waited:
+            stats.waited += 1
+            stats.total_wait_seconds += waited
+        return waited
+
+    async def observe(self, bucket: str, response: httpx.Response) -> None:
+        """Applies a response's rate-limit headers to the bucket."""
+        until = parse_retry_after(response, time.time())
+        if response.status_code == 429:
+            self.stats(bucket).throttled += 1
+        if until is not None:
+            log.warning(f"{bucket} is rate limited for {max(0.0, until - time.time()):.1f}s")
+            await asyncio.to_thread(self.block_until, bucket, until)
+
+
+rate_limiter = RateLimiter()
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Waits for the provider's token bucket before each request.
+
+    A 429 blocks the bucket for every process, then the request is retried here
+    up to `max_retries` times as long as the provider asks for no more than
+    `max_inline_wait` seconds and its body can be sent again. Otherwise the 429
+    is returned to the caller, whose function should raise a retryable error.
+    A streamed body, such as a media upload read from disk, has been consumed
+    by the first attempt, so only its caller can retry it.
+    """
+
+    def __init__(self, provider: str, transport: httpx.AsyncBaseTransport) -> None:
+        self.provider = provider
+        self.transport = transport
+        self.max_retries = int(os.environ.get("RATE_LIMIT_MAX_RETRIES", "2"))
+        self.max_inline_wait = float(os.environ.get("RATE_LIMIT_MAX_INLINE_WAIT_SECONDS", "30"))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = bucket_for(self.provider, request)
+        rate, burst = limits_for(self.provider)
+        # Checked before sending: a transport that buffers the body while sending makes it look replayable.
+        replayable = is_replayable(request)
+        attempt = 0
+        while True:
+            await rate_limiter.acquire(bucket, rate, burst)
+            response = await self.transport.handle_async_request(request)
+            await rate_limiter.observe(bucket, response)
+            if response.status_code != 429 or attempt >= self.max_retries or not replayable:
+                return response
+
+            until = parse_retry_after(response, time.time()) or time.time()
+            if until - time.time() > self.max_inline_wait:
+                return response
+            await response.aclose()
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def is_replayable(request: httpx.Request) -> bool:
+    """Returns True if the request's body is in memory, so sending it again sends the same bytes."""
+    return isinstance(request.stream, httpx.ByteStream)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Returns True if `error`, or anything it was raised from, is a 429 response."""
+    while error is not None:
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def is_transient(error: BaseException) -> bool:
+    """Returns True if `error`, or anything it was raised from, is a 429, a 5xx or a network error."""
+    while error is not None:
+        if isinstance(error, httpx.HTTPStatusError) and (error.response.status_code == 429 or error.response.status_code >= 500):
+            return True
+        if isinstance(error, httpx.TransportError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def rate_limit_stats() -> dict[str, dict[str, Any]]:
+    return {
+        bucket: {
+            "current_wait_seconds": stats.current_wait_seconds,
+            "acquired": stats.acquired,
+            "waited": stats.waited,
+            "total_wait_seconds": stats.total_wait_seconds,
+            "throttled": stats.throttled,
+        }
+        for bucket, stats in rate_limiter.buckets.items()
+    }
@@ -0,0 +1,295 @@
+from typing import Any
+
+import msgspec
+from restack_ai.function import log
+
+# Compact typed records for scraped profiles, posts and reactions, with fast
+# decoders from each provider's raw result format. Decoding goes straight from
+# the provider's bytes (or a Phantombuster resultObject string) to structs
+# without building an intermediate dict per record.
+
+Number = int | float | str | None
+
+
+class Profile(msgspec.Struct, kw_only=True, omit_defaults=True):
+    provider: str
+    url: str
+    name: str | None = None
+    headline: str | None = None
+    location: str | None = None
+    company: str | None = None
+    followers: int | None = None
+    connections: int | None = None
+
+
+class Post(msgspec.Struct, kw_only=True, omit_defaults=True):
+    provider: str
+    url: str
+    author_url: str | None = None
+    text: str | None = None
+    posted_at: str | None = None
+    likes: int | None = None
+    comments: int | None = None
+
+
+class Reaction(msgspec.Struct, kw_only=True, omit_defaults=True):
+    provider: str
+    post_url: str | None
+    profile_url: str
+    name: str | None = None
+    headline: str | None = None
+    reaction_type: str | None = None
+
+
+# Raw record layouts. Unknown fields are skipped while decoding; fields some
+# agents or datasets name differently are listed separately and coalesced.
+
+
+class BrightDataCompany(msgspec.Struct):
+    name: str | None = None
+
+
+class BrightDataProfile(msgspec.Struct):
+    url: str | None = None
+    input_url: str | None = None
+    name: str | None = None
+    position: str | None = None
+    city: str | None = None
+    current_company: BrightDataCompany | None = None
+    current_company_name: str | None = None
+    followers: Number = None
+    connections: Number = None
+    error: str | None = None
+
+
+class BrightDataPost(msgspec.Struct):
+    url: str | None = None
+    post_url: str | None = None
+    use_url: str | None = None
+    post_text: str | None = None
+    date_posted: str | None = None
+    num_likes: Number = None
+    num_comments: Number = None
+    error: str | None = None
+
+
+class BrightDataReaction(msgspec.Struct):
+    post_url: str | None = None
+    url: str | None = None
+    user_url: str | None = None
+    name: str | None = None
+    headline: str | None = None
+    reaction: str | None = None
+    reaction_type: str | None = None
+    error: str | None = None
+
+
+class PhantombusterProfile(msgspec.Struct, rename="camel"):
+    linkedin_profile_url: str | None = None
+    profile_url: str | None = None
+    query: str | None = None
+    full_name: str | None = None
+    headline: str | None = None
+    location: str | None = None
+    company_name: str | None = None
+    company: str | None = None
+    followers_count: Number = None
+    connections_count: Number = None
+    error: str | None = None
+
+
+class PhantombusterPost(msgspec.Struct, rename="camel"):
+    post_url: str | None = None
+    profile_url: str | None = None
+    post_content: str | None = None
+    post_timestamp: str | None = None
+    post_date: str | None = None
+    like_count: Number = None
+    comment_count: Number = None
+    error: str | None = None
+
+
+class PhantombusterReaction(msgspec.Struct, rename="camel"):
+    post_url: str | None = None
+    profile_link: str | None = None
+    profile_url: str | None = None
+    full_name: str | None = None
+    occupation: str | None = None
+    title: str | None = None
+    reaction_type: str | None = None
+    error: str | None = None
+
+
+def to_int(value: Number) -> int | None:
+    """Parses counts that providers send as numbers or as strings like "1,234" or "500+"."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    digits = value.replace(",", "").rstrip("+").strip()
+    return int(digits) if digits.isdigit() else None
+
+
+def normalize_profile(provider: str, raw: Any) -> Profile | None:
+    if raw.error:
+        return None
+    if provider == "brightdata":
+        url = raw.url or raw.input_url
+        if not url:
+            return None
+        company = raw.current_company.name if raw.current_company else None
+        return Profile(
+            provider=provider,
+            url=url,
+            name=raw.name,
+            headline=raw.position,
+            location=raw.city,
+            company=company or raw.current_company_name,
+            followers=to_int(raw.followers),
+            connections=to_int(raw.connections),
+        )
+    url = raw.linkedin_profile_url or raw.profile_url or raw.query
+    if not url:
+        return None
+    return Profile(
+        provider=provider,
+        url=url,
+        name=raw.full_name,
+        headline=raw.headline,
+        location=raw.location,
+        company=raw.company_name or raw.company,
+        followers=to_int(raw.followers_count),
+        connections=to_int(raw.connections_count),
+    )
+
+
+def normalize_post(provider: str, raw: Any) -> Post | None:
+    if raw.error:
+        return None
+    if provider == "brightdata":
+        url = raw.url or raw.post_url
+        if not url:
+            return None
+        return Post(
+            provider=provider,
+            url=url,
+            author_url=raw.use_url,
+            text=raw.post_text,
+            posted_at=raw.date_posted,
+            likes=to_int(raw.num_likes),
+            comments=to_int(raw.num_comments),
+        )
+    if not raw.post_url:
+        return None
+    return Post(
+        provider=provider,
+        url=raw.post_url,
+        author_url=raw.profile_url,
+        text=raw.post_content,
+        posted_at=raw.post_timestamp or raw.post_date,
+        likes=to_int(raw.like_count),
+        comments=to_int(raw.comment_count),
+    )
+
+
+def normalize_reaction(provider: str, raw: Any) -> Reaction | None:
+    if raw.error:
+        return None
+    if provider == "brightdata":
+        profile_url = raw.user_url or raw.url
+        if not profile_url:
+            return None
+        return Reaction(
+            provider=provider,
+            post_url=raw.post_url,
+            profile_url=profile_url,
+            name=raw.name,
+            headline=raw.headline,
+            reaction_type=raw.reaction_type or raw.reaction,
+        )
+    profile_url = raw.profile_link or raw.profile_url
+    if not profile_url:
+        return None
+    return Reaction(
+        provider=provider,
+        post_url=raw.post_url,
+        profile_url=profile_url,
+        name=raw.full_name,
+        headline=raw.occupation or raw.title,
+        reaction_type=raw.reaction_type,
+    )
+
+
+RAW_TYPES = {
+    ("brightdata", "profile"): BrightDataProfile,
+    ("brightdata", "post"): BrightDataPost,
+    ("brightdata", "reaction"): BrightDataReaction,
+    ("phantombuster", "profile"): PhantombusterProfile,
+    ("phantombuster", "post"): PhantombusterPost,
+    ("phantombuster", "reaction"): PhantombusterReaction,
+}
+
+NORMALIZERS = {
+    "profile": normalize_profile,
+    "post": normalize_post,
+    "reaction": normalize_reaction,
+}
+
+_decoders: dict[tuple[str, str], msgspec.json.Decoder] = {}
+
+
+def decode_raw(provider: str, record: str, data: bytes | str | list | dict | None) -> list[Any]:
+    """Decodes a provider payload into raw record structs.
+
+    `data` is the provider's JSON bytes, a Phantombuster resultObject string,
+    or records that were already decoded into dicts. A single record is
+    treated as a list of one. Records that don't fit the raw layout are
+    skipped with a warning rather than failing the whole payload.
+    """
+    if not data:
+        return []
+    raw_type = RAW_TYPES[(provider, record)]
+    if isinstance(data, (bytes, str)):
+        decoder = _decoders.get((provider, record))
+        if decoder is None:
+            decoder = _decoders[(provider, record)] = msgspec.json.Decoder(list[raw_type] | raw_type)
+        try:
+            decoded = decoder.decode(data)
+            return decoded if isinstance(decoded, list) else [decoded]
+        except msgspec.ValidationError as e:
+            log.warning(f"Falling back to per-record decoding of {provider} {record}s: {e}")
+            data = msgspec.json.decode(data)
+
+    items = data if isinstance(data, list) else [data]
+    decoded = []
+    for item in items:
+        try:
+            decoded.append(msgspec.convert(item, raw_type, strict=False))
+        except msgspec.ValidationError as e:
+            log.warning(f"Skipping {provider} {record} record: {e}")
+    return decoded
+
+
+def decode_records(provider: str, record: str, data: bytes | str | list | dict | None) -> list[Any]:
+    normalize = NORMALIZERS[record]
+    return [item for raw in decode_raw(provider, record, data) if (item := normalize(provider, raw)) is not None]
+
+
+def decode_profiles(provider: str, data: bytes | str | list | dict | None) -> list[Profile]:
+    """Decodes a provider's profile results into Profiles, skipping error records."""
+    return decode_records(provider, "profile", data)
+
+
+def decode_posts(provider: str, data: bytes | str | list | dict | None) -> list[Post]:
+    """Decodes a provider's post results into Posts, skipping error records."""
+    return decode_records(provider, "post", data)
+
+
+def decode_reactions(provider: str, data: bytes | str | list | dict | None) -> list[Reaction]:
+    """Decodes a provider's reaction results into Reactions, skipping error records."""
+    return decode_records(provider, "reaction", data)
+
+
+def to_builtins(records: list[msgspec.Struct]) -> list[dict[str, Any]]:
+    """Plain dicts for returning records from a function, without unset fields."""
+    return msgspec.to_builtins(records)
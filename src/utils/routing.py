@@ -0,0 +1,143 @@
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+# Rolling latency and error-rate samples per (provider, data kind), used by the
+# provider-agnostic workflows to pick a primary provider and decide when to hedge.
+#
+# The windows are kept in memory, so each worker process learns on its own and
+# starts from the defaults after a restart. The choose and record steps of one
+# workflow may run in different processes behind the `routing` queue; every
+# process still converges on the same rankings as it sees more outcomes.
+
+PROVIDERS = ("brightdata", "phantombuster")
+
+PROVIDER_CREDENTIALS = {
+    "brightdata": "BRIGHT_DATA_API_TOKEN",
+    "phantombuster": "PHANTOMBUSTER_API_KEY",
+}
+
+# Minimum samples before percentiles are trusted over the defaults below.
+MIN_SAMPLES = 5
+
+
+@dataclass
+class ProviderWindow:
+    """The last `size` outcomes for one provider and data kind.
+
+    A scrape cancelled because the other provider won is censored: it only
+    shows the provider took longer than `seconds`. Without these samples a
+    primary that is always hedged away would never look slower.
+    """
+
+    size: int = 100
+    latencies: deque = field(default_factory=deque)
+    censored: deque = field(default_factory=deque)
+    outcomes: deque = field(default_factory=deque)
+
+    def record(self, seconds: float, success: bool, censored: bool = False) -> None:
+        if censored:
+            self.censored.append(seconds)
+        else:
+            self.outcomes.append(success)
+            if success:
+                self.latencies.append(seconds)
+        for samples in (self.outcomes, self.latencies, self.censored):
+            while len(samples) > self.size:
+                samples.popleft()
+
+    def percentile(self, q: float) -> float | None:
+        """The latency below which a share `q` of scrapes finish (a Kaplan-Meier estimate).
+
+        Censored samples leave the set at risk without finishing. When too many
+        are censored to reach `q`, returns the longest time seen, a lower bound.
+        """
+        if len(self.latencies) + len(self.censored) < MIN_SAMPLES:
+            return None
+        # Finished before censored at the same time, as they are known to be no longer.
+        samples = sorted([(seconds, False) for seconds in self.latencies] + [(seconds, True) for seconds in self.censored])
+        at_risk, survival = len(samples), 1.0
+        for seconds, censored in samples:
+            if not censored:
+                survival *= 1 - 1 / at_risk
+                if 1 - survival > q:
+                    return seconds
+            at_risk -= 1
+        return samples[-1][0]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+
+_windows: dict[tuple[str, str], ProviderWindow] = {}
+
+
+def window(provider: str, kind: str) -> ProviderWindow:
+    return _windows.setdefault((provider, kind), ProviderWindow(size=int(os.environ.get("ROUTER_WINDOW_SIZE", "100"))))
+
+
+def record_outcome(provider: str, kind: str, seconds: float, success: bool, censored: bool = False) -> None:
+    window(provider, kind).record(seconds, success, censored)
+
+
+def configured_providers() -> list[str]:
+    return [provider for provider in PROVIDERS if os.environ.get(PROVIDER_CREDENTIALS[provider])]
+
+
+def provider_cost(provider: str) -> float:
+    """Cost of one scrape in the same unit for every provider (e.g. USD), from ROUTER_COST_<PROVIDER>."""
+    return float(os.environ.get(f"ROUTER_COST_{provider.upper()}", "0"))
+
+
+def score(provider: str, kind: str) -> float:
+    """Expected cost of routing a request to `provider`, in seconds. Lower is better.
+
+    The median latency, plus a penalty per unit of error rate (a failure means
+    paying for the fallback too) and the provider's price converted to seconds.
+    Providers without enough samples get ROUTER_DEFAULT_LATENCY_SECONDS.
+    """
+    stats = window(provider, kind)
+    p50 = stats.percentile(0.5)
+    if p50 is None:
+        p50 = float(os.environ.get("ROUTER_DEFAULT_LATENCY_SECONDS", "120"))
+    error_penalty = float(os.environ.get("ROUTER_ERROR_PENALTY_SECONDS", "600"))
+    seconds_per_cost_unit = float(os.environ.get("ROUTER_SECONDS_PER_COST_UNIT", "0"))
+    return p50 + stats.error_rate() * error_penalty + provider_cost(provider) * seconds_per_cost_unit
+
+
+def rank_providers(kind: str) -> list[str]:
+    """Configured providers, best first. Ties keep ROUTER_PROVIDER_ORDER."""
+    preferred = os.environ.get("ROUTER_PROVIDER_ORDER", ",".join(PROVIDERS)).split(",")
+    providers = configured_providers()
+    providers.sort(key=lambda provider: preferred.index(provider) if provider in preferred else len(preferred))
+    return sorted(providers, key=lambda provider: score(provider, kind))
+
+
+def hedge_after(provider: str, kind: str) -> float | None:
+    """Seconds after which to launch a hedge on the next provider: the primary's p95.
+
+    Falls back to ROUTER_DEFAULT_HEDGE_SECONDS (unset: no hedge) until there are
+    enough samples.
+    """
+    p95 = window(provider, kind).percentile(0.95)
+    if p95 is not None:
+        return p95
+    default = os.environ.get("ROUTER_DEFAULT_HEDGE_SECONDS")
+    return float(default) if default else None
+
+
+def routing_stats() -> dict[str, dict[str, Any]]:
+    return {
+        f"{provider}:{kind}": {
+            "samples": len(stats.outcomes),
+            "censored": len(stats.censored),
+            "p50_seconds": stats.percentile(0.5),
+            "p95_seconds": stats.percentile(0.95),
+            "error_rate": stats.error_rate(),
+        }
+        # A copy: the metrics collector calls this from a thread while workflows record outcomes.
+        for (provider, kind), stats in list(_windows.items())
+    }
@@ -0,0 +1,12 @@
+import functools
+
+from dotenv import load_dotenv
+
+# Settings come from the environment, optionally seeded from a .env file. Entry
+# points call load_settings() before anything reads them; the file is parsed
+# once per process no matter how many modules ask.
+
+
+@functools.cache
+def load_settings() -> None:
+    load_dotenv()
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight job.
+
+    The first caller starts the job; callers arriving while it is still running
+    await the same result (or exception) instead of starting a duplicate. A
+    cancelled waiter does not cancel the shared job.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+
+class InFlightJobs:
+    """Tracks provider jobs started by split launch/poll/fetch workflow steps.
+
+    A launch step for a key that already has a running job joins that job
+    instead of paying for a duplicate. Entries expire after `max_age` seconds
+    in case the fetch step that would finish them never runs.
+    """
+
+    def __init__(self, max_age: float) -> None:
+        self.max_age = max_age
+        self._jobs: dict[Hashable, tuple[str, float]] = {}
+        # How many launches are waiting on each key's job, the one that started it included.
+        self._wanted: dict[Hashable, int] = {}
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> str | None:
+        """Returns the running job for `key`, counting the caller as one more launch waiting on it."""
+        entry = self._jobs.get(key)
+        if entry is None:
+            return None
+        job_id, started_at = entry
+        if time.monotonic() - started_at > self.max_age:
+            self.finish(key)
+            return None
+        self.coalesced += 1
+        self._wanted[key] += 1
+        return job_id
+
+    def add(self, key: Hashable, job_id: str) -> None:
+        self._jobs[key] = (job_id, time.monotonic())
+        self._wanted[key] = 1
+
+    def finish(self, key: Hashable) -> None:
+        self._jobs.pop(key, None)
+        self._wanted.pop(key, None)
+
+    def leave(self, key: Hashable, job_id: str) -> bool:
+        """Records that one launch waiting on `job_id` gave up, and returns whether no launch still wants it.
+
+        A job this process isn't tracking, for example one started by another
+        worker, is assumed to be wanted by nobody else.
+        """
+        entry = self._jobs.get(key)
+        if entry is None or entry[0] != job_id:
+            return True
+        self._wanted[key] -= 1
+        if self._wanted[key] > 0:
+            return False
+        self.finish(key)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._jobs)
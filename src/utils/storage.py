@@ -0,0 +1,9 @@
+import os
+from pathlib import Path
+
+
+def data_dir(*parts: str) -> Path:
+    """Returns (and creates) a directory under the service's local data dir."""
+    path = Path(os.environ.get("LINKEDIN_MCP_DATA_DIR", ".data")).joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
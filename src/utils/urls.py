@@ -0,0 +1,110 @@
+import re
+from collections.abc import Iterable
+from urllib.parse import quote, unquote, urlsplit
+
+LINKEDIN_HOST = "www.linkedin.com"
+
+# linkedin.com, www.linkedin.com and locale/mobile subdomains such as de.linkedin.com
+LINKEDIN_HOST_PATTERN = re.compile(r"^(?:[a-z]{2,3}\.|www\.|mobile\.)?linkedin\.com$")
+
+# /in/<slug> and /company/<slug>, followed by anything (recent-activity/, details/, ...)
+PROFILE_PATH_PATTERN = re.compile(r"^/(in|company)/([^/]+)")
+
+# Old public profiles, /pub/<name>/<a>/<b>/<c>: the name is shared by many people,
+# the short ID segments after it tell them apart.
+PUB_PATH_PATTERN = re.compile(r"^/pub/([^/]+)((?:/[0-9a-z]{1,3}){0,3})")
+
+
+def normalize_segment(segment: str) -> str:
+    """One percent-encoding per path segment, so `%C3%A9`, `%c3%a9` and `é` are the same key."""
+    return quote(unquote(segment).lower(), safe="-_.~")
+
+
+def normalize_path(path: str) -> str:
+    return "/".join(normalize_segment(segment) for segment in path.split("/"))
+
+
+def canonical_profile_url(url: str) -> str:
+    """Returns the one canonical form of a LinkedIn profile URL.
+
+    Strips scheme and host variants (`http`, `www.`, locale subdomains), query
+    strings, fragments, case and any sub-page such as `recent-activity/all/`, so
+    `linkedin.com/in/WilliamHGates?trk=x` and
+    `https://de.linkedin.com/in/williamhgates/recent-activity/all/` both become
+    `https://www.linkedin.com/in/williamhgates/`. Path segments are
+    percent-encoded the same way whatever the input used. Non-LinkedIn URLs are
+    returned with only the scheme, host and encoding normalized.
+
+    Raises ValueError for input without a host, such as a bare slug like
+    `williamhgates`.
+    """
+    url = url.strip()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower()
+    if "." not in host:
+        raise ValueError(f"Not a profile URL: {url!r}. Expected a URL such as https://www.linkedin.com/in/<slug>/")
+    path = normalize_path(parts.path)
+
+    if not LINKEDIN_HOST_PATTERN.match(host):
+        return f"https://{host}{path.rstrip('/')}/"
+
+    match = PROFILE_PATH_PATTERN.match(path)
+    if match:
+        section, slug = match.groups()
+        return f"https://{LINKEDIN_HOST}/{section}/{slug}/"
+    match = PUB_PATH_PATTERN.match(path)
+    if match:
+        name, ids = match.groups()
+        return f"https://{LINKEDIN_HOST}/pub/{name}{ids}/"
+    return f"https://{LINKEDIN_HOST}{path.rstrip('/')}/"
+
+
+def canonical_profile_url_or_none(url: str | None) -> str | None:
+    """Like canonical_profile_url, but None for a missing or malformed URL, e.g. in a provider's record."""
+    if not url:
+        return None
+    try:
+        return canonical_profile_url(url)
+    except ValueError:
+        return None
+
+
+def canonical_profile_urls(urls: Iterable[str]) -> tuple[list[str], dict[str, str]]:
+    """Returns the distinct canonical forms of `urls`, and an error for each input that isn't a URL."""
+    canonical: dict[str, None] = {}
+    errors: dict[str, str] = {}
+    for url in urls:
+        try:
+            canonical[canonical_profile_url(url)] = None
+        except ValueError as e:
+            errors[url] = str(e)
+    return list(canonical), errors
+
+
+def canonical_post_url(url: str) -> str:
+    """Returns a post URL without scheme or host variants, query string or fragment.
+
+    Unlike a profile slug, the path keeps its case: the trailing hash in
+    `/posts/<author>_<slug>-<id>-<hash>/` is case-sensitive.
+
+    Raises ValueError for input without a host.
+    """
+    url = url.strip()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower()
+    if "." not in host:
+        raise ValueError(f"Not a post URL: {url!r}. Expected a URL such as https://www.linkedin.com/posts/<slug>/")
+    if LINKEDIN_HOST_PATTERN.match(host):
+        host = LINKEDIN_HOST
+    path = "/".join(quote(unquote(segment), safe="-_.~") for segment in parts.path.split("/"))
+    return f"https://{host}{path.rstrip('/')}/"
+
+
+def canonical_scrape_url(url: str, kind: str) -> str:
+    """Canonical URL of what a Bright Data scrape of `kind` is for: a post for reactions, otherwise a profile."""
+    return canonical_post_url(url) if kind == "reactions" else canonical_profile_url(url)
+
+
+def activity_url(profile_url: str) -> str:
+    """Returns the recent activity feed URL for a profile."""
+    return f"{canonical_profile_url(profile_url)}recent-activity/all/"
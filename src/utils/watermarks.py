@@ -0,0 +1,243 @@
+import functools
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from restack_ai.function import log
+
+from src.utils.records import Post, decode_posts
+from src.utils.storage import data_dir
+from src.utils.urls import canonical_profile_url
+from src.utils.webhooks import WorkflowRun
+
+# Per-profile watermarks for incremental posts scrapes: the newest post seen so
+# far and the URLs of recently seen posts. An incremental scrape returns only
+# posts newer than the watermark, then advances it. Inside a workflow the
+# advanced watermark is only staged, keyed by the workflow run, and committed
+# by a later step once the workflow holds the result: a step whose result is
+# lost and retried computes the same delta again instead of skipping posts.
+
+# Staged watermarks of runs that never committed are dropped after this long.
+PENDING_TTL_SECONDS = 7 * 24 * 3600
+
+# Keys holding a post's URL in each provider's raw records.
+POST_URL_KEYS = {
+    "brightdata": ("url", "post_url"),
+    "phantombuster": ("postUrl",),
+}
+
+
+def known_posts_limit() -> int:
+    return int(os.environ.get("WATERMARK_KNOWN_POSTS", "200"))
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class Watermark:
+    newest_post_url: str | None = None
+    newest_posted_at: str | None = None
+    # Most recent first, capped at WATERMARK_KNOWN_POSTS.
+    known_post_urls: list[str] = field(default_factory=list)
+
+    def is_new(self, post: Post) -> bool:
+        """A post is new unless it is known or older than the newest post seen.
+
+        Posts are not cut off at the first known one, because pinned posts can
+        appear above newer activity.
+        """
+        if post.url in self.known_post_urls:
+            return False
+        posted_at = parse_timestamp(post.posted_at)
+        newest = parse_timestamp(self.newest_posted_at)
+        return posted_at is None or newest is None or posted_at >= newest
+
+    def advance(self, posts: list[Post]) -> "Watermark":
+        newest_url, newest_at = self.newest_post_url, parse_timestamp(self.newest_posted_at)
+        for post in posts:
+            posted_at = parse_timestamp(post.posted_at)
+            if posted_at is not None and (newest_at is None or posted_at > newest_at):
+                newest_url, newest_at = post.url, posted_at
+        known = list(dict.fromkeys([post.url for post in posts] + self.known_post_urls))
+        return Watermark(
+            newest_post_url=newest_url,
+            newest_posted_at=newest_at.isoformat() if newest_at else None,
+            known_post_urls=known[: known_posts_limit()],
+        )
+
+    def merge(self, other: "Watermark") -> "Watermark":
+        """The later of two watermarks' newest posts, and both their known posts, `other`'s first."""
+        newest_url, newest_at = self.newest_post_url, parse_timestamp(self.newest_posted_at)
+        other_at = parse_timestamp(other.newest_posted_at)
+        if other_at is not None and (newest_at is None or other_at > newest_at):
+            newest_url, newest_at = other.newest_post_url, other_at
+        known = list(dict.fromkeys(other.known_post_urls + self.known_post_urls))
+        return Watermark(
+            newest_post_url=newest_url,
+            newest_posted_at=newest_at.isoformat() if newest_at else None,
+            known_post_urls=known[: known_posts_limit()],
+        )
+
+
+class WatermarkStore:
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path or data_dir() / "watermarks.sqlite3", check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS post_watermarks ("
+                "provider TEXT, url TEXT, updated_at REAL, value TEXT, "
+                "PRIMARY KEY (provider, url))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pending_watermarks ("
+                "provider TEXT, url TEXT, workflow_id TEXT, run_id TEXT, staged_at REAL, value TEXT, "
+                "PRIMARY KEY (provider, url, workflow_id, run_id))"
+            )
+        return self._db
+
+    def get(self, provider: str, url: str) -> Watermark | None:
+        row = self.db.execute(
+            "SELECT value FROM post_watermarks WHERE provider = ? AND url = ?",
+            (provider, canonical_profile_url(url)),
+        ).fetchone()
+        return Watermark(**json.loads(row[0])) if row else None
+
+    def set(self, provider: str, url: str, watermark: Watermark) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO post_watermarks VALUES (?, ?, ?, ?)",
+            (provider, canonical_profile_url(url), time.time(), json.dumps(vars(watermark))),
+        )
+        self.db.commit()
+
+    def stage(self, provider: str, url: str, run: WorkflowRun, watermark: Watermark) -> None:
+        """Holds `watermark` for `run` until commit(); restaging replaces it."""
+        now = time.time()
+        workflow_id, run_id = run
+        with self.db:
+            self.db.execute("DELETE FROM pending_watermarks WHERE staged_at < ?", (now - PENDING_TTL_SECONDS,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO pending_watermarks VALUES (?, ?, ?, ?, ?, ?)",
+                (provider, canonical_profile_url(url), workflow_id, run_id or "", now, json.dumps(vars(watermark))),
+            )
+
+    def commit(self, provider: str, url: str, run: WorkflowRun) -> bool:
+        """Merges the watermark `run` staged into the profile's. Returns False when none is staged, e.g. on a retry."""
+        key = (provider, canonical_profile_url(url), run[0], run[1] or "")
+        with self.db:
+            row = self.db.execute(
+                "SELECT value FROM pending_watermarks WHERE provider = ? AND url = ? AND workflow_id = ? AND run_id = ?", key
+            ).fetchone()
+            if row is None:
+                return False
+            self.db.execute(
+                "DELETE FROM pending_watermarks WHERE provider = ? AND url = ? AND workflow_id = ? AND run_id = ?", key
+            )
+            staged = Watermark(**json.loads(row[0]))
+            current = self.get(provider, url)
+            merged = current.merge(staged) if current else staged
+            self.db.execute(
+                "INSERT OR REPLACE INTO post_watermarks VALUES (?, ?, ?, ?)",
+                (provider, key[1], time.time(), json.dumps(vars(merged))),
+            )
+        return True
+
+
+watermarks = WatermarkStore()
+
+
+def start_date(provider: str, profile_url: str) -> str | None:
+    """The watermark's newest post time in Bright Data's date format, or None without one."""
+    watermark = watermarks.get(provider, profile_url)
+    newest = parse_timestamp(watermark.newest_posted_at) if watermark else None
+    if newest is None:
+        return None
+    return newest.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def container_records(result: dict[str, Any]) -> list[Any]:
+    """Decodes a Phantombuster container result's resultObject, which is a JSON string."""
+    records = result.get("resultObject")
+    records = json.loads(records) if isinstance(records, str) else records
+    return records if isinstance(records, list) else [records] if records else []
+
+
+def raw_post_url(provider: str, record: Any) -> str | None:
+    if not isinstance(record, dict):
+        return None
+    for key in POST_URL_KEYS[provider]:
+        if record.get(key):
+            return record[key]
+    return None
+
+
+def apply_watermark(provider: str, profile_url: str, result: Any, run: WorkflowRun | None = None) -> Any:
+    """Returns only the posts in a provider's posts result that are newer than the profile's watermark.
+
+    The result keeps the provider's raw format (a record list for Bright Data,
+    a container result with a resultObject string for Phantombuster). The
+    watermark is advanced past every post in `result`: at once without a
+    `run`, otherwise staged until that workflow run commits it.
+    """
+    is_container = provider == "phantombuster" and isinstance(result, dict)
+    records = container_records(result) if is_container else result or []
+    posts = decode_posts(provider, records)
+    watermark = watermarks.get(provider, profile_url) or Watermark()
+
+    new_urls = {post.url for post in posts if watermark.is_new(post)}
+    delta = [record for record in records if raw_post_url(provider, record) in new_urls]
+    if run is None:
+        watermarks.set(provider, profile_url, watermark.advance(posts))
+    else:
+        watermarks.stage(provider, profile_url, run, watermark.advance(posts))
+    log.info(f"{len(delta)} of {len(posts)} {provider} posts for {canonical_profile_url(profile_url)} are new")
+
+    if is_container:
+        return {**result, "resultObject": json.dumps(delta)}
+    return delta
+
+
+def incremental_posts(provider: str) -> Callable:
+    """Wraps a posts function so inputs with `incremental` set get only new posts back.
+
+    Goes outside `cached_scrape`. Once the profile has a watermark, an
+    incremental call skips the cache and single-flight and runs the scrape
+    itself, which may limit itself to posts since `start_date()`; such a
+    partial result is never cached.
+    """
+
+    def decorator(fn: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+        # The scrape itself, under cached_scrape.
+        scrape = getattr(fn, "__wrapped__", fn)
+
+        @functools.wraps(fn)
+        async def wrapper(function_input: Any) -> Any:
+            if not function_input.incremental:
+                return await fn(function_input)
+            if watermarks.get(provider, function_input.profile_url) is None:
+                result = await fn(function_input)
+            else:
+                result = await scrape(function_input)
+            return apply_watermark(provider, function_input.profile_url, result)
+
+        return wrapper
+
+    return decorator
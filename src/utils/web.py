@@ -0,0 +1,85 @@
+import asyncio
+import contextlib
+import os
+from collections.abc import AsyncIterator
+
+from aiohttp import web
+from restack_ai.function import log
+
+from src.utils.metrics import monitor_event_loop, registry
+from src.utils.storage import data_dir
+from src.utils.webhooks import is_authorized, notify_job_finished, parse_callback, stats as webhook_stats
+
+# Optional HTTP server running inside the service process. Enabled by setting
+# SERVICE_HTTP_PORT.
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    # Generated input lists that Phantombuster containers download.
+    app.router.add_static("/inputs/", data_dir("inputs"))
+    # Job completion callbacks from Phantombuster and Bright Data.
+    app.router.add_post("/webhooks/{provider:brightdata|phantombuster}", handle_webhook)
+    # Prometheus metrics for this worker.
+    app.router.add_get("/metrics", handle_metrics)
+    app.cleanup_ctx.append(event_loop_monitor)
+    return app
+
+
+async def event_loop_monitor(app: web.Application) -> AsyncIterator[None]:
+    interval = float(os.environ.get("METRICS_LOOP_LAG_INTERVAL_SECONDS", "1"))
+    task = asyncio.create_task(monitor_event_loop(interval))
+    yield
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    # The collectors read the agent leases and post queue from SQLite; keep that off the event loop.
+    await asyncio.to_thread(registry.collect)
+    body = registry.render(collect=False)
+    return web.Response(body=body.encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def handle_webhook(request: web.Request) -> web.Response:
+    provider = request.match_info["provider"]
+    if not is_authorized(request.query.get("token")):
+        webhook_stats.rejected += 1
+        raise web.HTTPUnauthorized()
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        webhook_stats.rejected += 1
+        raise web.HTTPBadRequest(text="Expected a JSON body")
+
+    # Set when the callback URL was made for one job; see webhook_url().
+    workflow_id = request.query.get("workflow_id")
+    workflow = (workflow_id, request.query.get("run_id")) if workflow_id else None
+
+    # Bright Data may batch notifications into a list.
+    payloads = payload if isinstance(payload, list) else [payload]
+    signalled = 0
+    for item in payloads:
+        job_id, status = parse_callback(provider, item if isinstance(item, dict) else {})
+        if not job_id:
+            webhook_stats.rejected += 1
+            log.warning(f"Ignoring {provider} callback without a job ID: {item}")
+            continue
+        signalled += await notify_job_finished(provider, job_id, status, workflow)
+
+    return web.json_response({"signalled": signalled})
+
+
+async def start_web_server() -> web.AppRunner | None:
+    port = os.environ.get("SERVICE_HTTP_PORT")
+    if not port:
+        return None
+
+    host = os.environ.get("SERVICE_HTTP_HOST", "0.0.0.0")
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, int(port)).start()
+    log.info(f"Service HTTP server listening on {host}:{port}")
+    return runner
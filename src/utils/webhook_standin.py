@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import os
+
+import httpx
+
+# Local stand-in for provider completion callbacks. Posts the same body
+# Phantombuster or Bright Data would send to the service's webhook receiver,
+# so the signal path can be exercised without a real job.
+
+
+def build_payload(provider: str, job_id: str, status: str) -> dict:
+    if provider == "brightdata":
+        return {"snapshot_id": job_id, "status": "ready" if status == "finished" else "failed"}
+    return {
+        "containerId": job_id,
+        "exitCode": 0 if status == "finished" else 1,
+        "exitMessage": "finished" if status == "finished" else "Execution failed",
+    }
+
+
+async def send_fake_callback(
+    base_url: str, provider: str, job_id: str, status: str = "finished", workflow_id: str | None = None
+) -> dict:
+    params = {"token": os.environ["WEBHOOK_SECRET"]} if os.environ.get("WEBHOOK_SECRET") else {}
+    if workflow_id:
+        params["workflow_id"] = workflow_id
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{base_url.rstrip('/')}/webhooks/{provider}",
+            params=params,
+            json=build_payload(provider, job_id, status),
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Post a fake job completion callback to the service.")
+    parser.add_argument("provider", choices=["brightdata", "phantombuster"])
+    parser.add_argument("job_id", help="Snapshot ID (Bright Data) or container ID (Phantombuster)")
+    parser.add_argument("--status", choices=["finished", "failed"], default="finished")
+    parser.add_argument(
+        "--workflow-id",
+        help="Workflow to signal, as carried in a Bright Data notify URL. Without it, registered waiters are signalled.",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=f"http://localhost:{os.environ.get('SERVICE_HTTP_PORT', '8080')}",
+        help="Where the service HTTP server is listening",
+    )
+    args = parser.parse_args()
+    print(asyncio.run(send_fake_callback(args.base_url, args.provider, args.job_id, args.status, args.workflow_id)))
+
+
+if __name__ == "__main__":
+    main()
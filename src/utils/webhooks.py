@@ -0,0 +1,174 @@
+import asyncio
+import hmac
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode
+
+from restack_ai.function import log
+from temporalio import activity
+
+from src.utils.polling import PollPolicy
+from src.utils.storage import data_dir
+
+# Completion callbacks from Phantombuster and Bright Data. The service HTTP
+# server receives the provider's callback and signals the workflows waiting on
+# the job, so they skip the rest of their polling. Bright Data is notified at a
+# URL naming the workflow that launched the snapshot, so any service process can
+# signal it. Phantombuster's webhook is set per agent, so its waiters are kept
+# in SQLite, where every service process on the host can find them. A callback
+# that matches nothing leaves the workflow to its fallback polling.
+
+JOB_FINISHED_SIGNAL = "job_finished"
+
+
+@dataclass
+class WebhookStats:
+    received: int = 0
+    matched: int = 0
+    unmatched: int = 0
+    rejected: int = 0
+    signals_sent: int = 0
+    signal_errors: int = 0
+
+
+stats = WebhookStats()
+
+WorkflowRun = tuple[str, str | None]
+
+
+def webhook_url(provider: str, workflow: WorkflowRun | None = None) -> str | None:
+    """Returns the public callback URL for `provider`, or None when webhooks are disabled.
+
+    `workflow` is the run to signal when the callback arrives, for providers that
+    take a callback URL per job.
+    """
+    base_url = os.environ.get("WEBHOOK_BASE_URL")
+    if not base_url:
+        return None
+    url = f"{base_url.rstrip('/')}/webhooks/{provider}"
+    params = {}
+    if workflow is not None:
+        workflow_id, run_id = workflow
+        params["workflow_id"] = workflow_id
+        if run_id:
+            params["run_id"] = run_id
+    secret = os.environ.get("WEBHOOK_SECRET")
+    if secret:
+        params["token"] = secret
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def is_authorized(token: str | None) -> bool:
+    secret = os.environ.get("WEBHOOK_SECRET")
+    if not secret:
+        return True
+    return token is not None and hmac.compare_digest(token.encode(), secret.encode())
+
+
+class JobWaiters:
+    """Maps (provider, job ID) to the workflow runs waiting on that job, in SQLite."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        # The connection is shared by the threads callers run these methods in.
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path or data_dir() / "webhooks.sqlite3", check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS job_waiters ("
+                "provider TEXT, job_id TEXT, workflow_id TEXT, run_id TEXT, registered_at REAL, "
+                "PRIMARY KEY (provider, job_id, workflow_id))"
+            )
+        return self._db
+
+    def register(self, provider: str, job_id: str, workflow_id: str, run_id: str | None) -> None:
+        now = time.time()
+        with self._lock, self.db:
+            # Jobs whose callback never came have long since been polled to completion.
+            self.db.execute("DELETE FROM job_waiters WHERE registered_at < ?", (now - PollPolicy().deadline,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO job_waiters VALUES (?, ?, ?, ?, ?)",
+                (provider, job_id, workflow_id, run_id, now),
+            )
+
+    def pop(self, provider: str, job_id: str) -> set[WorkflowRun]:
+        with self._lock, self.db:
+            rows = self.db.execute(
+                "SELECT workflow_id, run_id FROM job_waiters WHERE provider = ? AND job_id = ?", (provider, job_id)
+            ).fetchall()
+            self.db.execute("DELETE FROM job_waiters WHERE provider = ? AND job_id = ?", (provider, job_id))
+        return {(workflow_id, run_id) for workflow_id, run_id in rows}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM job_waiters").fetchone()[0]
+
+
+job_waiters = JobWaiters()
+
+
+def current_workflow() -> WorkflowRun | None:
+    """The workflow run executing the current function, or None when called outside one."""
+    if not activity.in_activity():
+        return None
+    info = activity.info()
+    return info.workflow_id, info.workflow_run_id
+
+
+async def register_current_workflow(provider: str, job_id: str) -> None:
+    """Registers the workflow run executing the current function as waiting on `job_id`."""
+    workflow = current_workflow()
+    if workflow is not None:
+        await asyncio.to_thread(job_waiters.register, provider, job_id, *workflow)
+
+
+async def notify_job_finished(provider: str, job_id: str, status: str, workflow: WorkflowRun | None = None) -> int:
+    """Signals the workflow named by the callback and every registered waiter, and returns how many were signalled."""
+    from src.client import client
+
+    stats.received += 1
+    waiters = await asyncio.to_thread(job_waiters.pop, provider, job_id)
+    if workflow is not None:
+        # Another process may have registered the same run without its run ID.
+        waiters = {waiter for waiter in waiters if waiter[0] != workflow[0]} | {workflow}
+    if not waiters:
+        stats.unmatched += 1
+        log.info(f"No workflow is waiting on {provider} job {job_id}")
+        return 0
+
+    stats.matched += 1
+    signalled = 0
+    for workflow_id, run_id in waiters:
+        try:
+            handle = await client.get_workflow_handle(workflow_id, run_id)
+            await handle.signal(JOB_FINISHED_SIGNAL, {"job_id": job_id, "status": status})
+        except Exception as e:
+            stats.signal_errors += 1
+            log.error(f"Failed to signal workflow {workflow_id} for {provider} job {job_id}", error=str(e))
+        else:
+            stats.signals_sent += 1
+            signalled += 1
+    log.info(f"{provider} job {job_id} {status}, signalled {signalled} workflow(s)")
+    return signalled
+
+
+def parse_callback(provider: str, payload: dict[str, Any]) -> tuple[str | None, str]:
+    """Returns the job ID and a normalized status ("finished" or "failed") from a callback body."""
+    if provider == "brightdata":
+        job_id = payload.get("snapshot_id")
+        status = "failed" if payload.get("status") == "failed" else "finished"
+    else:
+        job_id = payload.get("containerId")
+        exit_code = payload.get("exitCode")
+        failed = payload.get("status") == "failed" or (exit_code is not None and exit_code != 0)
+        status = "failed" if failed else "finished"
+    return (str(job_id) if job_id else None), status
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from typing import Any
 
@@ -6,31 +7,154 @@ from restack_ai.workflow import (
     import_functions,
     log,
     workflow,
+    workflow_info,
 )
+from temporalio import workflow as temporal_workflow
+
+from src.workflows.brightdata.get_linkedin_profile_posts import GetLinkedinProfilePostsWorkflowBrightdata
+from src.workflows.job_polling import FETCH_RETRY_POLICY, JobCompletionSignals
 
 with import_functions():
+    from src.functions.brightdata.cancel_scrape import (
+        CancelScrapeInput,
+        cancel_scrape_brightdata,
+    )
+    from src.functions.brightdata.fetch_scrape_result import (
+        FetchScrapeResultInput,
+        fetch_scrape_result_brightdata,
+    )
+    from src.functions.brightdata.get_linkedin_profile_posts import GetProfilePostsInput
     from src.functions.brightdata.get_linkedin_profile_reactions import (
         GetReactionsInput,
-        get_linkedin_profile_reactions_brightdata,
+        SelectPostsInput,
+        StoreReactionsInput,
+        select_reaction_posts_brightdata,
+        store_profile_reactions_brightdata,
     )
+    from src.functions.brightdata.get_scrape_status import (
+        ScrapeStatusInput,
+        get_scrape_status_brightdata,
+    )
+    from src.functions.brightdata.launch_scrape import (
+        LaunchScrapeInput,
+        launch_scrape_brightdata,
+    )
+    from src.task_queues import task_queue_for
+
 
+@workflow.defn(description="Get reactions on a LinkedIn profile's recent posts")
+class GetLinkedinProfileReactionsWorkflowBrightdata(JobCompletionSignals):
+    async def scrape_reactions(self, post_url: str, workflow_input: GetReactionsInput) -> Any:
+        """Launches, waits for and fetches one post's reactions snapshot."""
+        started_at = temporal_workflow.time()
+        launch = asyncio.create_task(
+            workflow.step(
+                function=launch_scrape_brightdata,
+                task_queue=task_queue_for(launch_scrape_brightdata),
+                function_input=LaunchScrapeInput(
+                    profile_url=post_url,
+                    kind="reactions",
+                    max_age=workflow_input.max_age,
+                    force_refresh=workflow_input.force_refresh,
+                ),
+                start_to_close_timeout=timedelta(seconds=60),
+            )
+        )
+        async with self.cancelling_job(
+            launch,
+            cancel_scrape_brightdata,
+            lambda launched: CancelScrapeInput(
+                snapshot_id=launched["snapshot_id"],
+                profile_url=post_url,
+                kind="reactions",
+            ),
+        ):
+            launched = await asyncio.shield(launch)
+            if launched["result"] is not None:
+                return launched["result"]
+
+            elapsed = await self.wait_for_job(
+                get_scrape_status_brightdata,
+                ScrapeStatusInput(snapshot_id=launched["snapshot_id"]),
+                launched["snapshot_id"],
+                launched["expected_seconds"],
+                started_at,
+                webhook=launched["webhook"],
+            )
+            return await workflow.step(
+                function=fetch_scrape_result_brightdata,
+                task_queue=task_queue_for(fetch_scrape_result_brightdata),
+                function_input=FetchScrapeResultInput(
+                    snapshot_id=launched["snapshot_id"],
+                    profile_url=post_url,
+                    kind="reactions",
+                    elapsed_seconds=elapsed,
+                ),
+                start_to_close_timeout=timedelta(minutes=5),
+                retry_policy=FETCH_RETRY_POLICY,
+            )
 
-@workflow.defn(description="Get a LinkedIn profile's reactions (Not Implemented)")
-class GetLinkedinProfileReactionsWorkflowBrightdata:
     @workflow.run
     async def run(self, workflow_input: GetReactionsInput) -> dict[str, Any]:
         log.info("GetLinkedinProfileReactionsWorkflowBrightdata started")
         try:
-            # The function call will always raise an error in this version.
-            result = await workflow.step(
-                function=get_linkedin_profile_reactions_brightdata,
-                function_input=GetReactionsInput(profile_url=workflow_input.profile_url),
+            posts = await workflow.child_execute(
+                workflow=GetLinkedinProfilePostsWorkflowBrightdata,
+                workflow_id=f"{workflow_info().workflow_id}-posts",
+                workflow_input=GetProfilePostsInput(
+                    profile_url=workflow_input.profile_url,
+                    max_age=workflow_input.max_age,
+                    force_refresh=workflow_input.force_refresh,
+                ),
+            )
+            post_urls = await workflow.step(
+                function=select_reaction_posts_brightdata,
+                task_queue=task_queue_for(select_reaction_posts_brightdata),
+                function_input=SelectPostsInput(
+                    posts=posts,
+                    max_posts=workflow_input.max_posts,
+                    since=workflow_input.since,
+                ),
                 start_to_close_timeout=timedelta(seconds=60),
             )
+
+            semaphore = asyncio.Semaphore(workflow_input.concurrency)
+
+            async def collect(post_url: str) -> tuple[str, Any]:
+                async with semaphore:
+                    try:
+                        reactions = await self.scrape_reactions(post_url, workflow_input)
+                    except Exception as e:
+                        return post_url, e
+                    return post_url, reactions
+
+            # Each post's reactions arrive as a claim check; the store step combines them into one.
+            reactions: dict[str, Any] = {}
+            errors: dict[str, str] = {}
+            for next_done in temporal_workflow.as_completed([collect(url) for url in post_urls]):
+                post_url, outcome = await next_done
+                if isinstance(outcome, Exception):
+                    errors[post_url] = str(outcome)
+                else:
+                    reactions[post_url] = outcome
+                log.info(f"Reactions collected for {len(reactions) + len(errors)}/{len(post_urls)} posts")
+
+            result = await workflow.step(
+                function=store_profile_reactions_brightdata,
+                task_queue=task_queue_for(store_profile_reactions_brightdata),
+                function_input=StoreReactionsInput(
+                    profile_url=workflow_input.profile_url,
+                    posts=post_urls,
+                    reactions=reactions,
+                    errors=errors,
+                ),
+                start_to_close_timeout=timedelta(minutes=2),
+            )
+
         except Exception as e:
-            # The error from the function is re-raised to be shown to the user.
-            error_message = f"Error during get_linkedin_profile_reactions_brightdata: {e}"
+            error_message = f"Error during GetLinkedinProfileReactionsWorkflowBrightdata: {e}"
             raise NonRetryableError(error_message) from e
         else:
-            log.info("get_linkedin_profile_reactions_brightdata done", result=result)
+            log.info("GetLinkedinProfileReactionsWorkflowBrightdata done", posts=len(post_urls), errors=len(errors))
+
             return result
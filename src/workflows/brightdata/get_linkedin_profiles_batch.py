@@ -0,0 +1,108 @@
+from datetime import timedelta
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+from temporalio import workflow as temporal_workflow
+
+from src.workflows.job_polling import FETCH_RETRY_POLICY, JobCompletionSignals
+
+with import_functions():
+    from src.functions.brightdata.get_linkedin_profiles_batch import (
+        FetchProfilesBatchInput,
+        GetProfilesBatchInput,
+        LaunchProfilesBatchInput,
+        MergeProfilesBatchInput,
+        fetch_profiles_batch_brightdata,
+        launch_profiles_batch_brightdata,
+        merge_profiles_batch_brightdata,
+    )
+    from src.functions.brightdata.get_scrape_status import (
+        ScrapeStatusInput,
+        get_scrape_status_brightdata,
+    )
+    from src.task_queues import task_queue_for
+    from src.utils.blobs import is_claim_check
+    from src.utils.urls import canonical_profile_urls
+
+
+@workflow.defn(description="Get many LinkedIn profiles in batched snapshots")
+class GetLinkedinProfilesBatchWorkflowBrightdata(JobCompletionSignals):
+    async def scrape_chunk(self, chunk: list[str]) -> Any:
+        """Launches, waits for and fetches one chunk's snapshot."""
+        started_at = temporal_workflow.time()
+        launched = await workflow.step(
+            function=launch_profiles_batch_brightdata,
+            task_queue=task_queue_for(launch_profiles_batch_brightdata),
+            function_input=LaunchProfilesBatchInput(profile_urls=chunk),
+            start_to_close_timeout=timedelta(seconds=60),
+        )
+        elapsed = await self.wait_for_job(
+            get_scrape_status_brightdata,
+            ScrapeStatusInput(snapshot_id=launched["snapshot_id"]),
+            launched["snapshot_id"],
+            launched["expected_seconds"],
+            started_at,
+            webhook=launched["webhook"],
+        )
+        return await workflow.step(
+            function=fetch_profiles_batch_brightdata,
+            task_queue=task_queue_for(fetch_profiles_batch_brightdata),
+            function_input=FetchProfilesBatchInput(
+                snapshot_id=launched["snapshot_id"],
+                profile_urls=launched["profile_urls"],
+                elapsed_seconds=elapsed,
+            ),
+            start_to_close_timeout=timedelta(minutes=10),
+            retry_policy=FETCH_RETRY_POLICY,
+        )
+
+    @workflow.run
+    async def run(self, workflow_input: GetProfilesBatchInput) -> dict[str, Any]:
+        log.info("GetLinkedinProfilesBatchWorkflowBrightdata started")
+        try:
+            profile_urls, errors = canonical_profile_urls(workflow_input.profile_urls)
+            chunk_size = workflow_input.chunk_size
+            chunks = [profile_urls[i:i + chunk_size] for i in range(0, len(profile_urls), chunk_size)]
+            log.info(f"Initiating batch scrape of {len(profile_urls)} profiles in {len(chunks)} snapshot(s)")
+
+            async def collect(chunk: list[str]) -> tuple[list[str], Any]:
+                try:
+                    return chunk, await self.scrape_chunk(chunk)
+                except Exception as e:
+                    return chunk, e
+
+            # Each chunk's result may be a claim check; the merge step combines them into one.
+            chunk_results: list[Any] = []
+            finished = 0
+            for next_done in temporal_workflow.as_completed([collect(chunk) for chunk in chunks]):
+                chunk, outcome = await next_done
+                if isinstance(outcome, Exception):
+                    # The other chunks still count; only this chunk's profiles are reported as failed.
+                    errors.update({url: str(outcome) for url in chunk})
+                else:
+                    chunk_results.append(outcome)
+                finished += 1
+                log.info(f"Snapshots finished for {finished}/{len(chunks)} chunks")
+
+            result = await workflow.step(
+                function=merge_profiles_batch_brightdata,
+                task_queue=task_queue_for(merge_profiles_batch_brightdata),
+                function_input=MergeProfilesBatchInput(chunks=chunk_results, errors=errors),
+                start_to_close_timeout=timedelta(minutes=2),
+            )
+        except Exception as e:
+            error_message = f"Error during GetLinkedinProfilesBatchWorkflowBrightdata: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            if is_claim_check(result):
+                profiles, failed = result["summary"]["items"], result["summary"].get("errors", 0)
+            else:
+                profiles, failed = len(result["results"]), len(result["errors"])
+            log.info("GetLinkedinProfilesBatchWorkflowBrightdata done", profiles=profiles, errors=failed)
+
+            return result
@@ -0,0 +1,167 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Callable
+from datetime import timedelta
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    RetryPolicy,
+    import_functions,
+    log,
+    workflow,
+)
+from temporalio import workflow as temporal_workflow
+from temporalio.exceptions import is_cancelled_exception
+
+with import_functions():
+    from src.task_queues import task_queue_for
+    from src.utils.polling import PollPolicy, next_delay
+    from src.utils.webhooks import JOB_FINISHED_SIGNAL
+
+STATUS_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(seconds=2),
+    backoff_coefficient=2.0,
+    maximum_interval=timedelta(seconds=30),
+    maximum_attempts=5,
+)
+
+# Launching a Phantombuster agent fails at once when every agent in the pool
+# is leased, so the retries are what wait for one: about 15 minutes in all.
+LAUNCH_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(seconds=5),
+    backoff_coefficient=1.5,
+    maximum_interval=timedelta(seconds=60),
+    maximum_attempts=20,
+)
+
+# Downloading a finished job's result. The job is done and paid for, so a
+# network error is retried for a few minutes rather than failing the workflow.
+FETCH_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(seconds=2),
+    backoff_coefficient=2.0,
+    maximum_interval=timedelta(seconds=60),
+    maximum_attempts=8,
+)
+
+
+class JobCompletionSignals:
+    """Mixin for workflows that wait on a provider job.
+
+    The service's webhook receiver signals `job_finished` when the provider
+    reports the job done, which ends the wait immediately. Status-check steps
+    keep running as a fallback, on the regular adaptive schedule without
+    webhooks and every `WEBHOOK_FALLBACK_POLL_SECONDS` with them.
+    """
+
+    def __init__(self) -> None:
+        self._finished_jobs: dict[str, str] = {}
+
+    @temporal_workflow.signal(name=JOB_FINISHED_SIGNAL)
+    async def job_finished(self, event: dict[str, Any]) -> None:
+        self._finished_jobs[event["job_id"]] = event.get("status", "finished")
+
+    async def wait_for_job(
+        self,
+        status_function: Any,
+        status_input: Any,
+        job_id: str,
+        expected_seconds: float | None,
+        started_at: float,
+        webhook: bool = False,
+    ) -> float:
+        """Waits on durable timers between status steps until the job is done.
+
+        Each check is its own short workflow step, so a worker restart mid-job
+        only replays history instead of re-launching the scrape. Returns the
+        job's elapsed time in seconds, measured on the workflow clock from
+        `started_at`.
+        """
+        policy = PollPolicy()
+        rand = temporal_workflow.random().random
+
+        attempt = 0
+        backoff_attempt = 0
+        while True:
+            elapsed = temporal_workflow.time() - started_at
+            if elapsed >= policy.deadline:
+                raise NonRetryableError(f"Job {job_id} did not finish within {policy.deadline:.0f}s after {attempt} checks")
+
+            if webhook:
+                delay = min(policy.webhook_fallback_interval, policy.deadline - elapsed)
+            else:
+                delay = next_delay(policy, backoff_attempt, elapsed, expected_seconds, rand=rand)
+                if expected_seconds is None or elapsed >= expected_seconds * policy.expected_margin:
+                    backoff_attempt += 1
+
+            try:
+                await temporal_workflow.wait_condition(lambda: job_id in self._finished_jobs, timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+            if job_id in self._finished_jobs:
+                if self._finished_jobs[job_id] == "failed":
+                    raise NonRetryableError(f"Job {job_id} failed according to its completion webhook")
+                elapsed = temporal_workflow.time() - started_at
+                log.info(f"Job {job_id} finished after {elapsed:.1f}s, signalled by webhook after {attempt} status checks")
+                return elapsed
+
+            status = await workflow.step(
+                function=status_function,
+                task_queue=task_queue_for(status_function),
+                function_input=status_input,
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=STATUS_RETRY_POLICY,
+            )
+            attempt += 1
+            if status["done"]:
+                elapsed = temporal_workflow.time() - started_at
+                log.info(f"Job {job_id} finished after {elapsed:.1f}s and {attempt} status checks")
+                return elapsed
+
+    @contextlib.asynccontextmanager
+    async def cancelling_job(
+        self,
+        launch: asyncio.Task,
+        cancel_function: Any,
+        cancel_input: Callable[[dict[str, Any]], Any],
+    ) -> AsyncIterator[None]:
+        """Cancels the provider job if the workflow is cancelled inside the block.
+
+        A losing hedge is cancelled by its router; without this its snapshot or
+        container keeps running, and its agent stays leased, until it finishes.
+        `launch` is the launch step's task, awaited in the block through
+        `asyncio.shield` so a cancel that arrives mid-launch still learns which
+        job to stop. `cancel_input` builds the cancel step's input from the
+        launch step's result.
+        """
+        try:
+            yield
+        except BaseException as e:
+            if is_cancelled_exception(e):
+                await self._cancel_launched_job(launch, cancel_function, cancel_input)
+            raise
+
+    async def _cancel_launched_job(
+        self,
+        launch: asyncio.Task,
+        cancel_function: Any,
+        cancel_input: Callable[[dict[str, Any]], Any],
+    ) -> None:
+        try:
+            launched = await launch
+        except Exception:
+            return
+        if launched["result"] is not None:
+            return
+        log.info("Workflow cancelled, cancelling its provider job")
+        try:
+            await workflow.step(
+                function=cancel_function,
+                task_queue=task_queue_for(cancel_function),
+                function_input=cancel_input(launched),
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=STATUS_RETRY_POLICY,
+            )
+        except Exception as e:
+            log.warning("Could not cancel the provider job", error=str(e))
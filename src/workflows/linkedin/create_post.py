@@ -13,6 +13,8 @@ with import_functions():
         CreatePostInput,
         create_post_on_linkedin,
     )
+    from src.functions.linkedin.media import UploadMediaInput, upload_linkedin_media
+    from src.task_queues import task_queue_for
 
 
 @workflow.defn(description="Create a post on LinkedIn")
@@ -21,13 +23,24 @@ class CreatePostOnLinkedinWorkflow:
     async def run(self, workflow_input: CreatePostInput) -> dict[str, Any]:
         log.info("CreatePostOnLinkedinWorkflow started")
         try:
+            assets = workflow_input.assets
+            if workflow_input.media and not assets:
+                # Its own step with room for large videos; finished parts survive a retry.
+                uploaded = await workflow.step(
+                    function=upload_linkedin_media,
+                    task_queue=task_queue_for(upload_linkedin_media),
+                    function_input=UploadMediaInput(media=workflow_input.media),
+                    start_to_close_timeout=timedelta(minutes=30),
+                )
+                assets = uploaded["assets"]
             result = await workflow.step(
                 function=create_post_on_linkedin,
-                function_input=CreatePostInput(text=workflow_input.text),
+                task_queue=task_queue_for(create_post_on_linkedin),
+                function_input=CreatePostInput(text=workflow_input.text, media=workflow_input.media, assets=assets),
                 start_to_close_timeout=timedelta(seconds=120),
             )
         except Exception as e:
-            error_message = f"Error during create_post_on_linkedin: {e}"
+            error_message = f"Error during CreatePostOnLinkedinWorkflow: {e}"
             raise NonRetryableError(error_message) from e
         else:
             log.info("create_post_on_linkedin done", result=result)
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+
+with import_functions():
+    from src.functions.linkedin.media import UploadMediaInput, upload_linkedin_media
+    from src.functions.linkedin.post_queue import FAILED, PUBLISHED
+    from src.functions.linkedin.publish_post import (
+        PublishPostInput,
+        QueuePostInput,
+        enqueue_linkedin_post,
+        publish_linkedin_post,
+    )
+    from src.task_queues import task_queue_for
+
+
+@workflow.defn(description="Queue a LinkedIn post and publish it once, at its scheduled time")
+class PublishLinkedinPostWorkflow:
+    @workflow.run
+    async def run(self, workflow_input: QueuePostInput) -> dict[str, Any]:
+        log.info("PublishLinkedinPostWorkflow started")
+        try:
+            assets = workflow_input.assets
+            if workflow_input.media and not assets:
+                # Uploaded before queueing, like CreatePostOnLinkedinWorkflow; finished uploads are reused on a re-run.
+                uploaded = await workflow.step(
+                    function=upload_linkedin_media,
+                    task_queue=task_queue_for(upload_linkedin_media),
+                    function_input=UploadMediaInput(media=workflow_input.media),
+                    start_to_close_timeout=timedelta(minutes=30),
+                )
+                assets = uploaded["assets"]
+            post = await workflow.step(
+                function=enqueue_linkedin_post,
+                task_queue=task_queue_for(enqueue_linkedin_post),
+                function_input=QueuePostInput(
+                    text=workflow_input.text,
+                    idempotency_key=workflow_input.idempotency_key,
+                    publish_at=workflow_input.publish_at,
+                    media=workflow_input.media,
+                    assets=assets,
+                ),
+                start_to_close_timeout=timedelta(seconds=30),
+            )
+            while post["status"] not in (PUBLISHED, FAILED):
+                # Durable timer: waiting for the scheduled time or the pacing bucket survives worker restarts.
+                if post["wait_seconds"] > 0:
+                    await asyncio.sleep(post["wait_seconds"])
+                post = await workflow.step(
+                    function=publish_linkedin_post,
+                    task_queue=task_queue_for(publish_linkedin_post),
+                    function_input=PublishPostInput(key=post["key"]),
+                    start_to_close_timeout=timedelta(seconds=120),
+                )
+        except Exception as e:
+            error_message = f"Error during publish_linkedin_post: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            log.info("PublishLinkedinPostWorkflow done", result=post)
+
+            return post
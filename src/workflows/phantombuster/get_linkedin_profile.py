@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from typing import Any
 
@@ -7,29 +8,91 @@ from restack_ai.workflow import (
     log,
     workflow,
 )
+from temporalio import workflow as temporal_workflow
+
+from src.workflows.job_polling import FETCH_RETRY_POLICY, LAUNCH_RETRY_POLICY, JobCompletionSignals
 
 with import_functions():
-    from src.functions.phantombuster.get_linkedin_profile import (
-        GetProfileInput,
-        get_linkedin_profile_phantombuster,
+    from src.functions.phantombuster.cancel_scrape import (
+        CancelScrapeInput,
+        cancel_scrape_phantombuster,
+    )
+    from src.functions.phantombuster.fetch_scrape_result import (
+        FetchScrapeResultInput,
+        fetch_scrape_result_phantombuster,
+    )
+    from src.functions.phantombuster.get_scrape_status import (
+        ScrapeStatusInput,
+        get_scrape_status_phantombuster,
     )
+    from src.functions.phantombuster.get_linkedin_profile import GetProfileInput
+    from src.functions.phantombuster.launch_scrape import (
+        LaunchScrapeInput,
+        launch_scrape_phantombuster,
+    )
+    from src.task_queues import task_queue_for
 
 
 @workflow.defn(description="Get a LinkedIn profile using Phantombuster")
-class GetLinkedinProfileWorkflowPhantombuster:
+class GetLinkedinProfileWorkflowPhantombuster(JobCompletionSignals):
     @workflow.run
     async def run(self, workflow_input: GetProfileInput) -> dict[str, Any]:
         log.info("GetLinkedinProfileWorkflowPhantombuster started")
         try:
-            result = await workflow.step(
-                function=get_linkedin_profile_phantombuster,
-                function_input=GetProfileInput(profile_url=workflow_input.profile_url),
-                start_to_close_timeout=timedelta(seconds=120),
+            started_at = temporal_workflow.time()
+            launch = asyncio.create_task(
+                workflow.step(
+                    function=launch_scrape_phantombuster,
+                    task_queue=task_queue_for(launch_scrape_phantombuster),
+                    function_input=LaunchScrapeInput(
+                        profile_url=workflow_input.profile_url,
+                        kind="profile",
+                        max_age=workflow_input.max_age,
+                        force_refresh=workflow_input.force_refresh,
+                    ),
+                    start_to_close_timeout=timedelta(minutes=2),
+                    # Retried while every agent in the pool is busy.
+                    retry_policy=LAUNCH_RETRY_POLICY,
+                )
             )
+            async with self.cancelling_job(
+                launch,
+                cancel_scrape_phantombuster,
+                lambda launched: CancelScrapeInput(
+                    container_id=launched["container_id"],
+                    profile_url=workflow_input.profile_url,
+                    kind="profile",
+                ),
+            ):
+                launched = await asyncio.shield(launch)
+                if launched["result"] is not None:
+                    log.info("get_linkedin_profile_phantombuster served from cache")
+                    return launched["result"]
+
+                elapsed = await self.wait_for_job(
+                    get_scrape_status_phantombuster,
+                    ScrapeStatusInput(container_id=launched["container_id"]),
+                    launched["container_id"],
+                    launched["expected_seconds"],
+                    started_at,
+                    webhook=launched["webhook"],
+                )
+                result = await workflow.step(
+                    function=fetch_scrape_result_phantombuster,
+                    task_queue=task_queue_for(fetch_scrape_result_phantombuster),
+                    function_input=FetchScrapeResultInput(
+                        container_id=launched["container_id"],
+                        profile_url=workflow_input.profile_url,
+                        kind="profile",
+                        elapsed_seconds=elapsed,
+                    ),
+                    start_to_close_timeout=timedelta(minutes=5),
+                    retry_policy=FETCH_RETRY_POLICY,
+                )
         except Exception as e:
             error_message = f"Error during get_linkedin_profile_phantombuster: {e}"
             raise NonRetryableError(error_message) from e
         else:
-            log.info("get_linkedin_profile_phantombuster done", result=result)
+            log.info("get_linkedin_profile_phantombuster done")
 
             return result
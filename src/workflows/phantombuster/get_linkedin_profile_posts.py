@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from typing import Any
 
@@ -7,29 +8,109 @@ from restack_ai.workflow import (
     log,
     workflow,
 )
+from temporalio import workflow as temporal_workflow
+
+from src.workflows.job_polling import FETCH_RETRY_POLICY, LAUNCH_RETRY_POLICY, JobCompletionSignals
 
 with import_functions():
-    from src.functions.phantombuster.get_linkedin_profile_posts import (
-        GetProfilePostsInput,
-        get_linkedin_profile_posts_phantombuster,
+    from src.functions.phantombuster.cancel_scrape import (
+        CancelScrapeInput,
+        cancel_scrape_phantombuster,
+    )
+    from src.functions.phantombuster.commit_watermark import (
+        CommitWatermarkInput,
+        commit_watermark_phantombuster,
+    )
+    from src.functions.phantombuster.fetch_scrape_result import (
+        FetchScrapeResultInput,
+        fetch_scrape_result_phantombuster,
+    )
+    from src.functions.phantombuster.get_scrape_status import (
+        ScrapeStatusInput,
+        get_scrape_status_phantombuster,
     )
+    from src.functions.phantombuster.get_linkedin_profile_posts import GetProfilePostsInput
+    from src.functions.phantombuster.launch_scrape import (
+        LaunchScrapeInput,
+        launch_scrape_phantombuster,
+    )
+    from src.task_queues import task_queue_for
 
 
 @workflow.defn(description="Get a LinkedIn profile's posts using Phantombuster")
-class GetLinkedinProfilePostsWorkflowPhantombuster:
+class GetLinkedinProfilePostsWorkflowPhantombuster(JobCompletionSignals):
+    async def commit_watermark(self, workflow_input: GetProfilePostsInput) -> None:
+        """Advances the watermark an incremental run staged, now that the workflow holds its result."""
+        if workflow_input.incremental:
+            await workflow.step(
+                function=commit_watermark_phantombuster,
+                task_queue=task_queue_for(commit_watermark_phantombuster),
+                function_input=CommitWatermarkInput(profile_url=workflow_input.profile_url),
+                start_to_close_timeout=timedelta(seconds=30),
+            )
+
     @workflow.run
     async def run(self, workflow_input: GetProfilePostsInput) -> dict[str, Any]:
         log.info("GetLinkedinProfilePostsWorkflowPhantombuster started")
         try:
-            result = await workflow.step(
-                function=get_linkedin_profile_posts_phantombuster,
-                function_input=GetProfilePostsInput(profile_url=workflow_input.profile_url),
-                start_to_close_timeout=timedelta(seconds=120),
+            started_at = temporal_workflow.time()
+            launch = asyncio.create_task(
+                workflow.step(
+                    function=launch_scrape_phantombuster,
+                    task_queue=task_queue_for(launch_scrape_phantombuster),
+                    function_input=LaunchScrapeInput(
+                        profile_url=workflow_input.profile_url,
+                        kind="posts",
+                        max_age=workflow_input.max_age,
+                        force_refresh=workflow_input.force_refresh,
+                        incremental=workflow_input.incremental,
+                    ),
+                    start_to_close_timeout=timedelta(minutes=2),
+                    # Retried while every agent in the pool is busy.
+                    retry_policy=LAUNCH_RETRY_POLICY,
+                )
             )
+            async with self.cancelling_job(
+                launch,
+                cancel_scrape_phantombuster,
+                lambda launched: CancelScrapeInput(
+                    container_id=launched["container_id"],
+                    profile_url=workflow_input.profile_url,
+                    kind="posts",
+                ),
+            ):
+                launched = await asyncio.shield(launch)
+                if launched["result"] is not None:
+                    log.info("get_linkedin_profile_posts_phantombuster served from cache")
+                    await self.commit_watermark(workflow_input)
+                    return launched["result"]
+
+                elapsed = await self.wait_for_job(
+                    get_scrape_status_phantombuster,
+                    ScrapeStatusInput(container_id=launched["container_id"]),
+                    launched["container_id"],
+                    launched["expected_seconds"],
+                    started_at,
+                    webhook=launched["webhook"],
+                )
+                result = await workflow.step(
+                    function=fetch_scrape_result_phantombuster,
+                    task_queue=task_queue_for(fetch_scrape_result_phantombuster),
+                    function_input=FetchScrapeResultInput(
+                        container_id=launched["container_id"],
+                        profile_url=workflow_input.profile_url,
+                        kind="posts",
+                        elapsed_seconds=elapsed,
+                        incremental=workflow_input.incremental,
+                    ),
+                    start_to_close_timeout=timedelta(minutes=5),
+                    retry_policy=FETCH_RETRY_POLICY,
+                )
+                await self.commit_watermark(workflow_input)
         except Exception as e:
             error_message = f"Error during get_linkedin_profile_posts_phantombuster: {e}"
             raise NonRetryableError(error_message) from e
         else:
-            log.info("get_linkedin_profile_posts_phantombuster done", result=result)
+            log.info("get_linkedin_profile_posts_phantombuster done")
 
             return result
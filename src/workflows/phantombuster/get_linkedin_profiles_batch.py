@@ -0,0 +1,84 @@
+from datetime import timedelta
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+from temporalio import workflow as temporal_workflow
+
+from src.workflows.job_polling import FETCH_RETRY_POLICY, LAUNCH_RETRY_POLICY, JobCompletionSignals
+
+with import_functions():
+    from src.functions.phantombuster.get_linkedin_profiles_batch import (
+        FetchProfilesBatchInput,
+        GetProfilesBatchInput,
+        LaunchProfilesBatchInput,
+        fetch_profiles_batch_phantombuster,
+        launch_profiles_batch_phantombuster,
+    )
+    from src.functions.phantombuster.get_scrape_status import (
+        ScrapeStatusInput,
+        get_scrape_status_phantombuster,
+    )
+    from src.task_queues import task_queue_for
+    from src.utils.blobs import is_claim_check
+    from src.utils.urls import canonical_profile_urls
+
+
+@workflow.defn(description="Scrape many LinkedIn profiles in one Phantombuster launch")
+class GetLinkedinProfilesBatchWorkflowPhantombuster(JobCompletionSignals):
+    @workflow.run
+    async def run(self, workflow_input: GetProfilesBatchInput) -> dict[str, Any]:
+        log.info("GetLinkedinProfilesBatchWorkflowPhantombuster started")
+        try:
+            profile_urls, errors = canonical_profile_urls(workflow_input.profile_urls)
+            if not profile_urls:
+                return {"results": {}, "errors": errors}
+
+            started_at = temporal_workflow.time()
+            launched = await workflow.step(
+                function=launch_profiles_batch_phantombuster,
+                task_queue=task_queue_for(launch_profiles_batch_phantombuster),
+                function_input=LaunchProfilesBatchInput(
+                    profile_urls=profile_urls,
+                    data_kind=workflow_input.data_kind,
+                ),
+                start_to_close_timeout=timedelta(minutes=2),
+                # Retried while every agent in the pool is busy.
+                retry_policy=LAUNCH_RETRY_POLICY,
+            )
+            elapsed = await self.wait_for_job(
+                get_scrape_status_phantombuster,
+                ScrapeStatusInput(container_id=launched["container_id"]),
+                launched["container_id"],
+                launched["expected_seconds"],
+                started_at,
+                webhook=launched["webhook"],
+            )
+            result = await workflow.step(
+                function=fetch_profiles_batch_phantombuster,
+                task_queue=task_queue_for(fetch_profiles_batch_phantombuster),
+                function_input=FetchProfilesBatchInput(
+                    container_id=launched["container_id"],
+                    profile_urls=profile_urls,
+                    data_kind=workflow_input.data_kind,
+                    errors=errors,
+                    elapsed_seconds=elapsed,
+                ),
+                start_to_close_timeout=timedelta(minutes=10),
+                retry_policy=FETCH_RETRY_POLICY,
+            )
+        except Exception as e:
+            error_message = f"Error during get_linkedin_profiles_batch_phantombuster: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            if is_claim_check(result):
+                profiles, failed = result["summary"]["items"], result["summary"].get("errors", 0)
+            else:
+                profiles, failed = len(result["results"]), len(result["errors"])
+            log.info("get_linkedin_profiles_batch_phantombuster done", profiles=profiles, errors=failed)
+
+            return result
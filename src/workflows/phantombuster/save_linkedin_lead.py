@@ -13,6 +13,7 @@ with import_functions():
         SaveLeadInput,
         save_linkedin_lead_phantombuster,
     )
+    from src.task_queues import task_queue_for
 
 @workflow.defn(description="Save a LinkedIn lead to Phantombuster storage.")
 class SaveLinkedinLeadWorkflowPhantombuster:
@@ -22,6 +23,7 @@ class SaveLinkedinLeadWorkflowPhantombuster:
         try:
             result = await workflow.step(
                 function=save_linkedin_lead_phantombuster,
+                task_queue=task_queue_for(save_linkedin_lead_phantombuster),
                 function_input=SaveLeadInput(linkedin_profile_url=workflow_input.linkedin_profile_url),
                 start_to_close_timeout=timedelta(seconds=60),
             )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+
+with import_functions():
+    from src.functions.phantombuster.save_linkedin_leads_batch import (
+        ChunkLeadsInput,
+        MergeLeadErrorsInput,
+        SaveLeadsBatchInput,
+        SaveLeadsInput,
+        chunk_linkedin_leads_phantombuster,
+        merge_lead_errors_phantombuster,
+        save_linkedin_leads_batch_phantombuster,
+    )
+    from src.task_queues import task_queue_for
+    from src.utils.blobs import is_claim_check
+
+
+@workflow.defn(description="Save many LinkedIn leads to Phantombuster storage.")
+class SaveLinkedinLeadsBatchWorkflowPhantombuster:
+    @workflow.run
+    async def run(self, workflow_input: SaveLeadsInput) -> dict[str, Any]:
+        log.info("SaveLinkedinLeadsBatchWorkflowPhantombuster started")
+        leads = workflow_input.leads
+        chunk_size = workflow_input.chunk_size
+
+        saved = skipped = failed = 0
+        chunk_errors: list[dict[str, Any]] = []
+        try:
+            if is_claim_check(leads):
+                # A stored list is split into stored chunks, so no step carries all of it.
+                chunks = await workflow.step(
+                    function=chunk_linkedin_leads_phantombuster,
+                    task_queue=task_queue_for(chunk_linkedin_leads_phantombuster),
+                    function_input=ChunkLeadsInput(leads=leads, chunk_size=chunk_size),
+                    start_to_close_timeout=timedelta(minutes=5),
+                )
+            else:
+                chunks = [leads[i:i + chunk_size] for i in range(0, len(leads), chunk_size)]
+
+            # One step per chunk: a worker restart only repeats the chunk in progress,
+            # and that chunk skips the leads it had already saved.
+            for index, chunk in enumerate(chunks):
+                result = await workflow.step(
+                    function=save_linkedin_leads_batch_phantombuster,
+                    task_queue=task_queue_for(save_linkedin_leads_batch_phantombuster),
+                    function_input=SaveLeadsBatchInput(
+                        leads=chunk,
+                        concurrency=workflow_input.concurrency,
+                        force=workflow_input.force,
+                    ),
+                    start_to_close_timeout=timedelta(minutes=30),
+                )
+                saved += result["saved"]
+                skipped += result["skipped"]
+                failed += result["failed"]
+                if result["errors"]:
+                    chunk_errors.append(result["errors"])
+                log.info(f"Saved lead chunk {index + 1}/{len(chunks)}", saved=saved, skipped=skipped, errors=failed)
+
+            errors: Any = {}
+            if chunk_errors:
+                errors = await workflow.step(
+                    function=merge_lead_errors_phantombuster,
+                    task_queue=task_queue_for(merge_lead_errors_phantombuster),
+                    function_input=MergeLeadErrorsInput(errors=chunk_errors),
+                    start_to_close_timeout=timedelta(minutes=2),
+                )
+        except Exception as e:
+            error_message = f"Error during save_linkedin_leads_batch_phantombuster: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            log.info("SaveLinkedinLeadsBatchWorkflowPhantombuster done", saved=saved, skipped=skipped, errors=failed)
+            return {"saved": saved, "skipped": skipped, "failed": failed, "errors": errors}
@@ -0,0 +1,39 @@
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+
+from src.workflows.brightdata.get_linkedin_profile import GetLinkedinProfileWorkflowBrightdata
+from src.workflows.phantombuster.get_linkedin_profile import GetLinkedinProfileWorkflowPhantombuster
+from src.workflows.routing.router import RoutedScrapeInput, run_routed_scrape
+
+with import_functions():
+    from src.functions.brightdata.get_linkedin_profile import GetProfileInput as BrightdataInput
+    from src.functions.phantombuster.get_linkedin_profile import GetProfileInput as PhantombusterInput
+
+
+@workflow.defn(description="Get a LinkedIn profile from the fastest available provider")
+class GetLinkedinProfileWorkflow:
+    @workflow.run
+    async def run(self, workflow_input: RoutedScrapeInput) -> dict[str, Any]:
+        log.info("GetLinkedinProfileWorkflow started")
+        try:
+            result = await run_routed_scrape(
+                "profile",
+                workflow_input,
+                {
+                    "brightdata": (GetLinkedinProfileWorkflowBrightdata, BrightdataInput),
+                    "phantombuster": (GetLinkedinProfileWorkflowPhantombuster, PhantombusterInput),
+                },
+            )
+        except Exception as e:
+            error_message = f"Error during GetLinkedinProfileWorkflow: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            log.info("GetLinkedinProfileWorkflow done", provider=result["provider"])
+
+            return result
@@ -0,0 +1,39 @@
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+
+from src.workflows.brightdata.get_linkedin_profile_posts import GetLinkedinProfilePostsWorkflowBrightdata
+from src.workflows.phantombuster.get_linkedin_profile_posts import GetLinkedinProfilePostsWorkflowPhantombuster
+from src.workflows.routing.router import RoutedScrapeInput, run_routed_scrape
+
+with import_functions():
+    from src.functions.brightdata.get_linkedin_profile_posts import GetProfilePostsInput as BrightdataInput
+    from src.functions.phantombuster.get_linkedin_profile_posts import GetProfilePostsInput as PhantombusterInput
+
+
+@workflow.defn(description="Get a LinkedIn profile's posts from the fastest available provider")
+class GetLinkedinProfilePostsWorkflow:
+    @workflow.run
+    async def run(self, workflow_input: RoutedScrapeInput) -> dict[str, Any]:
+        log.info("GetLinkedinProfilePostsWorkflow started")
+        try:
+            result = await run_routed_scrape(
+                "posts",
+                workflow_input,
+                {
+                    "brightdata": (GetLinkedinProfilePostsWorkflowBrightdata, BrightdataInput),
+                    "phantombuster": (GetLinkedinProfilePostsWorkflowPhantombuster, PhantombusterInput),
+                },
+            )
+        except Exception as e:
+            error_message = f"Error during GetLinkedinProfilePostsWorkflow: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            log.info("GetLinkedinProfilePostsWorkflow done", provider=result["provider"])
+
+            return result
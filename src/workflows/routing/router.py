@@ -0,0 +1,164 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+    workflow_info,
+)
+from temporalio import workflow as temporal_workflow
+
+with import_functions():
+    from src.functions.routing.choose_provider import ChooseProviderInput, choose_provider
+    from src.functions.routing.record_provider_outcome import ProviderOutcomeInput, record_provider_outcome
+    from src.task_queues import task_queue_for
+
+
+class RoutedScrapeInput(BaseModel):
+    """Input parameters for a provider-agnostic profile or posts scrape."""
+
+    profile_url: str = Field(
+        ...,
+        title="LinkedIn Profile URL",
+        description="The URL of the LinkedIn profile.",
+        example="https://www.linkedin.com/in/williamhgates/",
+    )
+    max_age: int | None = Field(
+        None,
+        title="Max Age",
+        description="Accept a cached result up to this many seconds old. Defaults to the cache TTL for this data kind.",
+    )
+    force_refresh: bool = Field(
+        False,
+        title="Force Refresh",
+        description="Skip the cache and always run a fresh scrape.",
+    )
+    hedge: bool = Field(
+        True,
+        title="Hedge",
+        description="Start the same scrape on the next provider if the first has not finished by its p95 latency.",
+    )
+
+
+async def run_routed_scrape(
+    kind: Literal["profile", "posts"],
+    workflow_input: RoutedScrapeInput,
+    provider_workflows: dict[str, tuple[Any, type[BaseModel]]],
+) -> dict[str, Any]:
+    """Runs a scrape on the best-ranked provider, hedging and failing over to the others.
+
+    `provider_workflows` maps each provider to its workflow class and input
+    model. The first provider to return wins; a still-running hedge is
+    cancelled, and its provider job stopped, before the result is returned.
+    Every provider started gets a sample in the routing windows: its latency,
+    a failure, or, when cancelled, a censored sample of how long it ran.
+    Returns the winning provider's result and its name.
+    """
+    routing = await workflow.step(
+        function=choose_provider,
+        task_queue=task_queue_for(choose_provider),
+        function_input=ChooseProviderInput(
+            profile_url=workflow_input.profile_url,
+            kind=kind,
+            max_age=workflow_input.max_age,
+            force_refresh=workflow_input.force_refresh,
+        ),
+        start_to_close_timeout=timedelta(seconds=30),
+    )
+    if routing["cached"] is not None:
+        return routing["cached"]
+
+    order: list[str] = [provider for provider in routing["order"] if provider in provider_workflows]
+    hedge_after = routing["hedge_after_seconds"] if workflow_input.hedge else None
+    parent_id = workflow_info().workflow_id
+
+    running: dict[str, asyncio.Task] = {}
+    started_at: dict[str, float] = {}
+    errors: dict[str, str] = {}
+
+    def start_next() -> str | None:
+        remaining = [provider for provider in order if provider not in started_at]
+        if not remaining:
+            return None
+        provider = remaining[0]
+        provider_workflow, input_model = provider_workflows[provider]
+        started_at[provider] = temporal_workflow.time()
+        running[provider] = asyncio.create_task(
+            workflow.child_execute(
+                workflow=provider_workflow,
+                workflow_id=f"{parent_id}-{provider}",
+                workflow_input=input_model(
+                    profile_url=workflow_input.profile_url,
+                    max_age=workflow_input.max_age,
+                    force_refresh=workflow_input.force_refresh,
+                ),
+            )
+        )
+        log.info(f"Started {kind} scrape on {provider}")
+        return provider
+
+    async def record(provider: str, success: bool, censored: bool = False, ended_at: float | None = None) -> None:
+        ended_at = temporal_workflow.time() if ended_at is None else ended_at
+        await workflow.step(
+            function=record_provider_outcome,
+            task_queue=task_queue_for(record_provider_outcome),
+            function_input=ProviderOutcomeInput(
+                provider=provider,
+                kind=kind,
+                seconds=ended_at - started_at[provider],
+                success=success,
+                censored=censored,
+            ),
+            start_to_close_timeout=timedelta(seconds=30),
+        )
+
+    start_next()
+    hedged = False
+    while running:
+        can_hedge = not hedged and hedge_after is not None and len(started_at) < len(order)
+        timeout = None
+        if can_hedge:
+            primary = next(iter(started_at))
+            timeout = max(0.0, started_at[primary] + hedge_after - temporal_workflow.time())
+
+        done, _ = await temporal_workflow.wait(list(running.values()), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            hedged = True
+            provider = start_next()
+            log.info(f"No result after {hedge_after:.0f}s, hedging {kind} scrape on {provider}")
+            continue
+
+        for provider, task in list(running.items()):
+            if task not in done:
+                continue
+            del running[provider]
+            try:
+                result = task.result()
+            except Exception as e:
+                errors[provider] = str(e)
+                log.warning(f"{kind} scrape on {provider} failed", error=str(e))
+                await record(provider, success=False)
+                continue
+
+            await record(provider, success=True)
+            cancelled_at = temporal_workflow.time()
+            for loser, loser_task in running.items():
+                log.info(f"Cancelling {kind} scrape on {loser}, {provider} won")
+                loser_task.cancel()
+            if running:
+                # Each loser stops its provider job and frees its agent as it is
+                # cancelled. Returning first would terminate it mid-cleanup.
+                await temporal_workflow.wait(list(running.values()))
+            for loser in running:
+                # It ran this long without a result: a lower bound on its latency.
+                await record(loser, success=False, censored=True, ended_at=cancelled_at)
+            return {"provider": provider, "result": result}
+
+        if not running:
+            start_next()
+
+    raise NonRetryableError(f"Every provider failed to scrape {kind}: {errors}")
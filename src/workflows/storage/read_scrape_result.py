@@ -0,0 +1,41 @@
+from datetime import timedelta
+from typing import Any
+
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+)
+
+with import_functions():
+    from src.functions.storage.read_scrape_result import (
+        ReadScrapeResultInput,
+        read_scrape_result,
+    )
+    from src.task_queues import task_queue_for
+
+
+@workflow.defn(description="Read a page of a large scrape result stored as a claim check")
+class ReadScrapeResultWorkflow:
+    @workflow.run
+    async def run(self, workflow_input: ReadScrapeResultInput) -> dict[str, Any]:
+        log.info("ReadScrapeResultWorkflow started")
+        try:
+            result = await workflow.step(
+                function=read_scrape_result,
+                task_queue=task_queue_for(read_scrape_result),
+                function_input=ReadScrapeResultInput(
+                    digest=workflow_input.digest,
+                    offset=workflow_input.offset,
+                    limit=workflow_input.limit,
+                ),
+                start_to_close_timeout=timedelta(seconds=60),
+            )
+        except Exception as e:
+            error_message = f"Error during read_scrape_result: {e}"
+            raise NonRetryableError(error_message) from e
+        else:
+            log.info("read_scrape_result done", total=result["total"], next_offset=result["next_offset"])
+
+            return result
@@ -0,0 +1,82 @@
+import asyncio
+import contextlib
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.benchmarks.fakes import FakeProviderConfig, FakeProviders, start_fake_providers
+from src.benchmarks.run import configure_environment
+
+# The provider modules read their API URLs when first imported, so the fakes'
+# address and the data dir are fixed here, before any test imports them. Each
+# test starts its own fakes on that address.
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+FAKE_PORT = free_port()
+configure_environment(f"http://127.0.0.1:{FAKE_PORT}", agents=4, unthrottled=True, data_dir=tempfile.mkdtemp(prefix="linkedin-mcp-test-"))
+
+
+@contextlib.asynccontextmanager
+async def running_fakes(config: FakeProviderConfig | None = None) -> AsyncIterator[FakeProviders]:
+    """Serves the fake providers for the duration of the block, then closes the pooled clients."""
+    from src.utils.http import close_http_clients
+
+    fakes, runner, _ = await start_fake_providers(config or FakeProviderConfig(job_seconds=0.1), port=FAKE_PORT)
+    try:
+        yield fakes
+    finally:
+        await close_http_clients()
+        await runner.cleanup()
+
+
+@pytest.fixture
+def fake_providers() -> Callable[..., contextlib.AbstractAsyncContextManager[FakeProviders]]:
+    return running_fakes
+
+
+@pytest.fixture
+def run_workflow(monkeypatch: pytest.MonkeyPatch) -> Callable[[type, Any], Awaitable[Any]]:
+    """Runs a workflow's `run` in this process.
+
+    Each step calls its function directly, once. Timers return straight away,
+    so status steps run back to back until the job is done.
+    """
+    from restack_ai.workflow import workflow
+
+    import src.workflows.job_polling
+
+    async def step(function: Any, function_input: Any = None, **_: Any) -> Any:
+        return await (function(function_input) if function_input is not None else function())
+
+    async def wait_condition(condition: Callable[[], bool], timeout: float | None = None) -> None:
+        await asyncio.sleep(0.01)
+        if not condition():
+            raise asyncio.TimeoutError
+
+    clock = SimpleNamespace(
+        time=time.monotonic,
+        random=lambda: random.Random(0),
+        wait_condition=wait_condition,
+        as_completed=asyncio.as_completed,
+    )
+    monkeypatch.setattr(workflow, "step", step)
+    monkeypatch.setattr(src.workflows.job_polling, "temporal_workflow", clock)
+
+    async def run(workflow_class: type, workflow_input: Any) -> Any:
+        monkeypatch.setattr(sys.modules[workflow_class.__module__], "temporal_workflow", clock, raising=False)
+        return await workflow_class().run(workflow_input)
+
+    return run
@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import pytest
+from restack_ai.function import RetryableError
+
+from src.benchmarks.fakes import FakeProviderConfig
+from src.functions.phantombuster.agent_pool import Agent, AgentLeases, AgentPool, AgentPoolTimeoutError
+
+AGENTS = [Agent("agent-1", None), Agent("agent-2", None)]
+
+
+def test_leases_are_shared_between_processes(tmp_path) -> None:
+    leases = AgentLeases(str(tmp_path / "leases.sqlite3"))
+    # Two pools on one lease table, as two worker processes would have.
+    first, second = AgentPool("profile", AGENTS, leases=leases), AgentPool("profile", AGENTS, leases=leases)
+
+    async def run():
+        a = await first.try_acquire()
+        b = await second.try_acquire()
+        assert {a.agent_id, b.agent_id} == {"agent-1", "agent-2"}
+        assert await first.try_acquire() is None
+        assert await second.try_acquire() is None
+
+        await first.assign(a.agent_id, "container-a")
+        # Released by the container's ID, from a process that never leased it.
+        assert AgentLeases(leases.path).release_container("container-a")[0] == "profile"
+        assert (await second.try_acquire()).agent_id == a.agent_id
+
+    asyncio.run(run())
+
+
+def test_concurrent_launches_lease_each_agent_once(tmp_path) -> None:
+    agents = [Agent(f"agent-{i}", None) for i in range(5)]
+    pool = AgentPool("profile", agents, leases=AgentLeases(str(tmp_path / "leases.sqlite3")))
+
+    async def run():
+        return await asyncio.gather(*(pool.try_acquire() for _ in range(20)))
+
+    leased = [agent.agent_id for agent in asyncio.run(run()) if agent is not None]
+    assert sorted(leased) == sorted(agent.agent_id for agent in agents)
+    assert pool.stats.busy_rejections == 15
+
+
+def test_waiting_for_an_agent_times_out(tmp_path) -> None:
+    pool = AgentPool("profile", AGENTS[:1], leases=AgentLeases(str(tmp_path / "leases.sqlite3")))
+
+    async def run():
+        async with pool.lease():
+            with pytest.raises(AgentPoolTimeoutError):
+                await pool.acquire(timeout=0.2)
+        # Released on leaving the block.
+        async with pool.lease(timeout=0.2):
+            pass
+
+    asyncio.run(run())
+    assert pool.stats.timeouts == 1
+
+
+def test_stale_leases_expire(tmp_path) -> None:
+    pool = AgentPool("profile", AGENTS[:1], lease_ttl=0.1, leases=AgentLeases(str(tmp_path / "leases.sqlite3")))
+
+    async def run():
+        assert await pool.try_acquire() is not None
+        assert await pool.try_acquire() is None
+        time.sleep(0.15)
+        assert await pool.try_acquire() is not None
+
+    asyncio.run(run())
+    assert pool.stats.expired == 1
+
+
+def test_launch_fails_fast_when_every_agent_is_busy() -> None:
+    from src.functions.phantombuster.agent_pool import get_agent_pool, load_agents, release_container
+    from src.functions.phantombuster.launch_scrape import LaunchScrapeInput, launch_scrape_phantombuster
+
+    # Another process holds every reactions agent.
+    other_process = AgentPool("reactions", load_agents("reactions"))
+
+    async def run():
+        agents = [await other_process.try_acquire() for _ in other_process.agents]
+        for i, agent in enumerate(agents):
+            await other_process.assign(agent.agent_id, f"busy-{i}")
+        started = time.monotonic()
+        try:
+            with pytest.raises(RetryableError, match="busy"):
+                await launch_scrape_phantombuster(
+                    LaunchScrapeInput(profile_url="https://www.linkedin.com/in/busy-agents/", kind="reactions", force_refresh=True)
+                )
+        finally:
+            for i in range(len(agents)):
+                await release_container(f"busy-{i}")
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 1
+    assert get_agent_pool("reactions").stats.busy_rejections == 1
+
+
+def test_batch_workflow_releases_its_agent(fake_providers, run_workflow, monkeypatch) -> None:
+    from src.functions.phantombuster.agent_pool import get_agent_pool
+    from src.functions.phantombuster.get_linkedin_profiles_batch import GetProfilesBatchInput
+    from src.workflows.phantombuster.get_linkedin_profiles_batch import GetLinkedinProfilesBatchWorkflowPhantombuster
+
+    monkeypatch.setenv("PHANTOMBUSTER_INPUT_BASE_URL", "https://inputs.example.com")
+    urls = [f"https://www.linkedin.com/in/pb-batch-{i}/" for i in range(2)] + ["not a profile"]
+
+    async def run():
+        async with fake_providers(FakeProviderConfig(job_seconds=0.05)):
+            return await run_workflow(
+                GetLinkedinProfilesBatchWorkflowPhantombuster, GetProfilesBatchInput(profile_urls=urls, data_kind="posts")
+            )
+
+    result = asyncio.run(run())
+    # The fake's records name no input profile, so every profile is reported as missing.
+    assert sorted(result["errors"]) == sorted(urls)
+    assert get_agent_pool("posts").snapshot()["busy"] == 0
+
+
+def test_single_call_function_fails_fast_when_every_agent_is_busy() -> None:
+    from src.functions.phantombuster.agent_pool import load_agents, release_container
+    from src.functions.phantombuster.get_linkedin_profile import GetProfileInput, get_linkedin_profile_phantombuster
+
+    other_process = AgentPool("profile", load_agents("profile"))
+
+    async def run():
+        agents = [await other_process.try_acquire() for _ in other_process.agents]
+        for i, agent in enumerate(agents):
+            await other_process.assign(agent.agent_id, f"busy-profile-{i}")
+        started = time.monotonic()
+        try:
+            with pytest.raises(RetryableError, match="busy"):
+                await get_linkedin_profile_phantombuster(
+                    GetProfileInput(profile_url="https://www.linkedin.com/in/busy-single-call/", force_refresh=True)
+                )
+        finally:
+            for i in range(len(agents)):
+                await release_container(f"busy-profile-{i}")
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 1
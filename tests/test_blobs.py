@@ -0,0 +1,35 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils import blobs
+
+
+def test_concurrent_writers_of_one_blob_agree() -> None:
+    content = json.dumps([{"id": i} for i in range(10_000)]).encode()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        digests = set(pool.map(lambda _: blobs.put_blob(content), range(64)))
+
+    (digest,) = digests
+    assert blobs.read_blob(digest) == content
+    assert not list(blobs.blob_path(digest).parent.glob("*.tmp"))
+
+
+def test_pages_decode_the_blob_once(monkeypatch) -> None:
+    from src.functions.storage.read_scrape_result import ReadScrapeResultInput, read_scrape_result
+
+    digest = blobs.put_blob(json.dumps([{"id": i} for i in range(250)]).encode())
+    decoded = []
+    get_blob = blobs.get_blob
+    monkeypatch.setattr(blobs, "get_blob", lambda d: decoded.append(d) or get_blob(d))
+
+    async def read_all():
+        items, offset = [], 0
+        while offset is not None:
+            page = await read_scrape_result(ReadScrapeResultInput(digest=digest, offset=offset, limit=100))
+            items.extend(page["items"])
+            offset = page["next_offset"]
+        return items
+
+    assert asyncio.run(read_all()) == [{"id": i} for i in range(250)]
+    assert decoded == [digest]
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from src.benchmarks.fakes import FakeProviderConfig
+
+# Several Bright Data profile scrapes run at once against a fake provider that
+# answers slowly. The loop must stay responsive the whole time: a probe that
+# sleeps in short steps measures how late each wake-up is.
+
+SCRAPES = 8
+RESPONSE_DELAY_SECONDS = 0.5
+PROBE_INTERVAL_SECONDS = 0.01
+# Worst acceptable lag. A synchronous call waiting on one slow response would exceed it fivefold.
+MAX_LAG_SECONDS = 0.1
+
+
+async def probe_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.monotonic()
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        lags.append(max(0.0, time.monotonic() - started - PROBE_INTERVAL_SECONDS))
+
+
+def test_event_loop_stays_responsive_during_concurrent_scrapes(fake_providers) -> None:
+    from src.functions.brightdata.get_linkedin_profile import GetProfileInput, get_linkedin_profile_brightdata
+    from src.utils.http import prepare_http_clients
+
+    async def scrape_while_probing() -> tuple[list, list[float], float]:
+        # As the service does before it starts taking work.
+        await prepare_http_clients()
+        async with fake_providers(FakeProviderConfig(job_seconds=0.5, response_delay=RESPONSE_DELAY_SECONDS)) as fakes:
+            lags: list[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(probe_lag(lags, stop))
+            try:
+                started = time.monotonic()
+                results = await asyncio.gather(
+                    *(
+                        get_linkedin_profile_brightdata(GetProfileInput(profile_url=f"https://www.linkedin.com/in/lag-{i}/", force_refresh=True))
+                        for i in range(SCRAPES)
+                    )
+                )
+                elapsed = time.monotonic() - started
+            finally:
+                stop.set()
+                await probe
+            assert fakes.stats.jobs_launched == SCRAPES
+        return results, lags, elapsed
+
+    results, lags, elapsed = asyncio.run(scrape_while_probing())
+
+    assert all(results)
+    # Each scrape waits on at least three slow responses (trigger, progress, download);
+    # run one after another they would take SCRAPES times as long.
+    assert elapsed < SCRAPES * 3 * RESPONSE_DELAY_SECONDS
+    assert lags, "the lag probe never ran"
+    assert max(lags) < MAX_LAG_SECONDS, f"event loop lagged {max(lags) * 1000:.0f} ms"
@@ -0,0 +1,106 @@
+import asyncio
+import functools
+
+import pytest
+from restack_ai.function import RetryableError
+
+from src.benchmarks.fakes import FakeProviderConfig
+from src.utils.blobs import is_claim_check, resolve
+
+
+def test_batch_reports_per_profile_errors_alongside_results(fake_providers, run_workflow) -> None:
+    from src.functions.brightdata.get_linkedin_profiles_batch import GetProfilesBatchInput
+    from src.workflows.brightdata.get_linkedin_profiles_batch import GetLinkedinProfilesBatchWorkflowBrightdata
+
+    urls = [f"https://www.linkedin.com/in/batch-ok-{i}/" for i in range(3)] + ["https://www.linkedin.com/in/batch-missing/"]
+
+    async def run():
+        async with fake_providers():
+            return await run_workflow(GetLinkedinProfilesBatchWorkflowBrightdata, GetProfilesBatchInput(profile_urls=urls, chunk_size=2))
+
+    result = asyncio.run(run())
+    assert sorted(result["results"]) == sorted(urls[:3])
+    assert result["errors"] == {"https://www.linkedin.com/in/batch-missing/": "Profile not found"}
+
+
+def test_failed_chunk_only_fails_its_own_profiles(fake_providers, run_workflow, monkeypatch) -> None:
+    from src.functions.brightdata import get_linkedin_profiles_batch
+    from src.workflows.brightdata.get_linkedin_profiles_batch import GetLinkedinProfilesBatchWorkflowBrightdata
+
+    urls = [f"https://www.linkedin.com/in/batch-chunk-{i}/" for i in range(4)]
+    launch = get_linkedin_profiles_batch.launch_profiles_batch_brightdata
+
+    # Wrapped, so the workflow still picks the real function's task queue.
+    @functools.wraps(launch)
+    async def launch_failing_second_chunk(function_input):
+        if urls[2] in function_input.profile_urls:
+            raise RetryableError("launch_profiles_batch_brightdata failed: 429")
+        return await launch(function_input)
+
+    monkeypatch.setattr(
+        "src.workflows.brightdata.get_linkedin_profiles_batch.launch_profiles_batch_brightdata", launch_failing_second_chunk
+    )
+
+    async def run():
+        async with fake_providers():
+            return await run_workflow(
+                GetLinkedinProfilesBatchWorkflowBrightdata,
+                get_linkedin_profiles_batch.GetProfilesBatchInput(profile_urls=urls, chunk_size=2),
+            )
+
+    result = asyncio.run(run())
+    assert sorted(result["results"]) == urls[:2]
+    assert sorted(result["errors"]) == urls[2:]
+
+
+def test_launch_retries_rate_limits(fake_providers) -> None:
+    from src.functions.brightdata.get_linkedin_profiles_batch import LaunchProfilesBatchInput, launch_profiles_batch_brightdata
+
+    urls = [f"https://www.linkedin.com/in/batch-limited-{i}/" for i in range(2)]
+
+    async def run():
+        async with fake_providers(FakeProviderConfig(job_seconds=0.1, rate_limit_rate=1.0, retry_after=0)):
+            return await launch_profiles_batch_brightdata(LaunchProfilesBatchInput(profile_urls=urls))
+
+    with pytest.raises(RetryableError):
+        asyncio.run(run())
+
+
+def test_fetch_retries_transient_errors(fake_providers) -> None:
+    from src.functions.brightdata.get_linkedin_profiles_batch import (
+        FetchProfilesBatchInput,
+        LaunchProfilesBatchInput,
+        fetch_profiles_batch_brightdata,
+        launch_profiles_batch_brightdata,
+    )
+
+    urls = [f"https://www.linkedin.com/in/batch-transient-{i}/" for i in range(2)]
+
+    async def run():
+        async with fake_providers(FakeProviderConfig(job_seconds=0)) as fakes:
+            launched = await launch_profiles_batch_brightdata(LaunchProfilesBatchInput(profile_urls=urls))
+            fakes.config.error_rate = 1.0
+            return await fetch_profiles_batch_brightdata(
+                FetchProfilesBatchInput(snapshot_id=launched["snapshot_id"], profile_urls=launched["profile_urls"])
+            )
+
+    # Not per-profile errors: Temporal should retry the step.
+    with pytest.raises(RetryableError):
+        asyncio.run(run())
+
+
+def test_workflow_reports_a_claim_checked_batch(fake_providers, run_workflow, monkeypatch) -> None:
+    from src.functions.brightdata.get_linkedin_profiles_batch import GetProfilesBatchInput
+    from src.workflows.brightdata.get_linkedin_profiles_batch import GetLinkedinProfilesBatchWorkflowBrightdata
+
+    monkeypatch.setenv("CLAIM_CHECK_THRESHOLD_BYTES", "1024")
+    urls = [f"https://www.linkedin.com/in/batch-large-{i}/" for i in range(3)] + ["https://www.linkedin.com/in/batch-large-missing/"]
+
+    async def run():
+        async with fake_providers():
+            return await run_workflow(GetLinkedinProfilesBatchWorkflowBrightdata, GetProfilesBatchInput(profile_urls=urls, chunk_size=2))
+
+    result = asyncio.run(run())
+    assert is_claim_check(result)
+    assert result["summary"]["items"] == 3 and result["summary"]["errors"] == 1
+    assert sorted(resolve(result)["results"]) == sorted(urls[:3])
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from src.utils.cache import ScrapeCache
+
+POST_URL = "https://www.linkedin.com/posts/someone_launch-activity-7100-AbCd/"
+
+
+@pytest.fixture
+def cache(tmp_path) -> ScrapeCache:
+    return ScrapeCache(str(tmp_path / "cache.sqlite3"))
+
+
+def test_profile_url_variants_share_an_entry(cache: ScrapeCache) -> None:
+    cache.set("brightdata", "profile", "https://de.linkedin.com/in/WilliamHGates/?trk=x", {"name": "Bill"})
+
+    assert cache.get("brightdata", "profile", "linkedin.com/in/williamhgates/recent-activity/all/") == {"name": "Bill"}
+    assert cache.get("phantombuster", "profile", "https://www.linkedin.com/in/williamhgates/") is None
+    assert cache.get("brightdata", "posts", "https://www.linkedin.com/in/williamhgates/") is None
+
+
+def test_post_urls_keep_their_case(cache: ScrapeCache) -> None:
+    cache.set("brightdata", "reactions", f"{POST_URL}?utm_source=share", [{"type": "like"}])
+
+    assert cache.get("brightdata", "reactions", POST_URL.replace("www.", "de.")) == [{"type": "like"}]
+    assert cache.get("brightdata", "reactions", POST_URL.lower()) is None
+
+
+def test_entries_expire_after_their_kind_ttl(cache: ScrapeCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    url = "https://www.linkedin.com/in/ttl-test/"
+    monkeypatch.setenv("CACHE_TTL_POSTS_SECONDS", "60")
+    cache.set("brightdata", "posts", url, [{"id": 1}])
+    cache.set("brightdata", "profile", url, {"id": 1})
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("brightdata", "posts", url) is None
+    assert cache.get("brightdata", "profile", url) == {"id": 1}
+    assert cache.get("brightdata", "profile", url, max_age=60) is None
+    # Only the entry past its TTL is dropped, not the one a caller wanted fresher.
+    assert cache.stats.evictions == 1
+    assert cache.db.execute("SELECT COUNT(*) FROM scrape_cache").fetchone()[0] == 1
+
+
+def test_disk_entries_outlive_the_memory_lru(cache: ScrapeCache) -> None:
+    cache.max_entries = 1
+    cache.set("brightdata", "profile", "https://www.linkedin.com/in/first/", {"id": 1})
+    cache.set("brightdata", "profile", "https://www.linkedin.com/in/second/", {"id": 2})
+
+    assert cache.get("brightdata", "profile", "https://www.linkedin.com/in/first/") == {"id": 1}
+    assert cache.stats.disk_hits == 1
@@ -0,0 +1,53 @@
+import asyncio
+
+from src.benchmarks.fakes import FakeProviderConfig
+
+# Jobs run far longer than the tests, so only a cancel ends them.
+LONG_JOBS = FakeProviderConfig(job_seconds=600)
+
+
+def test_cancelled_container_is_stopped_and_its_agent_released(fake_providers) -> None:
+    from src.functions.phantombuster.agent_pool import agent_leases
+    from src.functions.phantombuster.cancel_scrape import CancelScrapeInput, cancel_scrape_phantombuster
+    from src.functions.phantombuster.launch_scrape import LaunchScrapeInput, launch_scrape_phantombuster
+
+    profile_url = "https://www.linkedin.com/in/cancelled-container/"
+
+    async def run():
+        async with fake_providers(LONG_JOBS) as fakes:
+            launched = await launch_scrape_phantombuster(LaunchScrapeInput(profile_url=profile_url, kind="profile", force_refresh=True))
+            container_id = launched["container_id"]
+            assert agent_leases.agent_for(container_id) is not None
+
+            cancelled = await cancel_scrape_phantombuster(
+                CancelScrapeInput(container_id=container_id, profile_url=profile_url, kind="profile")
+            )
+            return fakes, container_id, cancelled
+
+    fakes, container_id, cancelled = asyncio.run(run())
+    assert cancelled == {"cancelled": True}
+    assert fakes.stats.jobs_cancelled == 1
+    assert agent_leases.agent_for(container_id) is None
+
+
+def test_joined_snapshot_runs_until_every_launch_cancels(fake_providers) -> None:
+    from src.functions.brightdata.cancel_scrape import CancelScrapeInput, cancel_scrape_brightdata
+    from src.functions.brightdata.launch_scrape import LaunchScrapeInput, launch_scrape_brightdata
+
+    profile_url = "https://www.linkedin.com/in/joined-snapshot/"
+
+    async def run():
+        async with fake_providers(LONG_JOBS) as fakes:
+            launch_input = LaunchScrapeInput(profile_url=profile_url, kind="profile", force_refresh=True)
+            first = await launch_scrape_brightdata(launch_input)
+            second = await launch_scrape_brightdata(launch_input)
+            assert second["snapshot_id"] == first["snapshot_id"]
+
+            cancel_input = CancelScrapeInput(snapshot_id=first["snapshot_id"], profile_url=profile_url, kind="profile")
+            # The second launch still wants the snapshot.
+            assert await cancel_scrape_brightdata(cancel_input) == {"cancelled": False}
+            assert fakes.stats.jobs_cancelled == 0
+            assert await cancel_scrape_brightdata(cancel_input) == {"cancelled": True}
+            return fakes
+
+    assert asyncio.run(run()).stats.jobs_cancelled == 1
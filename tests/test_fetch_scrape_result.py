@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from restack_ai.function import NonRetryableError, RetryableError
+
+from src.benchmarks.fakes import FakeProviderConfig
+
+PROFILE_URL = "https://www.linkedin.com/in/fetch-test/"
+
+
+def fetch_brightdata(fake_providers, config: FakeProviderConfig, snapshot_id: str | None = None):
+    """Fetches a finished snapshot, or `snapshot_id`, from fakes configured with `config`."""
+    from src.functions.brightdata.fetch_scrape_result import FetchScrapeResultInput, fetch_scrape_result_brightdata
+
+    async def run():
+        async with fake_providers(config) as fakes:
+            # `since` marks the result as partial, so the test leaves the cache alone.
+            function_input = FetchScrapeResultInput(snapshot_id=snapshot_id or fakes.launch(), profile_url=PROFILE_URL, kind="profile", since="2026-01-01")
+            return await fetch_scrape_result_brightdata(function_input)
+
+    return asyncio.run(run())
+
+
+def test_fetch_returns_the_snapshot(fake_providers) -> None:
+    assert fetch_brightdata(fake_providers, FakeProviderConfig(job_seconds=0))
+
+
+@pytest.mark.parametrize("config", [
+    FakeProviderConfig(job_seconds=0, error_rate=1.0),
+    FakeProviderConfig(job_seconds=0, rate_limit_rate=1.0, retry_after=0),
+])
+def test_transient_download_errors_are_retryable(fake_providers, config: FakeProviderConfig) -> None:
+    with pytest.raises(RetryableError):
+        fetch_brightdata(fake_providers, config)
+
+
+def test_unknown_snapshot_is_not_retried(fake_providers) -> None:
+    with pytest.raises(NonRetryableError):
+        fetch_brightdata(fake_providers, FakeProviderConfig(job_seconds=0), snapshot_id="no-such-snapshot")
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+
+def test_histogram_and_counter_render_in_prometheus_text_format() -> None:
+    from src.utils.metrics import Counter, Histogram
+
+    counter = Counter("test_calls_total", "Calls.", ("provider", "note"))
+    counter.inc(provider="brightdata", note='say "hi"\n')
+    counter.inc(2, provider="brightdata", note='say "hi"\n')
+    histogram = Histogram("test_seconds", "Durations.", ("provider",), buckets=(1, 5))
+    for seconds in (0.5, 3, 10):
+        histogram.observe(seconds, provider="phantombuster")
+
+    assert counter.render() == [
+        "# HELP linkedin_mcp_test_calls_total Calls.",
+        "# TYPE linkedin_mcp_test_calls_total counter",
+        'linkedin_mcp_test_calls_total{provider="brightdata",note="say \\"hi\\"\\n"} 3',
+    ]
+    assert histogram.render_samples() == [
+        'linkedin_mcp_test_seconds_bucket{provider="phantombuster",le="1"} 1',
+        'linkedin_mcp_test_seconds_bucket{provider="phantombuster",le="5"} 2',
+        'linkedin_mcp_test_seconds_bucket{provider="phantombuster",le="+Inf"} 3',
+        'linkedin_mcp_test_seconds_sum{provider="phantombuster"} 13.5',
+        'linkedin_mcp_test_seconds_count{provider="phantombuster"} 3',
+    ]
+
+
+def test_job_and_cache_metrics_are_labelled_by_function(monkeypatch) -> None:
+    from src.utils import metrics
+    from src.utils.cache import scrape_cache
+
+    monkeypatch.setattr(metrics.activity, "in_activity", lambda: True)
+    monkeypatch.setattr(metrics.activity, "info", lambda: SimpleNamespace(activity_type="fetch_scrape_result_brightdata"))
+
+    metrics.record_job_completion("brightdata:posts", 42, 3)
+    scrape_cache.get("brightdata", "posts", "https://www.linkedin.com/in/metrics-labels/")
+
+    key = ("brightdata", "posts", "fetch_scrape_result_brightdata")
+    assert metrics.job_duration.counts[key][-1] >= 1
+    assert metrics.job_status_checks.counts[key][-1] >= 1
+    assert metrics.cache_lookups.values[(*key, "miss")] >= 1
+
+
+def test_metrics_endpoint_serves_component_stats() -> None:
+    from src.utils.web import create_app
+
+    async def scrape():
+        async with TestClient(TestServer(create_app())) as http:
+            response = await http.get("/metrics")
+            return response.status, response.headers["Content-Type"], await response.text()
+
+    status, content_type, body = asyncio.run(scrape())
+    assert status == 200 and content_type.startswith("text/plain; version=0.0.4")
+    assert "# TYPE linkedin_mcp_component_stat gauge" in body
+    assert 'linkedin_mcp_in_flight_jobs{tracker="scrape_jobs"}' in body
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+from restack_ai.function import NonRetryableError, RetryableError
+
+from src.benchmarks.fakes import FakeProviderConfig
+
+
+def test_racing_attempts_publish_a_post_once(fake_providers) -> None:
+    from src.functions.linkedin.post_queue import PUBLISHED, SENDING
+    from src.functions.linkedin.publish_post import (
+        PublishPostInput,
+        QueuePostInput,
+        enqueue_linkedin_post,
+        publish_linkedin_post,
+    )
+
+    async def run():
+        # Slow responses keep the first attempt in flight while the others arrive.
+        async with fake_providers(FakeProviderConfig(response_delay=0.2)) as fakes:
+            post = await enqueue_linkedin_post(QueuePostInput(text="Claimed once", idempotency_key="race"))
+            attempts = await asyncio.gather(*(publish_linkedin_post(PublishPostInput(key=post["key"])) for _ in range(5)))
+            return fakes, attempts
+
+    fakes, attempts = asyncio.run(run())
+    assert len(fakes.posts) == 1
+    # Losers see the post still sending, or already published if the winner got there first.
+    assert {attempt["status"] for attempt in attempts} <= {PUBLISHED, SENDING}
+    published = [attempt for attempt in attempts if attempt["status"] == PUBLISHED]
+    assert published and all(attempt["post_id"] == fakes.posts[0]["id"] and attempt["attempts"] == 1 for attempt in published)
+
+
+def test_queued_post_keeps_its_media(fake_providers) -> None:
+    from src.functions.linkedin.media import MediaInput
+    from src.functions.linkedin.publish_post import PublishPostInput, QueuePostInput, enqueue_linkedin_post, publish_linkedin_post
+
+    async def run():
+        async with fake_providers() as fakes:
+            post = await enqueue_linkedin_post(
+                QueuePostInput(
+                    text="With a picture",
+                    idempotency_key="media",
+                    media=[MediaInput(path="/tmp/picture.png", media_type="image", title="Picture")],
+                    assets=["urn:li:digitalmediaAsset:picture"],
+                )
+            )
+            await publish_linkedin_post(PublishPostInput(key=post["key"]))
+            return fakes
+
+    content = asyncio.run(run()).posts[0]["specificContent"]["com.linkedin.ugc.ShareContent"]
+    assert content["shareMediaCategory"] == "IMAGE"
+    assert content["media"] == [{"status": "READY", "media": "urn:li:digitalmediaAsset:picture", "title": {"text": "Picture"}}]
+
+
+def test_posts_without_a_key_are_not_deduplicated_across_calls() -> None:
+    from src.functions.linkedin.publish_post import QueuePostInput, enqueue_linkedin_post
+
+    async def run():
+        return [await enqueue_linkedin_post(QueuePostInput(text="Weekly update")) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first["key"] != second["key"]
+
+
+def test_failed_lookup_does_not_leave_the_post_sending(fake_providers, monkeypatch) -> None:
+    from src.functions.linkedin import publish_post
+    from src.functions.linkedin.post_queue import FAILED, SENDING, post_queue
+
+    async def forbidden(*_):
+        request = httpx.Request("GET", "https://api.linkedin.com/v2/ugcPosts")
+        raise httpx.HTTPStatusError("403 Forbidden", request=request, response=httpx.Response(403, request=request))
+
+    monkeypatch.setattr(publish_post, "find_published", forbidden)
+
+    async def run():
+        async with fake_providers():
+            post = await publish_post.enqueue_linkedin_post(publish_post.QueuePostInput(text="Unknown outcome", idempotency_key="lookup"))
+            # An earlier attempt timed out after sending.
+            post_queue.update(post["key"], SENDING, attempt=True)
+            with pytest.raises(NonRetryableError):
+                await publish_post.publish_linkedin_post(publish_post.PublishPostInput(key=post["key"]))
+            return post_queue.get(post["key"])
+
+    post = asyncio.run(run())
+    assert post.status == FAILED and "403" in post.error
+
+
+def test_claim_is_handed_back_when_nothing_was_sent(fake_providers, monkeypatch) -> None:
+    from src.functions.linkedin import publish_post
+    from src.functions.linkedin.post_queue import QUEUED, post_queue
+
+    def broken_bucket(*_):
+        raise OSError("database is locked")
+
+    monkeypatch.setattr(publish_post.rate_limiter, "try_take", broken_bucket)
+
+    async def run():
+        async with fake_providers() as fakes:
+            post = await publish_post.enqueue_linkedin_post(publish_post.QueuePostInput(text="Not sent", idempotency_key="handback"))
+            with pytest.raises(RetryableError):
+                await publish_post.publish_linkedin_post(publish_post.PublishPostInput(key=post["key"]))
+            return fakes, post_queue.get(post["key"])
+
+    fakes, post = asyncio.run(run())
+    assert post.status == QUEUED and not fakes.posts
@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+
+from src.utils.rate_limit import RateLimitedTransport, RateLimiter
+
+
+def send(content) -> tuple[int, int]:
+    """Sends a PUT whose first attempt gets a 429, and returns the final status and how many attempts were made."""
+    attempts = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        await request.aread()
+        if attempts == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200)
+
+    async def run() -> int:
+        transport = RateLimitedTransport("rate-limit-test", httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.put("https://api.example.com/upload", content=content)
+            return response.status_code
+
+    return asyncio.run(run()), attempts
+
+
+def test_in_memory_body_is_retried_after_429() -> None:
+    assert send(b"payload") == (200, 2)
+
+
+def test_streamed_body_is_returned_to_the_caller_after_429() -> None:
+    async def chunks():
+        yield b"part one"
+        yield b"part two"
+
+    # Sending the consumed stream again would raise StreamConsumed.
+    assert send(chunks()) == (429, 1)
+
+
+def test_concurrent_takes_share_one_connection_safely(tmp_path) -> None:
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"))
+
+    async def run() -> list[float]:
+        return await asyncio.gather(*(asyncio.to_thread(limiter.try_take, "bucket", 1.0, 50) for _ in range(50)))
+
+    # Every take runs in its own thread on the limiter's one connection.
+    assert asyncio.run(run()) == [0.0] * 50
+    assert limiter.try_take("bucket", 1.0, 50) > 0
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.benchmarks.fakes import FakeProviderConfig
+from src.utils.blobs import claim_check, is_claim_check, resolve
+
+POST_URL = "https://de.linkedin.com/posts/reactions-test_activity-7100-AbCd?utm_source=share"
+
+
+def test_post_reactions_run_through_launch_and_fetch(fake_providers) -> None:
+    from src.functions.brightdata.fetch_scrape_result import FetchScrapeResultInput, fetch_scrape_result_brightdata
+    from src.functions.brightdata.launch_scrape import LaunchScrapeInput, launch_scrape_brightdata
+
+    async def run():
+        async with fake_providers(FakeProviderConfig(job_seconds=0)):
+            launched = await launch_scrape_brightdata(LaunchScrapeInput(profile_url=POST_URL, kind="reactions", force_refresh=True))
+            reactions = await fetch_scrape_result_brightdata(
+                FetchScrapeResultInput(snapshot_id=launched["snapshot_id"], profile_url=POST_URL, kind="reactions")
+            )
+            cached = await launch_scrape_brightdata(LaunchScrapeInput(profile_url=POST_URL, kind="reactions"))
+            return reactions, cached
+
+    reactions, cached = asyncio.run(run())
+    assert is_claim_check(reactions) and resolve(reactions)
+    assert cached["result"] == reactions
+
+
+def test_profile_reactions_are_stored_as_one_claim_check() -> None:
+    from src.functions.brightdata.get_linkedin_profile_reactions import StoreReactionsInput, store_profile_reactions_brightdata
+
+    records = [{"name": f"reactor-{i}", "type": "like"} for i in range(2000)]
+    stored = asyncio.run(
+        store_profile_reactions_brightdata(
+            StoreReactionsInput(profile_url="https://www.linkedin.com/in/someone/", posts=[POST_URL], reactions={POST_URL: claim_check(records, always=True)})
+        )
+    )
+    assert is_claim_check(stored)
+    assert resolve(stored)["reactions"] == {POST_URL: records}
+
+
+def test_listed_reactions_group_needs_its_dataset(monkeypatch) -> None:
+    from src.registry import enabled_groups
+
+    monkeypatch.delenv("BRIGHT_DATA_REACTIONS_DATASET_ID")
+    monkeypatch.setenv("SERVICE_PROVIDERS", "brightdata,brightdata_reactions")
+    with pytest.raises(ValueError, match="BRIGHT_DATA_REACTIONS_DATASET_ID"):
+        enabled_groups()
+
+    monkeypatch.delenv("SERVICE_PROVIDERS")
+    assert "brightdata" in enabled_groups()
+    assert "brightdata_reactions" not in enabled_groups()
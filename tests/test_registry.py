@@ -0,0 +1,80 @@
+import logging
+import subprocess
+import sys
+
+import pytest
+
+CREDENTIALS = ("LINKEDIN_ACCESS_TOKEN", "LINKEDIN_AUTHOR_URN", "BRIGHT_DATA_API_TOKEN", "PHANTOMBUSTER_API_KEY")
+
+
+@pytest.fixture
+def no_credentials(monkeypatch: pytest.MonkeyPatch) -> pytest.MonkeyPatch:
+    monkeypatch.delenv("SERVICE_PROVIDERS", raising=False)
+    for var in CREDENTIALS:
+        monkeypatch.delenv(var, raising=False)
+    return monkeypatch
+
+
+def test_groups_are_detected_from_credentials(no_credentials) -> None:
+    from src.registry import enabled_groups
+
+    assert enabled_groups() == ["storage"]
+
+    no_credentials.setenv("PHANTOMBUSTER_API_KEY", "key")
+    assert enabled_groups() == ["phantombuster", "storage"]
+
+    no_credentials.setenv("BRIGHT_DATA_API_TOKEN", "token")
+    no_credentials.setenv("BRIGHT_DATA_REACTIONS_DATASET_ID", "dataset")
+    assert enabled_groups() == ["brightdata", "brightdata_reactions", "phantombuster", "storage", "routing"]
+
+
+def test_detected_groups_without_settings_or_requirements_are_dropped(no_credentials, caplog) -> None:
+    from src.registry import enabled_groups
+
+    no_credentials.setenv("BRIGHT_DATA_API_TOKEN", "token")
+    no_credentials.delenv("BRIGHT_DATA_REACTIONS_DATASET_ID", raising=False)
+    with caplog.at_level(logging.WARNING):
+        assert enabled_groups() == ["brightdata", "storage"]
+    assert "BRIGHT_DATA_REACTIONS_DATASET_ID is not set" in caplog.text
+    # Routing needs both scraping providers.
+    assert "routing" not in enabled_groups()
+
+
+def test_listed_groups_are_checked_at_startup(no_credentials) -> None:
+    from src.registry import enabled_groups
+
+    no_credentials.setenv("SERVICE_PROVIDERS", "phantombuster, storage")
+    assert enabled_groups() == ["phantombuster", "storage"]
+
+    no_credentials.setenv("SERVICE_PROVIDERS", "phantombuster,twitter")
+    with pytest.raises(ValueError, match="twitter"):
+        enabled_groups()
+
+    no_credentials.delenv("BRIGHT_DATA_REACTIONS_DATASET_ID", raising=False)
+    no_credentials.setenv("SERVICE_PROVIDERS", "brightdata,brightdata_reactions")
+    with pytest.raises(ValueError, match="BRIGHT_DATA_REACTIONS_DATASET_ID"):
+        enabled_groups()
+
+
+def test_discover_skips_imported_definitions() -> None:
+    import importlib
+
+    from src.registry import discover
+
+    workflows, functions = discover(importlib.import_module("src.workflows.routing.get_linkedin_profile"))
+    # The module imports the provider workflows it starts as children, but only defines this one.
+    assert [workflow.__name__ for workflow in workflows] == ["GetLinkedinProfileWorkflow"]
+    assert functions == []
+
+
+def test_a_group_only_imports_its_own_modules() -> None:
+    # A fresh interpreter: this process has already imported every provider.
+    child = (
+        "import sys\n"
+        "from src.registry import load_groups\n"
+        "workflows, functions = load_groups(['phantombuster'])\n"
+        "assert workflows and functions\n"
+        "print(sorted({name.split('.')[2] for name in sys.modules if name.startswith('src.functions.')}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", child], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "['phantombuster']"
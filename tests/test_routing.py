@@ -0,0 +1,96 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def windows(monkeypatch: pytest.MonkeyPatch) -> dict:
+    from src.utils import routing
+
+    fresh: dict = {}
+    monkeypatch.setattr(routing, "_windows", fresh)
+    return fresh
+
+
+def test_providers_rank_by_median_latency_and_errors(windows, monkeypatch) -> None:
+    from src.utils.routing import rank_providers, record_outcome
+
+    monkeypatch.setenv("ROUTER_PROVIDER_ORDER", "brightdata,phantombuster")
+    # Without samples both take the default latency, and the configured order breaks the tie.
+    assert rank_providers("profile") == ["brightdata", "phantombuster"]
+
+    for _ in range(5):
+        record_outcome("brightdata", "profile", 60, success=True)
+        record_outcome("phantombuster", "profile", 30, success=True)
+    assert rank_providers("profile") == ["phantombuster", "brightdata"]
+
+    # A 50% error rate costs 300s at the default penalty.
+    for _ in range(5):
+        record_outcome("phantombuster", "profile", 30, success=False)
+    assert rank_providers("profile") == ["brightdata", "phantombuster"]
+
+
+def test_hedge_waits_for_the_primary_p95(windows, monkeypatch) -> None:
+    from src.utils.routing import hedge_after, record_outcome
+
+    monkeypatch.delenv("ROUTER_DEFAULT_HEDGE_SECONDS", raising=False)
+    assert hedge_after("brightdata", "posts") is None
+    monkeypatch.setenv("ROUTER_DEFAULT_HEDGE_SECONDS", "90")
+    assert hedge_after("brightdata", "posts") == 90
+
+    for seconds in range(1, 21):
+        record_outcome("brightdata", "posts", seconds, success=True)
+    assert hedge_after("brightdata", "posts") == 20
+
+
+def test_censored_samples_raise_the_percentiles(windows) -> None:
+    from src.utils.routing import window
+
+    stats = window("brightdata", "profile")
+    for seconds in (10, 20, 30, 40):
+        stats.record(seconds, success=True)
+    assert stats.percentile(0.5) is None
+
+    stats.record(50, success=False, censored=True)
+    assert stats.percentile(0.5) == 30
+    # Cancelled scrapes are not failures.
+    assert stats.error_rate() == 0
+
+    for _ in range(4):
+        stats.record(50, success=False, censored=True)
+    # Most scrapes ran past 50s; the longest time seen is the best lower bound.
+    assert stats.percentile(0.95) == 50
+    assert stats.percentile(0.2) == 20
+
+
+def test_cancelled_loser_is_recorded_as_censored(windows, run_workflow, monkeypatch) -> None:
+    from restack_ai.workflow import workflow
+
+    from src.utils.routing import window
+    from src.workflows.routing import router
+    from src.workflows.routing.get_linkedin_profile import GetLinkedinProfileWorkflow
+    from src.workflows.routing.router import RoutedScrapeInput
+
+    monkeypatch.setenv("ROUTER_PROVIDER_ORDER", "brightdata,phantombuster")
+    monkeypatch.setenv("ROUTER_DEFAULT_HEDGE_SECONDS", "0.05")
+    seconds = {"GetLinkedinProfileWorkflowBrightdata": 5, "GetLinkedinProfileWorkflowPhantombuster": 0.1}
+
+    async def child_execute(workflow: type, workflow_id: str, workflow_input: object) -> dict:
+        await asyncio.sleep(seconds[workflow.__name__])
+        return {"from": workflow.__name__}
+
+    monkeypatch.setattr(workflow, "child_execute", child_execute)
+    monkeypatch.setattr(router, "workflow_info", lambda: SimpleNamespace(workflow_id="routed"))
+    monkeypatch.setattr(router, "temporal_workflow", SimpleNamespace(time=time.monotonic, wait=asyncio.wait))
+
+    result = asyncio.run(
+        run_workflow(GetLinkedinProfileWorkflow, RoutedScrapeInput(profile_url="https://www.linkedin.com/in/routed/", force_refresh=True))
+    )
+
+    # Bright Data was hedged after 0.05s and cancelled once Phantombuster won.
+    assert result["provider"] == "phantombuster"
+    assert list(window("phantombuster", "profile").latencies) == [pytest.approx(0.1, abs=0.1)]
+    brightdata = window("brightdata", "profile")
+    assert not brightdata.outcomes and list(brightdata.censored) == [pytest.approx(0.15, abs=0.1)]
@@ -0,0 +1,37 @@
+import asyncio
+
+from src.benchmarks.fakes import FakeProviderConfig
+from src.utils.blobs import claim_check, resolve
+
+
+def test_leads_are_saved_as_whole_records_from_a_claim_check(fake_providers) -> None:
+    from src.functions.phantombuster.lead_index import lead_index
+    from src.functions.phantombuster.save_linkedin_leads_batch import (
+        ChunkLeadsInput,
+        SaveLeadsBatchInput,
+        chunk_linkedin_leads_phantombuster,
+        save_linkedin_leads_batch_phantombuster,
+    )
+
+    leads = [
+        {"profileUrl": "linkedin.com/in/Whole-Record?trk=x", "firstName": "Ada", "company": "Analytical"},
+        "https://www.linkedin.com/in/url-only/",
+        {"firstName": "No URL"},
+    ]
+
+    async def run():
+        async with fake_providers(FakeProviderConfig(job_seconds=0)) as fakes:
+            chunks = await chunk_linkedin_leads_phantombuster(ChunkLeadsInput(leads=claim_check(leads, always=True), chunk_size=2))
+            results = [await save_linkedin_leads_batch_phantombuster(SaveLeadsBatchInput(leads=chunk)) for chunk in chunks]
+            return fakes, chunks, results
+
+    fakes, chunks, results = asyncio.run(run())
+    assert len(chunks) == 2
+    assert [(r["saved"], r["skipped"], r["failed"]) for r in results] == [(2, 0, 0), (0, 0, 1)]
+    assert list(resolve(results[1]["errors"]).values()) == ["No LinkedIn profile URL in lead"]
+    assert {"profileUrl": "linkedin.com/in/Whole-Record?trk=x", "firstName": "Ada", "company": "Analytical",
+            "linkedinProfileUrl": "https://www.linkedin.com/in/whole-record/"} in fakes.saved_leads
+    assert lead_index.saved(["https://www.linkedin.com/in/whole-record/", "https://www.linkedin.com/in/url-only/"]) == {
+        "https://www.linkedin.com/in/whole-record/",
+        "https://www.linkedin.com/in/url-only/",
+    }
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from temporalio.client import WorkflowExecutionStatus
+
+from src.schedule import ScheduleState, WatchlistEntry, run_tick
+
+WATCHLIST = [
+    WatchlistEntry(profile_url=f"https://www.linkedin.com/in/watched-{i}/", refresh_hours=1)
+    for i in range(3)
+]
+
+
+class SchedulingClient:
+    """Stands in for the Restack client: records started workflows and reports the status the test sets."""
+
+    def __init__(self) -> None:
+        self.started: dict[str, list[str]] = {}
+        self.status = WorkflowExecutionStatus.RUNNING
+        self.errors: dict[str, str] = {}
+
+    async def schedule_workflow(self, workflow_name: str, workflow_id: str, workflow_input: dict) -> str:
+        self.started[workflow_id] = workflow_input["profile_urls"]
+        return workflow_id
+
+    async def get_workflow_handle(self, workflow_id: str, run_id: str | None = None):
+        client = self
+
+        class Handle:
+            async def describe(self):
+                return SimpleNamespace(status=client.status, close_time=datetime.now(timezone.utc))
+
+            async def result(self):
+                return {"results": {}, "errors": client.errors}
+
+        return Handle()
+
+
+@pytest.fixture
+def scheduling_client(monkeypatch: pytest.MonkeyPatch) -> SchedulingClient:
+    import src.client
+
+    client = SchedulingClient()
+    monkeypatch.setattr(src.client, "client", client)
+    monkeypatch.setenv("ROUTER_PROVIDER_ORDER", "brightdata")
+    monkeypatch.setenv("SCHEDULE_DAILY_BUDGET_BRIGHTDATA", "1000000")
+    return client
+
+
+def test_failed_refreshes_are_rescheduled(scheduling_client: SchedulingClient, tmp_path) -> None:
+    state = ScheduleState(str(tmp_path / "schedule.sqlite3"))
+    # Backdate every entry so all of them are due.
+    for entry in WATCHLIST:
+        state.last_refresh("profile", entry.profile_url, 0)
+    tick = lambda: asyncio.run(run_tick(state, WATCHLIST, 900))
+
+    assert tick() == 3
+    # Still running: nothing is started twice.
+    assert tick() == 0
+
+    scheduling_client.status = WorkflowExecutionStatus.COMPLETED
+    scheduling_client.errors = {WATCHLIST[0].profile_url: "private profile"}
+    assert tick() == 1
+    assert list(scheduling_client.started.values())[-1] == [WATCHLIST[0].profile_url]
+
+    scheduling_client.status = WorkflowExecutionStatus.FAILED
+    assert tick() == 1
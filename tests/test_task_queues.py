@@ -0,0 +1,68 @@
+import pytest
+
+
+def test_functions_run_on_their_own_queue_or_their_group_queue() -> None:
+    from src.functions.brightdata.launch_scrape import launch_scrape_brightdata
+    from src.functions.linkedin.create_post import create_post_on_linkedin
+    from src.functions.linkedin.media import upload_linkedin_media
+    from src.functions.phantombuster.save_linkedin_lead import save_linkedin_lead_phantombuster
+    from src.functions.routing.choose_provider import choose_provider
+    from src.task_queues import task_queue_for
+
+    assert task_queue_for(launch_scrape_brightdata) == "brightdata"
+    assert task_queue_for(choose_provider) == "routing"
+    assert task_queue_for(create_post_on_linkedin) == "linkedin"
+    # Quick calls never wait behind their group's scrapes or uploads.
+    assert task_queue_for(save_linkedin_lead_phantombuster) == "phantombuster-leads"
+    assert task_queue_for(upload_linkedin_media) == "linkedin-media"
+
+
+def test_concurrency_defaults_and_overrides(monkeypatch) -> None:
+    from src.task_queues import concurrency
+
+    assert concurrency("brightdata") == 100
+    assert concurrency("restack") is None
+    monkeypatch.setenv("TASK_QUEUE_PHANTOMBUSTER_LEADS_CONCURRENCY", "4")
+    assert concurrency("phantombuster-leads") == 4
+
+
+@pytest.fixture
+def services(monkeypatch: pytest.MonkeyPatch):
+    from src.functions.brightdata.launch_scrape import launch_scrape_brightdata
+    from src.functions.phantombuster.launch_scrape import launch_scrape_phantombuster
+    from src.functions.phantombuster.save_linkedin_lead import save_linkedin_lead_phantombuster
+    from src.services import plan_services
+    from src.workflows.brightdata.get_linkedin_profile import GetLinkedinProfileWorkflowBrightdata
+
+    monkeypatch.delenv("SERVICE_TASK_QUEUES", raising=False)
+    functions = [launch_scrape_brightdata, launch_scrape_phantombuster, save_linkedin_lead_phantombuster]
+    return lambda: plan_services([GetLinkedinProfileWorkflowBrightdata], functions)
+
+
+def test_workflows_and_functions_are_split_by_queue(services) -> None:
+    planned = {
+        queue: ([workflow.__name__ for workflow in workflows], [function.__name__ for function in functions])
+        for queue, (workflows, functions) in services().items()
+    }
+    assert planned == {
+        "restack": (["GetLinkedinProfileWorkflowBrightdata"], []),
+        "brightdata": ([], ["launch_scrape_brightdata"]),
+        "phantombuster": ([], ["launch_scrape_phantombuster"]),
+        "phantombuster-leads": ([], ["save_linkedin_lead_phantombuster"]),
+    }
+
+
+def test_a_process_can_serve_only_some_queues(services, monkeypatch) -> None:
+    monkeypatch.setenv("SERVICE_TASK_QUEUES", "phantombuster-leads, linkedin")
+    # Queues this process has nothing for are skipped.
+    assert list(services()) == ["phantombuster-leads"]
+
+
+def test_each_queue_gets_its_own_limit(monkeypatch) -> None:
+    from src.services import service_options
+
+    monkeypatch.setenv("TASK_QUEUE_RESTACK_CONCURRENCY", "25")
+    workflow_options = service_options("restack", has_workflows=True)
+    assert workflow_options.max_concurrent_workflow_runs == 25
+    function_options = service_options("linkedin-media", has_workflows=False)
+    assert function_options.max_concurrent_function_runs == 3 and function_options.endpoints is False
@@ -0,0 +1,46 @@
+import pytest
+
+from src.utils.urls import canonical_post_url, canonical_profile_url, canonical_profile_urls
+
+
+@pytest.mark.parametrize(("url", "canonical"), [
+    ("linkedin.com/in/WilliamHGates?trk=x", "https://www.linkedin.com/in/williamhgates/"),
+    ("https://de.linkedin.com/in/williamhgates/recent-activity/all/", "https://www.linkedin.com/in/williamhgates/"),
+    ("https://www.linkedin.com/company/Microsoft/posts/", "https://www.linkedin.com/company/microsoft/"),
+    ("https://www.linkedin.com/pub/john-smith/1a/234/567", "https://www.linkedin.com/pub/john-smith/1a/234/567/"),
+    ("http://linkedin.com/pub/John-Smith/1A/234/567/?trk=x", "https://www.linkedin.com/pub/john-smith/1a/234/567/"),
+])
+def test_canonical_forms(url: str, canonical: str) -> None:
+    assert canonical_profile_url(url) == canonical
+
+
+def test_pub_profiles_with_the_same_name_stay_apart() -> None:
+    assert canonical_profile_url("https://www.linkedin.com/pub/john-smith/1a/234/567") != canonical_profile_url(
+        "https://www.linkedin.com/pub/john-smith/2b/111/999"
+    )
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.linkedin.com/in/René-M/",
+    "https://www.linkedin.com/in/ren%C3%A9-m",
+    "https://www.linkedin.com/in/REN%c3%a9-m/details/experience/",
+])
+def test_encoded_and_raw_slugs_share_a_key(url: str) -> None:
+    assert canonical_profile_url(url) == "https://www.linkedin.com/in/ren%C3%A9-m/"
+
+
+@pytest.mark.parametrize("url", ["williamhgates", "in/williamhgates", ""])
+def test_bare_slugs_are_rejected(url: str) -> None:
+    with pytest.raises(ValueError):
+        canonical_profile_url(url)
+
+
+def test_batch_inputs_keep_going_past_bad_urls() -> None:
+    urls, errors = canonical_profile_urls(["williamhgates", "linkedin.com/in/a", "https://www.linkedin.com/in/A/"])
+    assert urls == ["https://www.linkedin.com/in/a/"]
+    assert list(errors) == ["williamhgates"]
+
+
+def test_post_urls_keep_their_case() -> None:
+    url = "de.linkedin.com/posts/someone_activity-7100-AbCd/?utm_source=share#comments"
+    assert canonical_post_url(url) == "https://www.linkedin.com/posts/someone_activity-7100-AbCd/"
@@ -0,0 +1,110 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+
+class RecordingClient:
+    """Stands in for the Restack client; records the signals sent to each workflow."""
+
+    def __init__(self) -> None:
+        self.signals: list[tuple[str, str | None, dict]] = []
+
+    async def get_workflow_handle(self, workflow_id: str, run_id: str | None = None):
+        client = self
+
+        class Handle:
+            async def signal(self, name: str, payload: dict) -> None:
+                client.signals.append((workflow_id, run_id, payload))
+
+        return Handle()
+
+
+@pytest.fixture
+def restack_client(monkeypatch: pytest.MonkeyPatch) -> RecordingClient:
+    import src.client
+
+    recording = RecordingClient()
+    monkeypatch.setattr(src.client, "client", recording)
+    return recording
+
+
+def post_callback(path: str, payload: dict) -> tuple[int, dict | None]:
+    from src.utils.web import create_app
+
+    async def post():
+        async with TestClient(TestServer(create_app())) as http:
+            response = await http.post(path, json=payload)
+            return response.status, (await response.json() if response.status == 200 else None)
+
+    return asyncio.run(post())
+
+
+def test_brightdata_callback_signals_the_workflow_named_in_its_url(monkeypatch, restack_client) -> None:
+    from src.utils.webhooks import webhook_url
+
+    monkeypatch.setenv("WEBHOOK_BASE_URL", "https://hooks.example.com")
+    monkeypatch.setenv("WEBHOOK_SECRET", "s3cret")
+    url = urlsplit(webhook_url("brightdata", ("wf-direct", "run-1")))
+
+    # Nothing was registered in this process: the URL alone identifies the workflow.
+    status, body = post_callback(f"{url.path}?{url.query}", {"snapshot_id": "s_direct", "status": "ready"})
+
+    assert status == 200 and body == {"signalled": 1}
+    assert restack_client.signals == [("wf-direct", "run-1", {"job_id": "s_direct", "status": "finished"})]
+
+
+def test_phantombuster_callback_finds_waiters_registered_by_any_process(restack_client) -> None:
+    from src.utils.webhooks import JobWaiters
+
+    # A separate store instance on the same file, as another worker process would have.
+    JobWaiters().register("phantombuster", "c_shared", "wf-other-process", "run-2")
+
+    status, body = post_callback("/webhooks/phantombuster", {"containerId": "c_shared", "exitCode": 0})
+
+    assert status == 200 and body == {"signalled": 1}
+    assert restack_client.signals == [("wf-other-process", "run-2", {"job_id": "c_shared", "status": "finished"})]
+
+
+@pytest.mark.parametrize("token", ["", "wrong", "s3cre"])
+def test_callbacks_without_the_secret_are_rejected(monkeypatch, restack_client, token: str) -> None:
+    monkeypatch.setenv("WEBHOOK_SECRET", "s3cret")
+    status, _ = post_callback(f"/webhooks/brightdata?token={token}&workflow_id=wf", {"snapshot_id": "s"})
+    assert status == 401
+    assert restack_client.signals == []
+
+
+def test_waiters_registered_from_many_threads_are_all_kept(tmp_path) -> None:
+    from src.utils.webhooks import JobWaiters
+
+    waiters = JobWaiters(str(tmp_path / "webhooks.sqlite3"))
+
+    async def run() -> None:
+        await asyncio.gather(*(asyncio.to_thread(waiters.register, "brightdata", "s_threads", f"wf-{i}", None) for i in range(20)))
+
+    asyncio.run(run())
+    assert len(waiters.pop("brightdata", "s_threads")) == 20
+    assert len(waiters) == 0
+
+
+def test_phantombuster_launch_only_expects_a_callback_from_webhook_agents(monkeypatch, fake_providers) -> None:
+    from src.functions.phantombuster.agent_pool import load_agents, release_container
+    from src.functions.phantombuster.launch_scrape import LaunchScrapeInput, launch_scrape_phantombuster
+
+    monkeypatch.setenv("WEBHOOK_BASE_URL", "https://hooks.example.com")
+    launch = LaunchScrapeInput(profile_url="https://www.linkedin.com/in/webhook-agents/", kind="posts", force_refresh=True)
+
+    async def run():
+        async with fake_providers():
+            launched = await launch_scrape_phantombuster(launch)
+            # The agent's webhook is set in the dashboard later; a joining workflow sees it.
+            monkeypatch.setenv("PHANTOMBUSTER_WEBHOOK_AGENTS", ",".join(agent.agent_id for agent in load_agents("posts")))
+            joined = await launch_scrape_phantombuster(launch)
+            await release_container(launched["container_id"])
+            return launched, joined
+
+    launched, joined = asyncio.run(run())
+    assert launched["webhook"] is False
+    assert joined["container_id"] == launched["container_id"] and joined["webhook"] is True
+    assert all(agent.webhook for agent in load_agents("posts"))